@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Accuracy and speed benchmark for the local language identifier on short inputs
+
+Usage:
+    python benchmarks/bench_langid.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.langid import LanguageIdentifier
+
+
+SAMPLES = [
+    ('pt', "Oi, tudo bem com você?"),
+    ('pt', "Pode me mandar o arquivo?"),
+    ('pt', "Obrigado pela ajuda de ontem"),
+    ('pt', "A reunião foi cancelada"),
+    ('pt', "Vou chegar atrasado hoje"),
+    ('pt', "Qual é o prazo de entrega?"),
+    ('pt', "Preciso falar com o gerente"),
+    ('pt', "O sistema está fora do ar"),
+    ('pt', "Estou trabalhando nisso agora"),
+    ('pt', "Feliz aniversário, meu amigo!"),
+    ('pt', "Não consigo acessar minha conta"),
+    ('pt', "Segue em anexo a proposta comercial"),
+    ('pt', "Podemos conversar amanhã de manhã?"),
+    ('pt', "A fatura vence na próxima semana"),
+    ('pt', "Ele ainda não respondeu o e-mail"),
+    ('pt', "Vamos almoçar juntos na sexta"),
+    ('pt', "Os testes passaram sem erros"),
+    ('pt', "Essa versão tem muitos problemas"),
+    ('pt', "Muito obrigada pelo convite"),
+    ('pt', "Desculpe a demora na resposta"),
+    ('en', "Hi, how are you doing?"),
+    ('en', "Can you send me the file?"),
+    ('en', "Thanks for the help yesterday"),
+    ('en', "The meeting was cancelled"),
+    ('en', "I will be late today"),
+    ('en', "What is the delivery deadline?"),
+    ('en', "I need to talk to the manager"),
+    ('en', "The system is down"),
+    ('en', "I am working on it right now"),
+    ('en', "Happy birthday, my friend!"),
+    ('en', "I cannot access my account"),
+    ('en', "Please find the proposal attached"),
+    ('en', "Can we talk tomorrow morning?"),
+    ('en', "The invoice is due next week"),
+    ('en', "He has not answered the email yet"),
+    ('en', "Let's have lunch together on Friday"),
+    ('en', "The tests passed without errors"),
+    ('en', "This version has many problems"),
+    ('en', "Thank you very much for the invitation"),
+    ('en', "Sorry for the late reply"),
+]
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000, help="timing iterations per sample")
+    args = parser.parse_args()
+
+    identifier = LanguageIdentifier()
+
+    correct = 0
+    unknown = 0
+    for expected, text in SAMPLES:
+        language, confidence = identifier.classify(text)
+        if language == expected:
+            correct += 1
+        elif language == 'unknown':
+            unknown += 1
+        else:
+            print(f"  miss: expected={expected} got={language} ({confidence:.2f}) {text!r}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, text in SAMPLES:
+            identifier.classify(text)
+    elapsed = time.perf_counter() - start
+    calls = args.repeat * len(SAMPLES)
+    avg_len = sum(len(text) for _, text in SAMPLES) / len(SAMPLES)
+
+    print(f"samples:     {len(SAMPLES)} (avg {avg_len:.0f} chars)")
+    print(f"accuracy:    {correct / len(SAMPLES):.1%} ({unknown} unknown)")
+    print(f"latency:     {elapsed / calls * 1e6:.2f} us/classification")
+    print(f"throughput:  {calls / elapsed:,.0f} classifications/s")
+
+
+if __name__ == '__main__':
+    main()
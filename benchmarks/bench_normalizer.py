@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the text normalizer on inputs from 1 KB to 10 MB
+
+Compares the previous clean_text implementation (whitespace join plus a
+per-character generator) with TextNormalizer.normalize() and the
+offset-tracking normalize_with_offsets().
+
+Usage:
+    python benchmarks/bench_normalizer.py [--max-size BYTES]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.normalizer import TextNormalizer
+
+
+PARAGRAPH = (
+    "Olá   equipe,​ segue o resumo da reunião de ontem.  \r\n"
+    "  - Revisar o orçamento do projeto\n"
+    "  - Enviar a proposta ao cliente até sexta\t\n\n\n"
+    "Qualquer dúvida, estou à disposição. Abraços!\x07\n\n"
+)
+SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+
+def legacy_clean_text(text: str) -> str:
+    """clean_text as it was before the normalizer"""
+    cleaned = ' '.join(text.split())
+    cleaned = ''.join(char for char in cleaned if ord(char) >= 32 or char in '\n\t')
+    return cleaned.strip()
+
+
+def make_input(size: int) -> str:
+    """Build a text of roughly size bytes"""
+    repeat = size // len(PARAGRAPH.encode('utf-8')) + 1
+    return (PARAGRAPH * repeat)[:size]
+
+
+def measure(func, text: str) -> float:
+    """Best-of-N wall time in seconds"""
+    runs = 5 if len(text) <= 1024 * 1024 else 2
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def format_size(size: int) -> str:
+    """Human-readable size"""
+    return f"{size // (1024 * 1024)} MB" if size >= 1024 * 1024 else f"{size // 1024} KB"
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-size', type=int, default=SIZES[-1])
+    args = parser.parse_args()
+
+    normalizer = TextNormalizer()
+    implementations = [
+        ('legacy', legacy_clean_text),
+        ('normalize', normalizer.normalize),
+        ('with_offsets', normalizer.normalize_with_offsets),
+    ]
+
+    print(f"{'size':>8} " + ' '.join(f"{name:>22}" for name, _ in implementations))
+    for size in SIZES:
+        if size > args.max_size:
+            break
+        text = make_input(size)
+        cells = []
+        for _, func in implementations:
+            elapsed = measure(func, text)
+            cells.append(f"{elapsed * 1000:9.2f} ms {size / elapsed / 1e6:6.1f} MB/s")
+        print(f"{format_size(size):>8} " + ' '.join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the pt-BR sentence segmenter
+
+Measures sentences() and paragraphs() from 1 KB to 10 MB on typical prose
+and on abbreviation-dense text, and compares them with a naive regex split
+that copies every sentence.
+
+Usage:
+    python benchmarks/bench_segmenter.py [--max-size BYTES]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.segmenter import SentenceSegmenter
+
+
+TYPICAL = (
+    "A reunião de planejamento começou com uma revisão dos resultados do último "
+    "trimestre, que ficaram um pouco abaixo da meta definida no início do ano. "
+    "Apesar disso, a equipe comercial conseguiu fechar dois contratos importantes "
+    "com clientes do setor de saúde, o que deve compensar a diferença nos próximos "
+    "meses. O diretor financeiro pediu cautela com novas contratações até que o "
+    "fluxo de caixa se estabilize, mas concordou em manter os investimentos já "
+    "aprovados em infraestrutura. Ficou decidido que o Sr. Almeida vai acompanhar "
+    "de perto a implantação do novo sistema de atendimento, com relatórios "
+    "semanais enviados a toda a diretoria. Também discutimos a possibilidade de "
+    "abrir um escritório regional no Nordeste, mas a decisão foi adiada. Quem "
+    "tiver sugestões sobre o tema deve enviá-las até o fim do mês!\n\n"
+)
+DENSE = (
+    "Prezada Dra. Silva, conforme combinamos na reunião de ontem, seguem os "
+    "pontos pendentes do projeto de migração. O Sr. Almeida revisou o "
+    "cronograma e sugeriu antecipar a fase de testes para a próxima semana, "
+    "p.ex. na terça-feira. Ainda faltam as aprovações do financeiro, do "
+    "jurídico, etc. e o orçamento final! Podemos conversar amanhã às 10h? "
+    "A equipe está disponível e o ambiente de homologação já foi preparado "
+    "com os dados de produção anonimizados, conforme o art. 7 da política "
+    "interna de privacidade.\n\n"
+)
+SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+_NAIVE = re.compile(r'(?<=[.!?])\s+')
+
+
+def make_input(paragraph: str, size: int) -> str:
+    """Build a text of roughly size bytes"""
+    repeat = size // len(paragraph.encode('utf-8')) + 1
+    return (paragraph * repeat)[:size]
+
+
+def consume(iterator) -> int:
+    """Exhaust an iterator, returning the number of items"""
+    count = 0
+    for _ in iterator:
+        count += 1
+    return count
+
+
+def measure(func, text: str) -> float:
+    """Best-of-N wall time in seconds"""
+    runs = 5 if len(text) <= 1024 * 1024 else 2
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def format_size(size: int) -> str:
+    """Human-readable size"""
+    return f"{size // (1024 * 1024)} MB" if size >= 1024 * 1024 else f"{size // 1024} KB"
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-size', type=int, default=SIZES[-1])
+    args = parser.parse_args()
+
+    segmenter = SentenceSegmenter()
+    implementations = [
+        ('naive split', lambda text: len(_NAIVE.split(text))),
+        ('sentences', lambda text: consume(segmenter.sentences(text))),
+        ('paragraphs', lambda text: consume(segmenter.paragraphs(text))),
+    ]
+
+    for label, paragraph in (('typical prose', TYPICAL), ('abbreviation-dense', DENSE)):
+        print(f"\n{label}")
+        print(f"{'size':>8} " + ' '.join(f"{name:>22}" for name, _ in implementations))
+        for size in SIZES:
+            if size > args.max_size:
+                break
+            text = make_input(paragraph, size)
+            cells = []
+            for _, func in implementations:
+                elapsed = measure(func, text)
+                cells.append(f"{elapsed * 1000:9.2f} ms {size / elapsed / 1e6:6.1f} MB/s")
+            print(f"{format_size(size):>8} " + ' '.join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
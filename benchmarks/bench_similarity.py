@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+False-positive rate, recall and lookup latency of the near-duplicate index
+
+Usage:
+    python benchmarks/bench_similarity.py [--entries N] [--probes N] [--threshold T]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.similarity import NearDuplicateIndex
+
+
+WORDS = (
+    "reunião proposta projeto cliente relatório prazo entrega equipe orçamento "
+    "contrato pagamento fatura sistema acesso conta suporte versão teste produção "
+    "servidor dados vendas custos trimestre meta resultado análise documento anexo "
+    "confirmar enviar revisar aprovar agendar cancelar atualizar verificar discutir "
+    "amanhã hoje semana mês manhã tarde obrigado favor atenciosamente abraço"
+).split()
+NAMES = "Ana Bruno Carla Diego Elisa Fábio Gabriela Hugo Isabela João Karina Lucas".split()
+
+
+def make_text(rng: random.Random, length: int = 60) -> str:
+    """Build a random e-mail-like text on a random topic
+
+    Each text mixes common words with a topic-specific vocabulary, so
+    unrelated texts still share plenty of words, as real e-mails do.
+    """
+    topic = [f"{rng.choice(WORDS)[:4]}{rng.randint(0, 9999):x}" for _ in range(20)]
+    body = ' '.join(rng.choice(WORDS if rng.random() < 0.5 else topic) for _ in range(length))
+    return f"Olá {rng.choice(NAMES)}, {body}. Dia {rng.randint(1, 28)}/{rng.randint(1, 12)}."
+
+
+def perturb(rng: random.Random, text: str) -> str:
+    """Change the greeting name and date, like a reused template"""
+    words = text.split()
+    words[1] = rng.choice(NAMES) + ','
+    words[-1] = f"{rng.randint(1, 28)}/{rng.randint(1, 12)}."
+    return ' '.join(words)
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--probes', type=int, default=2000)
+    parser.add_argument('--threshold', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = NearDuplicateIndex(capacity=args.entries)
+    texts = [make_text(rng) for _ in range(args.entries)]
+    for i, text in enumerate(texts):
+        index.add(text, f"result-{i}")
+
+    # Near duplicates should hit their own entry
+    recalled = 0
+    for _ in range(args.probes):
+        i = rng.randrange(len(texts))
+        match = index.lookup(perturb(rng, texts[i]), args.threshold)
+        if match and match[0] == f"result-{i}":
+            recalled += 1
+
+    # Unrelated texts should not hit anything
+    false_positives = 0
+    latencies = []
+    for _ in range(args.probes):
+        probe = make_text(rng)
+        start = time.perf_counter()
+        match = index.lookup(probe, args.threshold)
+        latencies.append(time.perf_counter() - start)
+        if match:
+            false_positives += 1
+
+    latencies.sort()
+    stats = index.get_stats()
+    print(f"entries:         {len(index)}")
+    print(f"recall:          {recalled / args.probes:.1%}")
+    print(f"false positives: {false_positives / args.probes:.2%}")
+    print(f"avg candidates:  {stats['avg_candidates']:.1f} per lookup")
+    print(f"lookup latency:  p50 {latencies[len(latencies) // 2] * 1e6:.0f} us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Cold-start and time-to-first-result benchmark
+
+Launches fresh processes against a local mock of the chat completions
+endpoint and reports, as the median of several runs:
+
+  headless  interpreter start, imports, Config load, Logger setup, AIClient
+            and TextProcessor construction, OpenAI client creation (on the
+            first request) and the request itself
+  gui       process start -> MainWindow mapped, click -> LoadingDialog
+            visible, request -> _show_result_notification (needs a display;
+            Xvfb is started automatically when DISPLAY is unset)
+
+Phases are compared with a stored baseline; a phase that got slower than
+the tolerance makes the script exit with status 1. The baseline records
+the machine it was measured on: the committed startup_baseline.json comes
+from a 1-CPU x86_64 Linux VM without a display (headless phases only), so
+re-save it on the machine you compare on.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--latency MS]
+    python benchmarks/bench_startup.py --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_baseline.json')
+
+SAMPLE_TEXT = (
+    "Bom dia a todos. Gostaria de lembrar que a reunião de planejamento foi "
+    "transferida para quinta-feira às 14h, na sala de sempre. Peço que cada "
+    "equipe traga os números atualizados do trimestre e uma lista curta de "
+    "prioridades para o próximo ciclo."
+)
+MOCK_REPLY = "A reunião de planejamento passou para quinta, 14h. Tragam números e prioridades."
+MOCK_USAGE = {'prompt_tokens': 60, 'completion_tokens': 20, 'total_tokens': 80}
+
+HEADLESS_PHASES = ['interpreter', 'imports', 'config', 'logger', 'ai_client', 'text_processor',
+                   'openai_client', 'request', 'total']
+GUI_PHASES = ['window_mapped', 'click_to_loading', 'request_to_result', 'total']
+
+
+# Mock endpoint
+
+class _MockCompletions(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions endpoint"""
+
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        time.sleep(self.latency)
+        if request.get('stream'):
+            self._stream_reply()
+            return
+        body = json.dumps({
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': 'gpt-3.5-turbo',
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': MOCK_REPLY},
+                'finish_reason': 'stop'
+            }],
+            'usage': MOCK_USAGE
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reply(self):
+        """Server-sent events: content deltas, a usage chunk, then [DONE]"""
+        def chunk(choices, usage=None):
+            return {'id': 'chatcmpl-bench', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                    'model': 'gpt-3.5-turbo', 'choices': choices, 'usage': usage}
+
+        words = MOCK_REPLY.split(' ')
+        events = [chunk([{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}])]
+        events += [chunk([{'index': 0, 'delta': {'content': word if i == 0 else ' ' + word}, 'finish_reason': None}])
+                   for i, word in enumerate(words)]
+        events.append(chunk([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+        events.append(chunk([], MOCK_USAGE))
+        body = ''.join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_endpoint(latency: float) -> ThreadingHTTPServer:
+    """Serve the mock endpoint on a free localhost port"""
+    _MockCompletions.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _MockCompletions)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_xvfb():
+    """Start Xvfb on a free display; returns (process, display) or (None, None)"""
+    if not shutil.which('Xvfb'):
+        return None, None
+    for number in range(99, 120):
+        if os.path.exists(f'/tmp/.X11-unix/X{number}'):
+            continue
+        process = subprocess.Popen(['Xvfb', f':{number}', '-screen', '0', '1280x800x24', '-nolisten', 'tcp'],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):
+            if os.path.exists(f'/tmp/.X11-unix/X{number}'):
+                return process, f':{number}'
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+        process.kill()
+    return None, None
+
+
+# Probe (runs inside the measured process)
+
+def probe(mode: str, spawned_at: float) -> None:
+    """Measure one cold start and print the phases (ms) as JSON"""
+    marks = {'interpreter': time.time()}
+    start = time.perf_counter()
+    from src.app import TextHelperAI
+    from src.operations import run_operation
+    phases = {'interpreter': marks['interpreter'] - spawned_at, 'imports': time.perf_counter() - start}
+
+    app = TextHelperAI()
+    phases.update(app.startup_timings)
+
+    # The OpenAI client is created on the first request; time it separately
+    get_client = app.ai_client._get_client
+
+    def timed_get_client():
+        if app.ai_client.client is not None:
+            return get_client()
+        client_start = time.perf_counter()
+        client = get_client()
+        phases['openai_client'] = time.perf_counter() - client_start
+        return client
+
+    app.ai_client._get_client = timed_get_client
+
+    if mode == 'headless':
+        request_start = time.perf_counter()
+        run_operation(app.config, app.ai_client, app.text_processor, SAMPLE_TEXT, 'shorten')
+        phases['request'] = time.perf_counter() - request_start - phases.get('openai_client', 0.0)
+        phases['total'] = time.time() - spawned_at
+    else:
+        phases = _probe_gui(app, spawned_at)
+
+    app.cleanup()
+    print(json.dumps({phase: seconds * 1000 for phase, seconds in phases.items()}))
+
+
+def _probe_gui(app, spawned_at: float) -> dict:
+    """Drive MainWindow: wait for it to map, click, wait for the result"""
+    import src.ui.dialogs as dialogs
+    from src.ui.main_window import MainWindow
+
+    marks = {}
+
+    def mark(name):
+        marks.setdefault(name, time.time())
+
+    def when_mapped(widget, name):
+        if widget.winfo_ismapped():
+            mark(name)
+        else:
+            widget.bind('<Map>', lambda event: mark(name) if event.widget is widget else None, add='+')
+
+    base_loading = dialogs.LoadingDialog
+
+    class TimedLoadingDialog(base_loading):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            when_mapped(self.dialog, 'loading_visible')
+
+    dialogs.LoadingDialog = TimedLoadingDialog
+
+    # Skip the text input dialog: the benchmark pastes a fixed text
+    app._show_simple_input_dialog = lambda parent: SAMPLE_TEXT
+
+    # The worker streams the reply; process_text is only used when the
+    # stripped e-mail parts must be restored
+    process_text = app.ai_client.process_text
+    stream_text = app.ai_client.stream_text
+
+    def timed_process_text(text, operation_type, *args, **kwargs):
+        mark('request_start')
+        return process_text(text, operation_type, *args, **kwargs)
+
+    def timed_stream_text(text, operation_type):
+        mark('request_start')
+        return stream_text(text, operation_type)
+
+    app.ai_client.process_text = timed_process_text
+    app.ai_client.stream_text = timed_stream_text
+
+    show_result = app._show_result_notification
+
+    def timed_show_result(processed_text, operation_type):
+        mark('result')
+        show_result(processed_text, operation_type)
+        app.main_window.root.after(10, app.main_window.root.quit)
+
+    app._show_result_notification = timed_show_result
+
+    def click():
+        mark('click')
+        app.process_text_from_clipboard('shorten')
+
+    base_show = MainWindow.show
+
+    def timed_show(window):
+        def on_map(event):
+            if event.widget is window.root and 'window_mapped' not in marks:
+                mark('window_mapped')
+                window.root.after_idle(click)
+        window.root.bind('<Map>', on_map, add='+')
+        window.root.after(60000, window.root.quit)  # Never hang the benchmark
+        base_show(window)
+
+    MainWindow.show = timed_show
+    app.show_main_window()
+
+    return {
+        'window_mapped': marks['window_mapped'] - spawned_at,
+        'click_to_loading': marks['loading_visible'] - marks['click'],
+        'request_to_result': marks['result'] - marks['request_start'],
+        'total': marks['result'] - spawned_at
+    }
+
+
+# Driver
+
+def run_once(mode: str, env: dict) -> dict:
+    """Launch one measured process"""
+    spawned_at = time.time()
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--probe', mode, '--spawned-at', repr(spawned_at)],
+        capture_output=True, text=True, timeout=120, env=env, cwd=ROOT
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} probe failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def make_env(home: str, endpoint: str, display) -> dict:
+    """Environment for the measured processes: throwaway config, mock endpoint"""
+    with open(os.path.join(home, '.text_helper_ia_config.ini'), 'w') as f:
+        f.write("[DEFAULT]\nopenai_api_key = sk-bench\n\n[SIMILARITY]\nenabled = false\n")
+    env = dict(os.environ, HOME=home, OPENAI_BASE_URL=endpoint)
+    if display:
+        env['DISPLAY'] = display
+    return env
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> list:
+    """List phases slower than baseline by more than tolerance and min_delta ms"""
+    regressions = []
+    for mode, phases in results.items():
+        for phase, value in phases.items():
+            reference = baseline.get(mode, {}).get(phase)
+            if reference is not None and value > reference * (1 + tolerance) and value - reference > min_delta:
+                regressions.append(f"{mode}.{phase}: {value:.1f} ms (baseline {reference:.1f} ms)")
+    return regressions
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help="mock endpoint latency in ms")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown, as a fraction")
+    parser.add_argument('--min-delta', type=float, default=10.0, help="ignore slowdowns under this many ms")
+    parser.add_argument('--no-gui', action='store_true')
+    parser.add_argument('--probe', choices=['headless', 'gui'], help=argparse.SUPPRESS)
+    parser.add_argument('--spawned-at', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args.probe, args.spawned_at)
+        return
+
+    endpoint = start_mock_endpoint(args.latency / 1000)
+    xvfb, display = None, os.environ.get('DISPLAY')
+    if not args.no_gui and not display:
+        xvfb, display = start_xvfb()
+    modes = ['headless'] + (['gui'] if display and not args.no_gui else [])
+    if 'gui' not in modes and not args.no_gui:
+        print("No display and no Xvfb: GUI phases skipped")
+
+    home = tempfile.mkdtemp(prefix='bench-startup-')
+    try:
+        env = make_env(home, f'http://127.0.0.1:{endpoint.server_address[1]}/v1', display)
+        results = {}
+        for mode in modes:
+            runs = [run_once(mode, env) for _ in range(args.runs)]
+            results[mode] = {phase: statistics.median(run[phase] for run in runs) for phase in runs[0]}
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+        endpoint.shutdown()
+        if xvfb is not None:
+            xvfb.terminate()
+
+    for mode in modes:
+        print(f"\n{mode} (median of {args.runs} runs)")
+        for phase in HEADLESS_PHASES if mode == 'headless' else GUI_PHASES:
+            print(f"{phase:>20} {results[mode][phase]:9.1f} ms")
+
+    if args.save_baseline:
+        # Timings only compare on the same kind of machine; say which one
+        baseline = dict(results, machine={
+            'platform': platform.platform(),
+            'processor': platform.machine(),
+            'cpus': os.cpu_count(),
+            'python': platform.python_version(),
+            'runs': args.runs,
+            'date': time.strftime('%Y-%m-%d'),
+        })
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet; create one with --save-baseline")
+        return
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance, args.min_delta)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\nNo regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
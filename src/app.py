@@ -1,16 +1,33 @@
 """
 Main Application for Text Helper IA
 """
+import argparse
+import logging
+import os
 import sys
 import threading
-import tkinter as tk
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, Optional
 from .config import Config
 from .logger import Logger
 from .ia_client import AIClient
 from .text_processor import TextProcessor
-from .ui.main_window import MainWindow
-from .ui.dialogs import LoadingDialog, ErrorDialog, ConfigDialog
+from .batch import BatchRunner
+from .clipboard import ClipboardService
+from .operations import run_operation
+from .pipeline import FilePipeline
+from .daemon import TextHelperDaemon
+from .metrics import REGISTRY, EventLoopLagProbe, MetricsServer
+from .profiling import Profiler, latest_session, profiling_enabled
+from .tracing import Tracer, activate, annotate, format_report, load_traces, span, summarize, traced_callback
+
+# tkinter, the UI modules, pynput and the asyncio server are imported
+# where they are first needed, so headless, daemon and config runs do not
+# pay for them
+if TYPE_CHECKING:
+    from .history import HistoryStore
+    from .hotkeys import HotkeyDaemon
+    from .ui.main_window import MainWindow
 
 
 class TextHelperAI:
@@ -18,14 +35,43 @@ class TextHelperAI:
     
     def __init__(self):
         """Initialize the application"""
-        # Initialize core components
+        # Initialize core components, timing each one for startup benchmarks
+        self.startup_timings = {}
+        start = time.perf_counter()
         self.config = Config()
+        start = self._mark_startup('config', start)
         self.logger = Logger(self.config)
+        start = self._mark_startup('logger', start)
         self.ai_client = AIClient(self.config, self.logger)
-        self.text_processor = TextProcessor(self.logger)
+        start = self._mark_startup('ai_client', start)
+        clipboard_config = self.config.get_clipboard_config()
+        self.clipboard = ClipboardService(self.logger, clipboard_config['timeout'], clipboard_config['backend'])
+        self.text_processor = TextProcessor(self.logger, self.ai_client.token_budget.counter, self.clipboard)
+        self.text_processor.set_disclaimer_markers(self.config.get_compaction_config()['disclaimers'])
+        self._mark_startup('text_processor', start)
+        tracing_config = self.config.get_tracing_config()
+        self.tracer = Tracer(tracing_config['file'], tracing_config['enabled'])
+        self.metrics_server: Optional[MetricsServer] = None
+        self._lag_probe: Optional[EventLoopLagProbe] = None
+        self._start_metrics()
+        self.profiler: Optional[Profiler] = None
+        profiling_config = self.config.get_profiling_config()
+        if profiling_enabled(profiling_config['enabled']):
+            self.profiler = Profiler(profiling_config['dir'], profiling_config['memory_interval'])
+            self.profiler.start()
+            self.profiler.instrument(self.ai_client, 'process_text')
+            self.profiler.instrument(self.ai_client, 'stream_text')
+            self.logger.info("Profiling to %s", self.profiler.session_dir)
+        
+        # Apply edits to the config file without a restart
+        self.config.add_listener(self._on_config_change)
+        self.config.watch(
+            on_error=lambda e: self.logger.warning("Config reload failed, keeping current settings: %s", e))
         
         # UI components
-        self.main_window: Optional[MainWindow] = None
+        self.main_window: Optional['MainWindow'] = None
+        self.hotkeys: Optional['HotkeyDaemon'] = None
+        self._history: Optional['HistoryStore'] = None
         
         
         # Application state
@@ -33,12 +79,72 @@ class TextHelperAI:
         
         self.logger.info("Text Helper IA application initialized")
     
+    def _mark_startup(self, phase: str, start: float) -> float:
+        """Record the duration of a startup phase; returns the new start"""
+        now = time.perf_counter()
+        self.startup_timings[phase] = now - start
+        return now
+    
+    def _start_metrics(self):
+        """Serve the metrics registry on localhost if configured"""
+        metrics_config = self.config.get_metrics_config()
+        if not metrics_config['enabled']:
+            return
+        try:
+            self.metrics_server = MetricsServer(REGISTRY, metrics_config['host'], metrics_config['port'])
+        except OSError as e:
+            # Another instance may already serve the port
+            self.logger.warning("Metrics endpoint unavailable on port %s: %s", metrics_config['port'], e)
+            return
+        self.metrics_server.start()
+        self.logger.info("Metrics at http://%s:%s/metrics", self.metrics_server.host, self.metrics_server.port)
+    
+    def _on_config_change(self, old, new):
+        """Apply settings that live outside the per-request snapshot reads"""
+        if old.disclaimers != new.disclaimers:
+            self.text_processor.set_disclaimer_markers(new.disclaimers)
+        self.tracer.enabled = self.config.get_tracing_config()['enabled']
+        self.logger.info("Configuration reloaded")
+    
+    def _get_history(self) -> Optional['HistoryStore']:
+        """Request history store, opened on first use (None if disabled)"""
+        history_config = self.config.get_history_config()
+        if not history_config['enabled']:
+            return None
+        if self._history is None:
+            from .history import HistoryStore
+            self._history = HistoryStore(history_config['file'], history_config['max_entries'])
+        return self._history
+    
+    def _record_history(self, text: str, operation_type: str, result: str, model: str, latency_ms: float):
+        """Store a processed text in the history; failures only get logged
+        
+        Tokens are the ones the API reported for this thread's last request;
+        without an API call (local engine, cache hit) they are counted locally.
+        """
+        try:
+            history = self._get_history()
+            if not history:
+                return
+            usage = self.ai_client.last_usage()
+            if usage:
+                history.record(text, operation_type, result, usage['model'],
+                               usage['input_tokens'], usage['output_tokens'], latency_ms)
+            else:
+                history.record(text, operation_type, result, model,
+                               self.text_processor.count_tokens(text),
+                               self.text_processor.count_tokens(result), latency_ms)
+        except Exception as e:
+            self.logger.warning("Could not record history: %s", e)
+    
     def is_configured(self) -> bool:
         """Check if the application is properly configured"""
         return self.config.is_configured() and self.ai_client.is_configured()
     
     def show_config_dialog(self):
         """Show configuration dialog"""
+        from .ui.dialogs import ConfigDialog
+        
         if self.main_window:
             parent = self.main_window.root
         else:
@@ -46,22 +152,40 @@ class TextHelperAI:
         
         def on_save():
             """Callback when configuration is saved"""
-            self.ai_client._setup_clients()
-            self.logger.info("Configuration updated and IA client reinitialized")
+            # The AI client listens to the config and rebuilds itself if needed
+            self.logger.info("Configuration updated")
         
         config_dialog = ConfigDialog(parent, self.config, on_save, self.logger)
     
+    def show_history_panel(self):
+        """Show the history panel"""
+        from .ui.history_panel import HistoryPanel
+        
+        history = self._get_history()
+        if not history or not self.main_window:
+            return
+        HistoryPanel(self.main_window.root, history, self.clipboard.write_async, self.logger)
+    
     def show_main_window(self):
         """Show the main application window"""
+        from .ui.main_window import MainWindow
+        
         self.main_window = MainWindow(
             config=self.config,
             logger=self.logger,
             on_process_text=self.process_text_from_clipboard,
-            on_show_config=self.show_config_dialog
+            on_show_config=self.show_config_dialog,
+            on_show_history=self.show_history_panel if self.config.get_history_config()['enabled'] else None
         )
         
         # No global event handling needed - let system handle CTRL+C naturally
         
+        if self.profiler:
+            self.profiler.instrument_tk()
+        if self.metrics_server:
+            self._lag_probe = EventLoopLagProbe(self.main_window.root)
+            self._lag_probe.start()
+        
         self.logger.info("Main window created")
         self.main_window.show()
     
@@ -73,8 +197,8 @@ class TextHelperAI:
             self.logger.warning("Text processing already in progress")
             return
         
-        # Check if application is configured
-        if not self.is_configured():
+        # Check if application is configured (local backends work offline)
+        if not self.is_configured() and not self.ai_client.uses_local_backend(operation_type):
             self.logger.warning("Application not configured")
             if self.main_window:
                 self.main_window.show_error(
@@ -83,10 +207,19 @@ class TextHelperAI:
                 )
             return
         
+        # Phases on this thread, the worker and the posted UI callbacks all
+        # land in one trace for the job
+        trace = self.tracer.start(operation_type)
+        with activate(trace):
+            self._run_clipboard_job(operation_type, trace)
+    
+    def _run_clipboard_job(self, operation_type: str, trace):
+        """Ask for the text and process it in a worker thread (inside the job's trace)"""
         # For now, we'll use a simple text input dialog instead of clipboard
         # This prevents any system freezing issues
         import tkinter as tk
-        from tkinter import simpledialog
+        from .ui.dialogs import ErrorDialog, LoadingDialog
+        from .ui.dispatcher import get_dispatcher
         
         # Get parent window for dialog
         parent_window = None
@@ -97,9 +230,12 @@ class TextHelperAI:
             parent_window.withdraw()
         
         # Create simple input dialog with auto-paste (more stable)
-        selected_text = self._show_simple_input_dialog(parent_window)
+        with span('input_dialog'):
+            selected_text = self._show_simple_input_dialog(parent_window)
         
-        self.logger.info(f"Text received from dialog: '{selected_text[:100] if selected_text else 'None'}{'...' if selected_text and len(selected_text) > 100 else ''}'")
+        if self.logger.is_enabled_for(logging.INFO):
+            self.logger.info("Text received from dialog: %r (%d chars)", (selected_text or '')[:100],
+                             len(selected_text or ''))
         
         if not selected_text or not selected_text.strip():
             self.logger.warning("No text provided by user")
@@ -108,24 +244,37 @@ class TextHelperAI:
                     "Nenhum Texto Fornecido", 
                     "Nenhum texto foi fornecido. Por favor, digite ou cole o texto que deseja processar."
                 )
+            annotate(outcome='no_text')
+            self.tracer.finish(trace)
             return
         
         text_source = "manual"
         has_selection = False
         
-        # Validate text
-        if not self.text_processor.validate_text(selected_text):
+        # Clean text
+        cleaned_text = self.text_processor.clean_text(selected_text)
+        
+        # Strip quoted replies, signatures and disclaimers before validating
+        compaction_config = self.config.get_compaction_config()
+        compaction = None
+        if compaction_config['enabled']:
+            compaction = self.text_processor.compact_text(cleaned_text)
+            cleaned_text = compaction['text']
+        
+        # Validate text against the token limit of the configured model
+        model = self.config.get_openai_config()['model']
+        max_tokens = self.config.get_max_input_tokens(model)
+        if not self.text_processor.validate_text(cleaned_text, max_tokens):
             self.logger.warning("Invalid text provided")
             if self.main_window:
                 self.main_window.show_error(
                     "Texto Inválido", 
-                    "O texto deve ter entre 3 e 10.000 caracteres."
+                    f"O texto deve ter no mínimo 3 caracteres e no máximo {max_tokens} tokens."
                 )
+            annotate(outcome='invalid_text')
+            self.tracer.finish(trace)
             return
         
-        # Clean text
-        cleaned_text = self.text_processor.clean_text(selected_text)
-        
         # Get parent window for dialogs
         parent_window = None
         if self.main_window:
@@ -136,19 +285,40 @@ class TextHelperAI:
             parent_window = tk.Tk()
             parent_window.withdraw()
         
-        # Store reference to root window for thread-safe UI updates
-        root_window = parent_window
+        # Worker threads reach the UI only through the root's dispatcher
+        ui = get_dispatcher(parent_window, self.logger)
         
         # Show loading dialog
         source_text = "selecionado" if text_source == "selecionado" else "da área de transferência"
         loading_dialog = LoadingDialog(parent_window, f"Processando texto {source_text}...", self.logger)
         
+        # Offer a cached result for a near-duplicate input as an instant draft
+        draft_accepted = threading.Event()
+        with span('draft_lookup') as attributes:
+            draft = self.ai_client.get_draft(cleaned_text, operation_type)
+            if draft is None:
+                # Exact repeat of an earlier request, e.g. from a previous session
+                try:
+                    history = self._get_history()
+                    draft = history.lookup(cleaned_text, operation_type) if history else None
+                except Exception as e:
+                    self.logger.warning("History lookup failed: %s", e)
+            attributes['cache_hit'] = draft is not None
+        if draft:
+            def use_draft(draft_text):
+                draft_accepted.set()
+                if self.main_window:
+                    self.main_window.set_result(draft_text)
+                self._show_result_notification(draft_text, operation_type)
+            
+            loading_dialog.show_draft(draft, use_draft)
+        
         
         # Process in a separate thread to avoid blocking UI
         def process_in_thread():
             try:
                 self.is_processing = True
-                self.logger.info(f"Processing text with operation: {operation_type}")
+                self.logger.info("Processing text with operation: %s", operation_type)
                 
                 # Update loading status (thread-safe)
                 def update_loading_status(message):
@@ -156,22 +326,11 @@ class TextHelperAI:
                         if not loading_dialog._is_closed:
                             loading_dialog.update_status(message)
                     except Exception as e:
-                        self.logger.warning(f"Could not update loading status: {e}")
+                        self.logger.warning("Could not update loading status: %s", e)
                 
-                # Schedule UI updates on main thread
-                root_window.after(0, lambda: update_loading_status("Conectando com IA..."))
-                
-                # Process the text
-                root_window.after(0, lambda: update_loading_status("Processando com IA..."))
-                processed_text = self.ai_client.process_text(cleaned_text, operation_type)
-                
-                root_window.after(0, lambda: update_loading_status("Finalizando..."))
-                
-                # Handle result - show in dialog only (no clipboard operations to prevent freezing)
-                ui_config = self.config.get_ui_config()
-                
-                # No clipboard operations to prevent system freezing
-                self.logger.info("Text processed successfully (no clipboard operations to prevent freezing)")
+                # Schedule UI updates on main thread; only the latest status is shown
+                status_key = (loading_dialog, 'status')
+                ui.post(traced_callback('ui_status', lambda: update_loading_status("Conectando com IA...")), key=status_key)
                 
                 # Close loading dialog (thread-safe)
                 def close_loading_safe():
@@ -179,28 +338,58 @@ class TextHelperAI:
                         if not loading_dialog._is_closed:
                             loading_dialog.close()
                     except Exception as e:
-                        self.logger.warning(f"Could not close loading dialog: {e}")
+                        self.logger.warning("Could not close loading dialog: %s", e)
+                
+                # Process the text, streaming the reply into the result pane
+                ui.post(traced_callback('ui_status', lambda: update_loading_status("Processando com IA...")), key=status_key)
+                started = time.perf_counter()
+                with span('ai', operation=operation_type):
+                    if compaction and compaction_config['restore_stripped']:
+                        # Restoring needs the whole reply
+                        pieces = [self.text_processor.restore_compacted(
+                            self.ai_client.process_text(cleaned_text, operation_type), compaction)]
+                        if self.main_window and not draft_accepted.is_set():
+                            self.main_window.set_result(pieces[0])
+                    else:
+                        pieces = []
+                        for piece in self.ai_client.stream_text(cleaned_text, operation_type):
+                            if not pieces and not draft_accepted.is_set():
+                                ui.post(traced_callback('ui_close_loading', close_loading_safe))
+                                if self.main_window:
+                                    self.main_window.begin_result()
+                            pieces.append(piece)
+                            if self.main_window and not draft_accepted.is_set():
+                                self.main_window.append_result(piece)
+                processed_text = ''.join(pieces).strip()
+                latency_ms = (time.perf_counter() - started) * 1000
+                with span('history'):
+                    self._record_history(cleaned_text, operation_type, processed_text, model, latency_ms)
                 
-                root_window.after(0, close_loading_safe)
+                ui.post(traced_callback('ui_status', lambda: update_loading_status("Finalizando...")), key=status_key)
                 
-                # Show result in system notification (thread-safe)
+                ui.post(traced_callback('ui_close_loading', close_loading_safe))
+                
+                # Show result in system notification and copy it; the clipboard
+                # write runs on the clipboard thread, so the UI never waits (thread-safe)
                 def show_notification_safe():
                     try:
+                        if draft_accepted.is_set():
+                            self.logger.info("Draft accepted by user, final result not copied")
+                            return
                         if self.main_window:
-                            self.main_window.set_result(processed_text)
                             self._show_result_notification(processed_text, operation_type)
                     except Exception as e:
-                        self.logger.error(f"Error showing notification: {e}")
+                        self.logger.error("Error showing notification: %s", e)
                 
-                root_window.after(0, show_notification_safe)
+                ui.post(traced_callback('ui_show_result', show_notification_safe))
                 
                 # Reset processing status
                 self.is_processing = False
                 
-                self.logger.info(f"Text successfully processed: {operation_type}")
+                self.logger.info("Text successfully processed: %s", operation_type)
                 
             except Exception as e:
-                self.logger.error(f"Error processing text: {e}")
+                self.logger.error("Error processing text: %s", e)
                 
                 # Close loading dialog (thread-safe)
                 def close_loading_on_error():
@@ -208,9 +397,9 @@ class TextHelperAI:
                         if not loading_dialog._is_closed:
                             loading_dialog.close()
                     except Exception as e:
-                        self.logger.warning(f"Could not close loading dialog on error: {e}")
+                        self.logger.warning("Could not close loading dialog on error: %s", e)
                 
-                root_window.after(0, close_loading_on_error)
+                ui.post(traced_callback('ui_close_loading', close_loading_on_error))
                 
                 # Reset processing status
                 self.is_processing = False
@@ -220,12 +409,22 @@ class TextHelperAI:
                     try:
                         error_dialog = ErrorDialog(parent_window, str(e), self.logger)
                     except Exception as e2:
-                        self.logger.error(f"Error showing error dialog: {e2}")
+                        self.logger.error("Error showing error dialog: %s", e2)
                 
-                root_window.after(0, show_error_safe)
+                ui.post(traced_callback('ui_show_error', show_error_safe))
+                return e
+        
+        # The 'worker' span's wait_ms is the time until the thread ran
+        traced_worker = traced_callback('worker', process_in_thread)
+        
+        def run_worker():
+            error = traced_worker()
+            # The worker span is recorded by now, and the finish runs after
+            # the callbacks posted above, so all their spans are in the trace
+            ui.post(lambda: self.tracer.finish(trace, error))
         
         # Start processing in thread with proper cleanup
-        thread = threading.Thread(target=process_in_thread, name=f"TextProcessor-{operation_type}")
+        thread = threading.Thread(target=run_worker, name=f"TextProcessor-{operation_type}")
         thread.daemon = True
         thread.start()
         
@@ -239,6 +438,7 @@ class TextHelperAI:
         """Show improved simple input dialog with auto-paste functionality"""
         import tkinter as tk
         from tkinter import simpledialog
+        from .ui.dispatcher import get_dispatcher
         
         # Create a custom dialog that's more stable than the complex one
         dialog = tk.Toplevel(parent)
@@ -294,17 +494,11 @@ class TextHelperAI:
         text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Safe auto-paste clipboard content with conflict prevention
-        def safe_auto_paste():
+        # Auto-paste clipboard content; the read runs on the clipboard thread
+        def insert_clipboard(clipboard_content):
             try:
-                # Small delay to ensure dialog is fully initialized
-                import time
-                time.sleep(0.05)
-                
-                # Try to get clipboard content safely
-                import pyperclip
-                clipboard_content = pyperclip.paste()
-                
+                if not dialog.winfo_exists():
+                    return
                 if clipboard_content and clipboard_content.strip():
                     # Only paste if text widget is empty and ready
                     current_content = text_widget.get("1.0", tk.END).strip()
@@ -320,10 +514,15 @@ class TextHelperAI:
                     self.logger.info("Clipboard empty, no auto-paste")
                     
             except Exception as e:
-                self.logger.warning(f"Could not auto-paste clipboard safely: {e}")
+                self.logger.warning("Could not auto-paste clipboard safely: %s", e)
+        
+        # The read completes on the clipboard thread
+        ui = get_dispatcher(dialog, self.logger)
+        
+        def schedule_insert(clipboard_content):
+            ui.post(insert_clipboard, clipboard_content)
         
-        # Schedule auto-paste with delay to prevent conflicts
-        dialog.after(50, safe_auto_paste)
+        self.clipboard.read_async(schedule_insert)
         
         # Focus on text widget
         text_widget.focus_set()
@@ -406,16 +605,24 @@ class TextHelperAI:
     
     def _paste_clipboard(self, text_widget):
         """Paste clipboard content into text widget"""
-        try:
-            import tkinter as tk
-            import pyperclip
-            clipboard_content = pyperclip.paste()
-            if clipboard_content:
-                text_widget.delete("1.0", tk.END)
-                text_widget.insert(tk.END, clipboard_content.strip())
-                self.logger.info("Manually pasted clipboard content")
-        except Exception as e:
-            self.logger.error(f"Error pasting clipboard: {e}")
+        import tkinter as tk
+        from .ui.dispatcher import get_dispatcher
+        
+        def insert_clipboard(clipboard_content):
+            try:
+                if clipboard_content:
+                    text_widget.delete("1.0", tk.END)
+                    text_widget.insert(tk.END, clipboard_content.strip())
+                    self.logger.info("Manually pasted clipboard content")
+            except Exception as e:
+                self.logger.error("Error pasting clipboard: %s", e)
+        
+        ui = get_dispatcher(text_widget, self.logger)
+        
+        def schedule_insert(clipboard_content):
+            ui.post(insert_clipboard, clipboard_content)
+        
+        self.clipboard.read_async(schedule_insert)
     
     def _clear_text_widget(self, text_widget):
         """Clear text widget content"""
@@ -425,7 +632,7 @@ class TextHelperAI:
             text_widget.focus_set()
             self.logger.info("Text widget cleared")
         except Exception as e:
-            self.logger.error(f"Error clearing text widget: {e}")
+            self.logger.error("Error clearing text widget: %s", e)
     
     def _close_simple_dialog(self, dialog, text_widget):
         """Close simple dialog and return result"""
@@ -434,12 +641,14 @@ class TextHelperAI:
                 # Get all text content
                 content = text_widget.get("1.0", "end-1c")
                 self._simple_dialog_result = content.strip() if content else None
-                self.logger.info(f"Simple dialog result: '{self._simple_dialog_result[:50]}{'...' if len(self._simple_dialog_result) > 50 else ''}'")
+                if self.logger.is_enabled_for(logging.INFO):
+                    result = self._simple_dialog_result or ''
+                    self.logger.info("Simple dialog result: %r (%d chars)", result[:50], len(result))
             else:
                 self._simple_dialog_result = None
                 self.logger.info("Simple dialog cancelled")
         except Exception as e:
-            self.logger.error(f"Error getting text from simple dialog: {e}")
+            self.logger.error("Error getting text from simple dialog: %s", e)
             self._simple_dialog_result = None
         finally:
             dialog.destroy()
@@ -451,12 +660,14 @@ class TextHelperAI:
                 # Get all text content
                 content = text_widget.get("1.0", "end-1c")
                 self._dialog_result = content.strip() if content else None
-                self.logger.info(f"Dialog result: '{self._dialog_result[:50]}{'...' if len(self._dialog_result) > 50 else ''}'")
+                if self.logger.is_enabled_for(logging.INFO):
+                    result = self._dialog_result or ''
+                    self.logger.info("Dialog result: %r (%d chars)", result[:50], len(result))
             else:
                 self._dialog_result = None
                 self.logger.info("Dialog cancelled")
         except Exception as e:
-            self.logger.error(f"Error getting text from dialog: {e}")
+            self.logger.error("Error getting text from dialog: %s", e)
             self._dialog_result = None
         finally:
             # Ensure proper cleanup to prevent dialog freeze
@@ -473,15 +684,175 @@ class TextHelperAI:
             except:
                 pass  # Ignore errors during cleanup
     
+    def process_file(self, operation_type: str, input_path: str, output_path: str):
+        """Process a text file chunk by chunk, writing results incrementally"""
+        # Chunks must fit the model input budget left by prompts and output
+        chunk_tokens = self.ai_client.preflight('', operation_type)['max_input_tokens']
+        pipeline = FilePipeline(self.ai_client, self.text_processor, self.logger, chunk_tokens=chunk_tokens)
+        return pipeline.run(input_path, output_path, operation_type)
+    
+    def run_batch(self, argv) -> int:
+        """Run a resumable batch job: `batch INPUT OUTPUT [--operation OP] [--workers N]`
+        
+        Returns:
+            Process exit code (1 if any record failed)
+        """
+        batch_config = self.config.get_batch_config()
+        parser = argparse.ArgumentParser(prog='text_helper_ia.py batch')
+        parser.add_argument('input', help="registros JSONL ou CSV (campos text, id, operation)")
+        parser.add_argument('output', help="resultados JSONL")
+        parser.add_argument('--operation', default=batch_config['operation'])
+        parser.add_argument('--workers', type=int, default=batch_config['workers'])
+        parser.add_argument('--no-resume', action='store_true', help="ignorar o checkpoint anterior")
+        args = parser.parse_args(argv)
+        
+        last_print = [0.0]
+        
+        def show_progress(progress):
+            now = time.monotonic()
+            if now - last_print[0] < 0.5 and progress['done'] < progress['total']:
+                return
+            last_print[0] = now
+            eta = f"{progress['eta']:.0f}s" if progress['eta'] is not None else "?"
+            print(f"\r{progress['done']}/{progress['total']} registros, {progress['rate']:.1f}/s, "
+                  f"ETA {eta}, {progress['errors']} erros", end='', file=sys.stderr, flush=True)
+        
+        runner = BatchRunner(self.config, self.ai_client, self.text_processor, self.logger,
+                             max_workers=args.workers, progress=show_progress)
+        stats = runner.run(args.input, args.output, args.operation, resume=not args.no_resume)
+        print(f"\n{stats['records']} registros ({stats['resumed']} retomados, {stats['unique']} chamadas, "
+              f"{stats['errors']} erros) em {stats['elapsed']:.1f}s -> {args.output}", file=sys.stderr)
+        return 1 if stats['errors'] else 0
+    
+    def run_server(self, argv):
+        """Serve the operations over HTTP: `serve [--host H] [--port P]`"""
+        from .server import TextHelperServer
+        
+        server_config = self.config.get_server_config()
+        parser = argparse.ArgumentParser(prog='text_helper_ia.py serve')
+        parser.add_argument('--host', default=server_config['host'])
+        parser.add_argument('--port', type=int, default=server_config['port'])
+        parser.add_argument('--max-concurrency', type=int, default=server_config['max_concurrency'])
+        args = parser.parse_args(argv)
+        
+        server = TextHelperServer(
+            self.config, self.ai_client, self.text_processor, self.logger,
+            args.host, args.port, args.max_concurrency, server_config['max_queue']
+        )
+        self.ai_client.warm_up()
+        print(f"API HTTP em http://{args.host}:{args.port}. Ctrl+C para sair.")
+        server.serve_forever()
+    
+    def start_hotkeys(self) -> bool:
+        """Start the global hotkey daemon"""
+        from .hotkeys import HotkeyDaemon
+        
+        self.hotkeys = HotkeyDaemon(self.config, self.ai_client, self.text_processor, self.logger)
+        return self.hotkeys.start()
+    
+    def run_hotkeys(self):
+        """Run only the hotkey daemon, without any window"""
+        if not self.start_hotkeys():
+            raise Exception("Atalhos globais indisponíveis (pynput instalado e atalhos configurados?)")
+        print("Atalhos globais ativos. Ctrl+C para sair.")
+        for chord, operation in self.hotkeys.get_bindings().items():
+            print(f"  {chord}: {operation}")
+        self.hotkeys.join()
+    
+    def run_daemon(self):
+        """Serve operations to `--send` clients until interrupted"""
+        daemon_config = self.config.get_daemon_config()
+        daemon = TextHelperDaemon(
+            self.config, self.ai_client, self.text_processor, self.logger,
+            daemon_config['socket_path'], daemon_config['workers']
+        )
+        daemon.bind()
+        self.ai_client.warm_up()
+        print(f"Daemon ativo em {daemon.socket_path}. Ctrl+C para sair.")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            daemon.stop()
+    
+    def run_headless(self, operation_type: str) -> int:
+        """Process stdin to stdout without loading Tk
+        
+        Returns:
+            Process exit code
+        """
+        text = sys.stdin.read()
+        try:
+            with self.tracer.job(operation_type, 'headless'):
+                result = run_operation(self.config, self.ai_client, self.text_processor, text, operation_type)
+        except Exception as e:
+            self.logger.error("Headless %s failed: %s", operation_type, e)
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+        sys.stdout.write(result)
+        if not result.endswith('\n'):
+            sys.stdout.write('\n')
+        return 0
+    
+    def run_trace_report(self, argv) -> int:
+        """Print latency percentiles per operation and phase: `--trace-report [FILE]`"""
+        path = argv[0] if argv else self.tracer.path
+        try:
+            traces = load_traces(path)
+        except OSError as e:
+            print(f"Não foi possível ler {path}: {e}", file=sys.stderr)
+            return 1
+        if not traces:
+            print(f"Nenhum trace em {path}. Ative [TRACING] enabled = true e processe alguns textos.")
+            return 0
+        print(f"{len(traces)} traces em {path}\n")
+        print(format_report(summarize(traces)), end='')
+        return 0
+    
+    def run_usage_report(self, argv) -> int:
+        """Print token and cost totals and the budget state: `--usage-report [--days N]`"""
+        from .usage import format_report
+        
+        parser = argparse.ArgumentParser(prog='text_helper_ia.py --usage-report')
+        parser.add_argument('--days', type=int, default=30)
+        args = parser.parse_args(argv)
+        
+        if not self.ai_client.usage:
+            print("Contabilização de uso desativada ([USAGE] enabled = false).", file=sys.stderr)
+            return 1
+        print(format_report(self.ai_client.usage, self.config.snapshot().budget, max(1, args.days)), end='')
+        return 0
+    
+    def run_profile_report(self, argv) -> int:
+        """Print top functions and allocation sites: `--profile-report [SESSION_DIR] [--top N]`"""
+        from .profiling import format_report
+        
+        parser = argparse.ArgumentParser(prog='text_helper_ia.py --profile-report')
+        parser.add_argument('session', nargs='?', help="diretório da sessão (padrão: a mais recente)")
+        parser.add_argument('--top', type=int, default=20)
+        args = parser.parse_args(argv)
+        
+        session = args.session or latest_session(self.config.get_profiling_config()['dir'])
+        if not session or not os.path.isdir(session):
+            print("Nenhuma sessão de profiling. Ative [PROFILING] enabled = true ou TEXT_HELPER_PROFILE=1.",
+                  file=sys.stderr)
+            return 1
+        print(format_report(session, args.top), end='')
+        return 0
+    
     def run(self, show_config: bool = False):
         """Run the application"""
         try:
+            # GUI sessions usually have no terminal; keep only the log file
+            if not self.config.get_logging_config()['console_in_gui']:
+                self.logger.set_console(False)
+            if not show_config and self.config.get_hotkeys_config()['enabled']:
+                self.start_hotkeys()
             if show_config:
                 self.show_config_dialog()
             else:
                 self.show_main_window()
         except Exception as e:
-            self.logger.error(f"Error running application: {e}")
+            self.logger.error("Error running application: %s", e)
             raise
     
     
@@ -509,24 +880,21 @@ class TextHelperAI:
             
             operation_name = operation_names.get(operation_type, operation_type)
             
-            # Copy to clipboard automatically
-            import pyperclip
-            pyperclip.copy(processed_text)
+            # Copy to clipboard automatically (off the UI thread)
+            self.clipboard.write_async(processed_text)
             
-            # Minimize main window for better productivity (no dialog needed)
             if self.main_window:
-                self.main_window.root.iconify()  # Minimize the window
                 self.main_window.update_status(f"Texto {operation_name}! Resultado copiado para clipboard.", '#28a745')
                 
             
-            self.logger.info(f"Result notification shown for operation: {operation_type}")
+            self.logger.info("Result notification shown for operation: %s", operation_type)
             
         except ImportError:
             # Fallback if plyer is not available
             self.logger.warning("Plyer not available, using fallback notification")
             self._show_fallback_notification(processed_text, operation_type)
         except Exception as e:
-            self.logger.error(f"Error showing notification: {e}")
+            self.logger.error("Error showing notification: %s", e)
             self._show_fallback_notification(processed_text, operation_type)
     
     def _show_fallback_notification(self, processed_text, operation_type):
@@ -552,19 +920,16 @@ class TextHelperAI:
             
             operation_name = operation_names.get(operation_type, operation_type)
             
-            # Copy to clipboard
-            import pyperclip
-            pyperclip.copy(processed_text)
+            # Copy to clipboard (off the UI thread)
+            self.clipboard.write_async(processed_text)
             
-            # Minimize main window for better productivity (no dialog needed)
             if self.main_window:
-                self.main_window.root.iconify()  # Minimize the window
                 self.main_window.update_status(f"Texto {operation_name}! Resultado copiado para clipboard.", '#28a745')
             
-            self.logger.info(f"Fallback notification shown for operation: {operation_type}")
+            self.logger.info("Fallback notification shown for operation: %s", operation_type)
             
         except Exception as e:
-            self.logger.error(f"Error showing fallback notification: {e}")
+            self.logger.error("Error showing fallback notification: %s", e)
             # Last resort - just update status
             if self.main_window:
                 self.main_window.update_status(f"Texto processado! Verifique a janela principal.", '#28a745')
@@ -580,7 +945,7 @@ class TextHelperAI:
                 try:
                     self.main_window.close()
                 except Exception as e:
-                    self.logger.warning(f"Error closing main window: {e}")
+                    self.logger.warning("Error closing main window: %s", e)
             
             # Wait for threads to finish (with timeout)
             if hasattr(self, '_processing_threads'):
@@ -588,11 +953,40 @@ class TextHelperAI:
                     if thread.is_alive():
                         thread.join(timeout=2.0)  # Wait max 2 seconds
                         if thread.is_alive():
-                            self.logger.warning(f"Thread {thread.name} did not finish in time")
+                            self.logger.warning("Thread %s did not finish in time", thread.name)
+            
+            # Stop global hotkeys
+            if self.hotkeys:
+                self.hotkeys.stop()
             
-            # Force cleanup of any remaining tkinter windows
+            # Release clipboard ownership
+            self.clipboard.stop()
+            
+            self.config.stop_watching()
+            self.tracer.close()
+            if self._history:
+                self._history.close()
+            if self.ai_client.usage:
+                self.ai_client.usage.close()
+            
+            if self._lag_probe:
+                self._lag_probe.stop()
+            if self.profiler:
+                summary = self.profiler.stop()
+                self.logger.info("Profile written to %s (%d calls, %d skipped, %d memory snapshots)",
+                                 summary['dir'], summary['captured'], summary['skipped'], summary['snapshots'])
+            if self.metrics_server:
+                self.metrics_server.stop()
+            dump_file = self.config.get_metrics_config()['dump_file']
+            if dump_file:
+                try:
+                    REGISTRY.dump(dump_file)
+                except OSError as e:
+                    self.logger.warning("Could not write metrics to %s: %s", dump_file, e)
+            
+            # Force cleanup of any remaining tkinter windows (if Tk was ever loaded)
             try:
-                import tkinter as tk
+                tk = sys.modules.get('tkinter')
                 for widget in tk._default_root.winfo_children() if tk._default_root else []:
                     try:
                         widget.destroy()
@@ -603,7 +997,10 @@ class TextHelperAI:
             
             self.logger.info("Application cleanup completed")
         except Exception as e:
-            self.logger.error(f"Error during cleanup: {e}")
+            self.logger.error("Error during cleanup: %s", e)
+        finally:
+            # Drain queued log records before the process exits
+            self.logger.close()
 
 
 def main():
@@ -612,6 +1009,54 @@ def main():
     try:
         app = TextHelperAI()
         
+        # File mode: text_helper_ia.py --process-file OPERATION INPUT OUTPUT
+        if len(sys.argv) > 1 and sys.argv[1] == '--process-file':
+            if len(sys.argv) != 5:
+                print("Uso: text_helper_ia.py --process-file OPERACAO ENTRADA SAIDA")
+                sys.exit(2)
+            stats = app.process_file(sys.argv[2], sys.argv[3], sys.argv[4])
+            print(f"{stats['chunks']} blocos processados ({stats['resumed']} retomados) "
+                  f"em {stats['elapsed']:.1f}s -> {sys.argv[4]}")
+            return
+        
+        # Batch mode: text_helper_ia.py batch INPUT OUTPUT [--operation OP] [--workers N]
+        if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+            sys.exit(app.run_batch(sys.argv[2:]))
+        
+        # Server mode: local HTTP API for other tools
+        if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+            app.run_server(sys.argv[2:])
+            return
+        
+        # Usage report: tokens and cost per day, operation and model
+        if len(sys.argv) > 1 and sys.argv[1] == '--usage-report':
+            sys.exit(app.run_usage_report(sys.argv[2:]))
+        
+        # Profile report: top functions and allocation sites of the last session
+        if len(sys.argv) > 1 and sys.argv[1] == '--profile-report':
+            sys.exit(app.run_profile_report(sys.argv[2:]))
+        
+        # Trace report: latency percentiles from the tracing file
+        if len(sys.argv) > 1 and sys.argv[1] == '--trace-report':
+            sys.exit(app.run_trace_report(sys.argv[2:]))
+        
+        # Headless mode: stdin -> operation -> stdout, no Tk
+        if len(sys.argv) > 1 and sys.argv[1] == '--headless':
+            if len(sys.argv) != 3:
+                print("Uso: text_helper_ia.py --headless OPERACAO < entrada", file=sys.stderr)
+                sys.exit(2)
+            sys.exit(app.run_headless(sys.argv[2]))
+        
+        # Daemon mode: serve `--send` clients over a Unix socket
+        if len(sys.argv) > 1 and sys.argv[1] == '--daemon':
+            app.run_daemon()
+            return
+        
+        # Hotkey mode: only the global hotkey daemon, no window
+        if len(sys.argv) > 1 and sys.argv[1] == '--hotkeys':
+            app.run_hotkeys()
+            return
+        
         # Check command line arguments
         show_config = len(sys.argv) > 1 and sys.argv[1] == '--config'
         
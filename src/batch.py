@@ -0,0 +1,255 @@
+"""
+Resumable batch runner for JSONL/CSV record files
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from .config import Config
+from .ia_client import AIClient
+from .logger import Logger
+from .operations import run_operation
+from .text_processor import TextProcessor
+
+
+class BatchRunner:
+    """Run every record of a JSONL or CSV file through an operation
+
+    Input records carry 'text' plus optional 'id' and 'operation' (which
+    overrides the job default). Identical (operation, text) pairs are sent
+    once and the result is written for each of their records.
+
+    Results are appended to the output JSONL as they complete, so the order
+    follows completion, not input. A journal next to the output lists the
+    records already written and the committed output size; re-running the
+    same job truncates any half-written line and resumes with the rest.
+    Records that failed are retried on resume: a 429 or a network outage
+    during an overnight run should not leave permanent error lines.
+    """
+
+    def __init__(self, config: Config, ai_client: AIClient, text_processor: TextProcessor,
+                 logger: Logger, max_workers: int = 4,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.config = config
+        self.ai_client = ai_client
+        self.text_processor = text_processor
+        self.logger = logger
+        self.max_workers = max_workers
+        self.progress = progress
+
+    # Input
+
+    def read_records(self, input_path: str, operation_type: str) -> List[Dict[str, Any]]:
+        """Read and check all records (CSV by extension, JSONL otherwise)
+
+        Raises:
+            ValueError: If a record is malformed or has no text
+        """
+        with open(input_path, 'r', encoding='utf-8', newline='') as f:
+            if input_path.lower().endswith('.csv'):
+                rows = [(line, row) for line, row in enumerate(csv.DictReader(f), start=2)]
+            else:
+                rows = []
+                for line, raw in enumerate(f, start=1):
+                    if not raw.strip():
+                        continue
+                    try:
+                        rows.append((line, json.loads(raw)))
+                    except ValueError as e:
+                        raise ValueError(f"{input_path}:{line}: invalid JSON ({e})") from e
+
+        records = []
+        for line, row in rows:
+            if not isinstance(row, dict) or not isinstance(row.get('text'), str):
+                raise ValueError(f"{input_path}:{line}: record without 'text'")
+            record_id = row.get('id')
+            records.append({
+                'id': len(records) + 1 if record_id in (None, '') else record_id,
+                'operation': row.get('operation') or operation_type,
+                'text': row['text']
+            })
+        return records
+
+    @staticmethod
+    def group_duplicates(records: List[Dict[str, Any]]) -> Dict[Tuple[str, str], List[int]]:
+        """Map each distinct (operation, text) to the indices of its records"""
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for index, record in enumerate(records):
+            groups.setdefault((record['operation'], record['text']), []).append(index)
+        return groups
+
+    # Run
+
+    def run(self, input_path: str, output_path: str, operation_type: str, resume: bool = True) -> Dict[str, Any]:
+        """Run the job, resuming from the journal when possible"""
+        start_time = time.time()
+        journal_path = output_path + '.journal'
+        signature = self._input_signature(input_path, operation_type)
+        records = self.read_records(input_path, operation_type)
+
+        done: Set[int] = set()
+        output_bytes = 0
+        if resume and os.path.exists(output_path):
+            done, failed, output_bytes = self._load_journal(journal_path, signature)
+            if failed:
+                self.logger.info("Retrying %s failed records", len(failed))
+                output_bytes = self._drop_error_lines(output_path, output_bytes)
+            if done:
+                self.logger.info("Resuming %s: %s of %s records already written", input_path, len(done), len(records))
+        if not done:
+            output_bytes = 0
+        self._start_journal(journal_path, signature, done, output_bytes)
+
+        pending = [
+            (key, indices) for key, indices in self.group_duplicates(records).items()
+            if not all(index in done for index in indices)
+        ]
+        stats = {
+            'records': len(records),
+            'unique': len(pending),
+            'resumed': len(done),
+            'written': 0,
+            'errors': 0
+        }
+
+        with open(output_path, 'r+b' if output_bytes else 'wb') as out, \
+                open(journal_path, 'a', encoding='utf-8') as journal, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='Batch') as executor:
+            out.truncate(output_bytes)
+            out.seek(output_bytes)
+            queue = iter(pending)
+            in_flight = {}
+
+            def fill():
+                # Only max_workers requests are queued at a time
+                for key, indices in queue:
+                    future = executor.submit(run_operation, self.config, self.ai_client,
+                                             self.text_processor, key[1], key[0])
+                    in_flight[future] = indices
+                    if len(in_flight) >= self.max_workers:
+                        return
+
+            fill()
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    indices = in_flight.pop(future)
+                    entry = {'records': indices}
+                    try:
+                        outcome = {'result': future.result()}
+                    except Exception as e:
+                        entry['error'] = True
+                        outcome = {'error': str(e)}
+                        stats['errors'] += len(indices)
+                        self.logger.warning("Batch record %s failed: %s", records[indices[0]]['id'], e)
+
+                    data = b''.join(
+                        self._encode_line(records[index], outcome) for index in indices
+                    )
+                    out.write(data)
+                    out.flush()
+                    os.fsync(out.fileno())
+                    output_bytes += len(data)
+                    entry['output_bytes'] = output_bytes
+                    journal.write(json.dumps(entry) + '\n')
+                    journal.flush()
+                    stats['written'] += len(indices)
+                    self._report(stats, start_time)
+                fill()
+
+        # Finished: the journal is only needed for interrupted runs
+        if os.path.exists(journal_path):
+            os.unlink(journal_path)
+
+        stats['elapsed'] = time.time() - start_time
+        self.logger.info("Batch finished: %s", stats)
+        return stats
+
+    def _report(self, stats: Dict[str, Any], start_time: float) -> None:
+        """Send throughput, ETA and error counts to the progress callback"""
+        if self.progress is None:
+            return
+        elapsed = time.time() - start_time
+        remaining = stats['records'] - stats['resumed'] - stats['written']
+        rate = stats['written'] / elapsed if elapsed > 0 else 0.0
+        self.progress({
+            'done': stats['resumed'] + stats['written'],
+            'total': stats['records'],
+            'errors': stats['errors'],
+            'rate': rate,
+            'eta': remaining / rate if rate > 0 else None
+        })
+
+    @staticmethod
+    def _encode_line(record: Dict[str, Any], outcome: Dict[str, str]) -> bytes:
+        """Encode one output line"""
+        line = {'id': record['id'], 'operation': record['operation']}
+        line.update(outcome)
+        return (json.dumps(line, ensure_ascii=False) + '\n').encode('utf-8')
+
+    # Journal
+
+    @staticmethod
+    def _input_signature(input_path: str, operation_type: str) -> Dict[str, Any]:
+        """Identify an input file and default operation for resume checks"""
+        stat = os.stat(input_path)
+        return {
+            'path': os.path.abspath(input_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'operation': operation_type
+        }
+
+    @staticmethod
+    def _start_journal(journal_path: str, signature: Dict[str, Any], done: Set[int], output_bytes: int) -> None:
+        """Rewrite the journal compactly: signature, then the resumed records"""
+        with open(journal_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'signature': signature}) + '\n')
+            if done:
+                f.write(json.dumps({'records': sorted(done), 'output_bytes': output_bytes}) + '\n')
+
+    @staticmethod
+    def _load_journal(journal_path: str, signature: Dict[str, Any]) -> Tuple[Set[int], Set[int], int]:
+        """Load written and failed records and the committed output size
+
+        A line cut short by a crash is ignored, and so is a journal written
+        for another input or operation.
+        """
+        done: Set[int] = set()
+        failed: Set[int] = set()
+        output_bytes = 0
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return done, failed, 0
+        try:
+            if not lines or json.loads(lines[0]).get('signature') != signature:
+                return done, failed, 0
+        except ValueError:
+            return done, failed, 0
+        for raw in lines[1:]:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                break
+            (failed if entry.get('error') else done).update(entry['records'])
+            output_bytes = entry['output_bytes']
+        return done, failed, output_bytes
+
+    @staticmethod
+    def _drop_error_lines(output_path: str, output_bytes: int) -> int:
+        """Remove the error lines from the committed output; returns its new size"""
+        with open(output_path, 'rb') as f:
+            committed = f.read(output_bytes)
+        kept = b''.join(line for line in committed.splitlines(keepends=True)
+                        if 'error' not in json.loads(line))
+        temp_path = output_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(kept)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
+        return len(kept)
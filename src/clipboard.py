@@ -0,0 +1,285 @@
+"""
+Non-blocking clipboard service with a long-lived selection owner
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+from .logger import Logger
+
+
+CLIPBOARD = 'CLIPBOARD'
+PRIMARY = 'PRIMARY'
+
+# How often the owner thread services selection requests from other apps
+_PUMP_INTERVAL = 0.05
+
+# Queue sentinel that stops the worker
+_STOP = object()
+
+
+class _TkBackend:
+    """Clipboard access through a hidden Tk root owned by the worker thread
+
+    The root stays alive, so it keeps owning the selections it set and
+    serves other applications' paste requests (INCR transfers included)
+    without spawning an xclip process per call.
+    """
+
+    name = 'tk'
+
+    def __init__(self):
+        import tkinter
+        self._tcl_error = tkinter.TclError
+        self.root = tkinter.Tk()
+        self.root.withdraw()
+        self._primary_text = ''
+
+    def read(self, selection: str) -> Optional[str]:
+        """Read a selection as text"""
+        for target in ('UTF8_STRING', 'STRING'):
+            try:
+                return self.root.selection_get(selection=selection, type=target)
+            except self._tcl_error:
+                continue
+        return None
+
+    def write(self, text: str, selection: str) -> None:
+        """Take ownership of a selection with text"""
+        if selection == CLIPBOARD:
+            self.root.clipboard_clear()
+            self.root.clipboard_append(text)
+        else:
+            # Served in chunks by Tk, so multi-megabyte text is fine
+            self._primary_text = text
+            self.root.selection_handle(self._serve_primary, selection=selection)
+            self.root.selection_own(selection=selection)
+        self.root.update()
+
+    def _serve_primary(self, offset: str, length: str) -> str:
+        """Selection handler: return one chunk of the PRIMARY text"""
+        start = int(offset)
+        return self._primary_text[start:start + int(length)]
+
+    def pump(self) -> None:
+        """Process pending selection requests"""
+        self.root.update()
+
+    def close(self) -> None:
+        """Release the selections and destroy the root"""
+        self.root.destroy()
+
+
+class _PyperclipBackend:
+    """Fallback through pyperclip when Tk has no display"""
+
+    name = 'pyperclip'
+
+    def __init__(self):
+        import pyperclip
+        self._pyperclip = pyperclip
+
+    def read(self, selection: str) -> Optional[str]:
+        """Read a selection (PRIMARY only where pyperclip supports it)"""
+        if selection == PRIMARY:
+            try:
+                return self._pyperclip.paste(primary=True)
+            except TypeError:
+                return None
+        return self._pyperclip.paste()
+
+    def write(self, text: str, selection: str) -> None:
+        """Write a selection (PRIMARY only where pyperclip supports it)"""
+        if selection == PRIMARY:
+            try:
+                self._pyperclip.copy(text, primary=True)
+            except TypeError:
+                pass
+            return
+        self._pyperclip.copy(text)
+
+    def pump(self) -> None:
+        """Nothing to serve: pyperclip's helper processes own the data"""
+
+    def close(self) -> None:
+        """Nothing to release"""
+
+
+_BACKENDS = {
+    'tk': _TkBackend,
+    'pyperclip': _PyperclipBackend
+}
+
+
+class ClipboardService:
+    """Read and write PRIMARY and CLIPBOARD off the UI thread
+
+    All clipboard calls run on one worker thread that also owns the
+    selections. Callers wait at most `timeout` seconds; the *_async methods
+    never wait and hand the result to a callback on the worker thread. A
+    worker stuck in a call for more than two timeouts is abandoned and a
+    fresh one takes over.
+    """
+
+    def __init__(self, logger: Logger, timeout: float = 2.0, backend: str = 'auto'):
+        self.logger = logger
+        self.timeout = timeout
+        self.backend_name = backend
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._busy_since: Optional[float] = None
+        self._generation = 0
+
+    def _create_backend(self):
+        """Create the configured backend, falling back to pyperclip"""
+        names = ['tk', 'pyperclip'] if self.backend_name == 'auto' else [self.backend_name]
+        for name in names:
+            try:
+                backend = _BACKENDS[name]()
+                self.logger.info("Clipboard backend: %s", name)
+                return backend
+            except Exception as e:
+                self.logger.warning("Clipboard backend '%s' unavailable: %s", name, e)
+        return None
+
+    def _ensure_worker(self) -> queue.Queue:
+        """Start the worker thread, replacing it if it is stuck"""
+        with self._lock:
+            stuck = (self._busy_since is not None and
+                     time.monotonic() - self._busy_since > 2 * self.timeout)
+            if stuck:
+                self.logger.error("Clipboard worker stuck, starting a new one")
+            if self._thread is None or not self._thread.is_alive() or stuck:
+                self._generation += 1
+                self._busy_since = None
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._queue, self._generation),
+                    name='ClipboardOwner',
+                    daemon=True
+                )
+                self._thread.start()
+            return self._queue
+
+    def _run(self, requests: queue.Queue, generation: int) -> None:
+        """Worker loop: serve requests and keep selections alive"""
+        backend = self._create_backend()
+        while self._generation == generation:
+            try:
+                request = requests.get(timeout=_PUMP_INTERVAL)
+            except queue.Empty:
+                request = None
+
+            if request is not None:
+                if request is _STOP:
+                    break
+                operation, args, future = request
+                if future.set_running_or_notify_cancel():
+                    with self._lock:
+                        if self._generation == generation:
+                            self._busy_since = time.monotonic()
+                    try:
+                        if backend is None:
+                            raise RuntimeError("no clipboard backend available")
+                        future.set_result(getattr(backend, operation)(*args))
+                    except Exception as e:
+                        future.set_exception(e)
+                    finally:
+                        with self._lock:
+                            if self._generation == generation:
+                                self._busy_since = None
+
+            if backend is not None:
+                try:
+                    backend.pump()
+                except Exception as e:
+                    self.logger.warning("Clipboard backend failed, reopening: %s", e)
+                    backend = self._create_backend()
+
+        if backend is not None:
+            try:
+                backend.close()
+            except Exception:
+                pass
+
+    def _submit(self, operation: str, *args: Any) -> Future:
+        """Queue an operation for the worker thread"""
+        future: Future = Future()
+        self._ensure_worker().put((operation, args, future))
+        return future
+
+    def _wait(self, future: Future, timeout: Optional[float], description: str) -> Any:
+        """Wait for a future with a hard timeout"""
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.logger.warning("Clipboard %s timed out", description)
+            raise
+
+    def read(self, selection: str = CLIPBOARD, timeout: Optional[float] = None) -> Optional[str]:
+        """Read a selection, waiting at most timeout seconds
+
+        Returns:
+            The selection text, or None if it is empty, unavailable or timed out
+        """
+        try:
+            return self._wait(self._submit('read', selection), timeout, f"read of {selection}")
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            self.logger.error("Error reading %s: %s", selection, e)
+            return None
+
+    def write(self, text: str, selection: str = CLIPBOARD, timeout: Optional[float] = None) -> bool:
+        """Write a selection, waiting at most timeout seconds"""
+        try:
+            self._wait(self._submit('write', text, selection), timeout, f"write of {selection}")
+            return True
+        except FutureTimeoutError:
+            return False
+        except Exception as e:
+            self.logger.error("Error writing %s: %s", selection, e)
+            return False
+
+    def read_async(self, callback: Callable[[Optional[str]], None], selection: str = CLIPBOARD) -> Future:
+        """Read a selection without waiting; callback gets the text or None"""
+        future = self._submit('read', selection)
+
+        def done(f: Future) -> None:
+            try:
+                text = None if f.cancelled() or f.exception() else f.result()
+            except Exception:
+                text = None
+            callback(text)
+
+        future.add_done_callback(done)
+        return future
+
+    def write_async(self, text: str, selection: str = CLIPBOARD,
+                    callback: Optional[Callable[[bool], None]] = None) -> Future:
+        """Write a selection without waiting; callback gets success"""
+        future = self._submit('write', text, selection)
+
+        def done(f: Future) -> None:
+            success = not f.cancelled() and f.exception() is None
+            if not success and not f.cancelled():
+                self.logger.error("Error writing %s: %s", selection, f.exception())
+            if callback:
+                callback(success)
+
+        future.add_done_callback(done)
+        return future
+
+    def stop(self) -> None:
+        """Stop the worker thread, releasing the selections it owns"""
+        with self._lock:
+            thread, requests = self._thread, self._queue
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            requests.put(_STOP)
+            thread.join(self.timeout)
+
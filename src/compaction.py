@@ -0,0 +1,196 @@
+"""
+Input compaction for e-mail threads and chat transcripts
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .segmenter import SentenceSegmenter
+
+
+# Phrases that mark legal footers and boilerplate (matched case-insensitively)
+DEFAULT_DISCLAIMER_MARKERS = (
+    'esta mensagem é confidencial',
+    'esta mensagem pode conter',
+    'esta mensagem e seus anexos',
+    'as informações contidas neste',
+    'o conteúdo desta mensagem',
+    'se você recebeu esta mensagem por engano',
+    'antes de imprimir',
+    'aviso de confidencialidade',
+    'aviso legal',
+    'this message is confidential',
+    'this message may contain',
+    'this e-mail and any attachments',
+    'this email and any files',
+    'if you received this message in error',
+    'confidentiality notice',
+    'please consider the environment',
+)
+
+# Paragraphs longer than this are never treated as a signature
+MAX_SIGNATURE_CHARS = 400
+
+# Start of a quoted reply chain; everything after it is the previous thread
+_REPLY_HEADER = re.compile(
+    # Gmail/Apple Mail: "Em seg., 3 de jun. ... Fulano <f@x.com> escreveu:"
+    r'^(?:Em|On) (?:(?!\n\n)[\s\S]){5,300}?(?:escreveu|wrote):[ \t]*$'
+    # Outlook/Thunderbird separators
+    r'|^-{2,}[ \t]*(?:Mensagem original|Mensagem encaminhada|Original Message|Forwarded message)[ \t]*-{2,}'
+    # Outlook header block: "De: ... Enviado: ..."
+    r'|^(?:De|From):[^\n]*\n(?:[^\n]*\n){0,3}?(?:Enviad[oa]|Sent|Data|Date):',
+    re.MULTILINE | re.IGNORECASE
+)
+# Runs of "> " quoted lines
+_QUOTED_LINES = re.compile(r'(?:^[ \t]*>[^\n]*(?:\n|$))+', re.MULTILINE)
+# Conventional signature delimiter ("-- ")
+_SIGNATURE_DELIMITER = re.compile(r'^--[ \t]*$', re.MULTILINE)
+_QUOTE_PREFIX = re.compile(r'^[ \t>]+', re.MULTILINE)
+_EXTRA_BLANK_LINES = re.compile(r'\n[ \t]*\n(?:[ \t]*\n)+')
+
+
+def _is_signature_shaped(paragraph: str) -> bool:
+    """Short and spread over several lines (name, role, phone...), unlike
+    a closing line such as "Obrigado." that may legitimately repeat"""
+    lines = [line for line in _QUOTE_PREFIX.sub('', paragraph).splitlines() if line.strip()]
+    return len(paragraph) <= MAX_SIGNATURE_CHARS and len(lines) >= 2
+
+
+def fingerprint(paragraph: str) -> str:
+    """Normalized form of a paragraph, ignoring quote markers, case and spacing"""
+    return ' '.join(_QUOTE_PREFIX.sub('', paragraph).casefold().split())
+
+
+class EmailCompactor:
+    """Strip quoted replies, repeated signatures and disclaimers
+
+    Signatures are learned only from evidence: the block after a '-- '
+    delimiter, or a short multi-line paragraph that also ends a quoted
+    message. Learned signatures are stripped from later inputs even when
+    they appear only once. Repeats within one input are not evidence, so a
+    repeated "Obrigado." is never learned.
+    """
+
+    def __init__(self, disclaimer_markers: Iterable[str] = DEFAULT_DISCLAIMER_MARKERS,
+                 fingerprints: Iterable[str] = (), max_learned: int = 256):
+        self.disclaimer_markers = tuple(marker.casefold() for marker in disclaimer_markers)
+        self.max_learned = max_learned
+        self._learned: 'OrderedDict[str, None]' = OrderedDict((fingerprint(f), None) for f in fingerprints)
+        self._lock = threading.Lock()
+        self.segmenter = SentenceSegmenter()
+
+    @property
+    def learned_fingerprints(self) -> List[str]:
+        """Fingerprints learned so far, oldest first"""
+        with self._lock:
+            return list(self._learned)
+
+    def learn(self, paragraph: str) -> None:
+        """Remember a paragraph as boilerplate"""
+        key = fingerprint(paragraph)
+        if not key:
+            return
+        with self._lock:
+            self._learned[key] = None
+            self._learned.move_to_end(key)
+            while len(self._learned) > self.max_learned:
+                self._learned.popitem(last=False)
+
+    def _is_learned(self, key: str) -> bool:
+        """Check a fingerprint against the learned set"""
+        with self._lock:
+            return key in self._learned
+
+    def _is_disclaimer(self, paragraph: str) -> bool:
+        """Check if a paragraph contains a disclaimer marker"""
+        folded = paragraph.casefold()
+        return any(marker in folded for marker in self.disclaimer_markers)
+
+    def find_removable(self, text: str) -> List[Tuple[int, int, str]]:
+        """Find (start, end, kind) spans to strip, sorted by start
+
+        Kinds are 'quoted', 'signature' and 'disclaimer'.
+        """
+        spans: List[Tuple[int, int, str]] = []
+        limit = len(text)
+
+        header = _REPLY_HEADER.search(text)
+        if header:
+            limit = header.start()
+            spans.append((limit, len(text), 'quoted'))
+
+        quoted_blocks = [(m.start(), m.end()) for m in _QUOTED_LINES.finditer(text, 0, limit)]
+        spans.extend((start, end, 'quoted') for start, end in quoted_blocks)
+
+        # The last paragraph of each quoted message is where its signature is
+        quoted_tails = set()
+        for start, end in quoted_blocks + ([(limit, len(text))] if header else []):
+            paragraphs = list(self.segmenter.paragraphs(text, start, end))
+            if paragraphs:
+                p_start, p_end = paragraphs[-1]
+                if _is_signature_shaped(text[p_start:p_end]):
+                    quoted_tails.add(fingerprint(text[p_start:p_end]))
+
+        delimiter = _SIGNATURE_DELIMITER.search(text, 0, limit)
+        if delimiter:
+            spans.append((delimiter.start(), limit, 'signature'))
+            for p_start, p_end in self.segmenter.paragraphs(text, delimiter.end(), limit):
+                if p_end - p_start <= MAX_SIGNATURE_CHARS:
+                    self.learn(text[p_start:p_end])
+            limit = delimiter.start()
+
+        for start, end in self.segmenter.paragraphs(text, 0, limit):
+            if any(q_start <= start and end <= q_end for q_start, q_end in quoted_blocks):
+                continue
+            paragraph = text[start:end]
+            if self._is_disclaimer(paragraph):
+                spans.append((start, end, 'disclaimer'))
+                continue
+            if end - start > MAX_SIGNATURE_CHARS:
+                continue
+            key = fingerprint(paragraph)
+            if self._is_learned(key):
+                spans.append((start, end, 'signature'))
+            elif key in quoted_tails:
+                self.learn(paragraph)
+                spans.append((start, end, 'signature'))
+
+        spans.sort()
+        return spans
+
+    def compact(self, text: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Strip removable spans from text
+
+        Returns:
+            Tuple of (compacted text, removed parts). Each removed part is a
+            dict with 'kind', 'start', 'end' (offsets into text) and 'text'.
+        """
+        if not text:
+            return "", []
+
+        pieces = []
+        removed: List[Dict[str, Any]] = []
+        position = 0
+        for start, end, kind in self.find_removable(text):
+            if start < position:
+                # Nested in a span already removed (e.g. a quote after the header)
+                if end <= position:
+                    continue
+                start = position
+            pieces.append(text[position:start])
+            removed.append({'kind': kind, 'start': start, 'end': end, 'text': text[start:end]})
+            position = end
+        pieces.append(text[position:])
+
+        compacted = _EXTRA_BLANK_LINES.sub('\n\n', ''.join(pieces)).strip()
+        return compacted, removed
+
+    @staticmethod
+    def restore(result: str, removed: List[Dict[str, Any]], kinds: Optional[Iterable[str]] = None) -> str:
+        """Append stripped parts after a processed result, in original order"""
+        kinds = set(kinds) if kinds is not None else None
+        parts = [part['text'].strip() for part in removed if kinds is None or part['kind'] in kinds]
+        parts = [part for part in parts if part]
+        if not parts:
+            return result
+        return '\n\n'.join([result.rstrip()] + parts)
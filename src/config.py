@@ -8,24 +8,276 @@ License: MIT
 """
 import os
 import configparser
-from typing import Optional, Dict, Any
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Callable, FrozenSet, List, Mapping, Tuple
+
+
+@dataclass(frozen=True)
+class OpenAISettings:
+    """Typed, immutable OpenAI settings"""
+    __slots__ = ('api_key', 'model', 'max_tokens', 'temperature', 'timeout')
+    
+    api_key: str
+    model: str
+    max_tokens: int
+    temperature: float
+    timeout: int
+
+
+# Operations that must return code, links and traces untouched ([MASKING] operations)
+DEFAULT_MASKED_OPERATIONS = 'technical,spellcheck,translate_en,translate_pt'
+
+# What a budget may do once a limit is reached
+BUDGET_ACTIONS = ('warn', 'downgrade', 'block')
+
+
+@dataclass(frozen=True)
+class BudgetSettings:
+    """Typed, immutable usage limits (0 means no limit)"""
+    __slots__ = ('daily_tokens', 'daily_cost', 'monthly_cost', 'action', 'downgrade_model')
+    
+    daily_tokens: int
+    daily_cost: float
+    monthly_cost: float
+    action: str
+    downgrade_model: str
+    
+    def __post_init__(self):
+        if self.action not in BUDGET_ACTIONS:
+            raise ValueError(f"invalid budget action {self.action!r}, expected one of {', '.join(BUDGET_ACTIONS)}")
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is set"""
+        return bool(self.daily_tokens or self.daily_cost or self.monthly_cost)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Typed, immutable view of the settings read on every request
+    
+    Built once per load or change and swapped atomically, so worker threads
+    never parse strings or see a half-applied edit.
+    """
+    __slots__ = ('openai', 'backends', 'skip_same_language', 'min_confidence', 'masking_enabled',
+                 'masking_operations', 'compaction_enabled', 'restore_stripped', 'disclaimers',
+                 'max_input_tokens', 'model_input_tokens', 'tpm_limit', 'budget')
+    
+    openai: OpenAISettings
+    backends: Mapping[str, str]
+    skip_same_language: bool
+    min_confidence: float
+    masking_enabled: bool
+    masking_operations: FrozenSet[str]
+    compaction_enabled: bool
+    restore_stripped: bool
+    disclaimers: Tuple[str, ...]
+    max_input_tokens: int
+    model_input_tokens: Mapping[str, int]
+    tpm_limit: int
+    budget: BudgetSettings
+    
+    def input_tokens_for(self, model: Optional[str] = None) -> int:
+        """Input token limit for a model"""
+        # configparser lower-cases keys
+        return self.model_input_tokens.get(model.lower(), self.max_input_tokens) if model else self.max_input_tokens
 
 
 class Config:
-    """Configuration manager for the application"""
+    """Configuration manager for the application
+    
+    Reads and writes of the underlying ConfigParser are serialized by a
+    lock. Per-request settings come from an immutable ConfigSnapshot that is
+    rebuilt and swapped on every change; listeners get (old, new) snapshots.
+    """
     
     def __init__(self, config_file: Optional[str] = None):
         self.config_file = config_file or os.path.expanduser("~/.text_helper_ia_config.ini")
         self.config = configparser.ConfigParser()
+        self._lock = threading.RLock()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._listeners: List[Callable[[ConfigSnapshot, ConfigSnapshot], None]] = []
+        self._mtime: Optional[float] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
         self.load_config()
     
     def load_config(self) -> None:
         """Load configuration from file"""
-        if os.path.exists(self.config_file):
-            self.config.read(self.config_file)
-        else:
-            self._create_default_config()
-            self.save_config()
+        with self._lock:
+            if os.path.exists(self.config_file):
+                self.config.read(self.config_file)
+                self._mtime = self._file_mtime()
+            else:
+                self._create_default_config()
+                self.save_config()
+            self._refresh()
+    
+    def snapshot(self) -> ConfigSnapshot:
+        """Get the current settings snapshot (never mutated, safe to keep)"""
+        return self._snapshot
+    
+    def add_listener(self, callback: Callable[[ConfigSnapshot, ConfigSnapshot], None]) -> None:
+        """Call callback(old, new) whenever the snapshot changes"""
+        self._listeners.append(callback)
+    
+    def _build_snapshot(self) -> ConfigSnapshot:
+        """Parse the per-request settings into a new snapshot"""
+        masking_operations = self.get('MASKING', 'operations', DEFAULT_MASKED_OPERATIONS)
+        disclaimers = self.get('COMPACTION', 'disclaimers', '')
+        prefix = 'max_input_tokens.'
+        model_input_tokens = {}
+        backends = {}
+        if self.config.has_section('TOKENS'):
+            model_input_tokens = {
+                key[len(prefix):]: int(value) for key, value in self.config.items('TOKENS')
+                if key.startswith(prefix)
+            }
+        if self.config.has_section('BACKENDS'):
+            # Only keys set in the section itself: DEFAULT keys leak into items()
+            backends = {
+                key: self.config.get('BACKENDS', key).strip().lower()
+                for key in self.config.options('BACKENDS') if key not in self.config.defaults()
+            }
+        return ConfigSnapshot(
+            openai=OpenAISettings(
+                api_key=self.get('DEFAULT', 'openai_api_key', ''),
+                model=self.get('DEFAULT', 'model', 'gpt-3.5-turbo'),
+                max_tokens=int(self.get('DEFAULT', 'max_tokens', '300')),
+                temperature=float(self.get('DEFAULT', 'temperature', '0.3')),
+                timeout=int(self.get('DEFAULT', 'timeout', '30'))
+            ),
+            backends=MappingProxyType(backends),
+            skip_same_language=self.get('TRANSLATION', 'skip_same_language', 'true').lower() == 'true',
+            min_confidence=float(self.get('TRANSLATION', 'min_confidence', '0.9')),
+            masking_enabled=self.get('MASKING', 'enabled', 'true').lower() == 'true',
+            masking_operations=frozenset(op.strip() for op in masking_operations.split(',') if op.strip()),
+            compaction_enabled=self.get('COMPACTION', 'enabled', 'false').lower() == 'true',
+            restore_stripped=self.get('COMPACTION', 'restore_stripped', 'false').lower() == 'true',
+            disclaimers=tuple(marker.strip() for marker in disclaimers.split('|') if marker.strip()),
+            max_input_tokens=int(self.get('TOKENS', 'max_input_tokens', '4000')),
+            model_input_tokens=MappingProxyType(model_input_tokens),
+            tpm_limit=int(self.get('TOKENS', 'tpm_limit', '0')),
+            budget=BudgetSettings(
+                daily_tokens=int(self.get('BUDGET', 'daily_tokens', '0')),
+                daily_cost=float(self.get('BUDGET', 'daily_cost', '0')),
+                monthly_cost=float(self.get('BUDGET', 'monthly_cost', '0')),
+                action=self.get('BUDGET', 'action', 'warn').strip().lower(),
+                downgrade_model=self.get('BUDGET', 'downgrade_model', 'gpt-4o-mini').strip()
+            )
+        )
+    
+    def _refresh(self) -> None:
+        """Rebuild the snapshot and notify listeners if it changed
+        
+        Raises:
+            ValueError: If a value cannot be parsed or a listener rejects
+                the change; the old snapshot stays
+        """
+        with self._lock:
+            old, new = self._snapshot, self._build_snapshot()
+            self._snapshot = new
+        if old is not None and old != new:
+            notified = []
+            try:
+                for callback in list(self._listeners):
+                    callback(old, new)
+                    notified.append(callback)
+            except ValueError:
+                with self._lock:
+                    self._snapshot = old
+                # Undo what the listeners that accepted the change applied
+                for callback in notified:
+                    callback(new, old)
+                raise
+    
+    def update(self, values: Dict[str, Dict[str, Any]], save: bool = True) -> None:
+        """Set several values at once; readers see all of them or none
+        
+        Raises:
+            ValueError: If a value cannot be parsed or is rejected; nothing is changed
+        """
+        with self._lock:
+            previous = []
+            for section, items in values.items():
+                if section != 'DEFAULT' and not self.config.has_section(section):
+                    self.config.add_section(section)
+                for key, value in items.items():
+                    previous.append((section, key, self.config.get(section, key, raw=True, fallback=None)))
+                    self.config.set(section, key, str(value))
+            try:
+                self._refresh()
+            except ValueError:
+                for section, key, value in reversed(previous):
+                    if value is None:
+                        self.config.remove_option(section, key)
+                    else:
+                        self.config.set(section, key, value)
+                raise
+            if save:
+                self.save_config()
+    
+    def reload_if_changed(self) -> bool:
+        """Re-read the file if it changed on disk since the last load or save
+        
+        Returns:
+            True if the file was reloaded
+        
+        Raises:
+            ValueError: If the new file is invalid; the current settings stay
+        """
+        mtime = self._file_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        parser = configparser.ConfigParser()
+        try:
+            parser.read(self.config_file)
+        except configparser.Error as e:
+            self._mtime = mtime
+            raise ValueError(f"invalid config file: {e}") from e
+        with self._lock:
+            previous = self.config
+            self.config = parser
+            self._mtime = mtime
+            try:
+                self._refresh()
+            except ValueError:
+                self.config = previous
+                raise
+        return True
+    
+    def watch(self, interval: float = 1.0, on_error: Optional[Callable[[Exception], None]] = None) -> None:
+        """Poll the file's mtime in a daemon thread and apply edits live"""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        
+        def poll():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    if on_error:
+                        on_error(e)
+        
+        self._watcher = threading.Thread(target=poll, name='ConfigWatcher', daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self) -> None:
+        """Stop the file watcher"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def _file_mtime(self) -> Optional[float]:
+        """Modification time of the config file, or None if it is missing"""
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
     
     def _create_default_config(self) -> None:
         """Create default configuration"""
@@ -41,36 +293,159 @@ class Config:
             'auto_close_delay': '10'
         }
         
+        # Per-operation backend: 'api' (OpenAI) or 'local' (offline engine)
+        self.config['BACKENDS'] = {
+            'emojify': 'api'
+        }
+        
+        self.config['TRANSLATION'] = {
+            'skip_same_language': 'true',
+            'min_confidence': '0.9'
+        }
+        
+        self.config['SIMILARITY'] = {
+            'enabled': 'true',
+            'threshold': '0.9',
+            'capacity': '512'
+        }
+        
+        # Protected-span masking (code, URLs, e-mails, stack traces)
+        self.config['MASKING'] = {
+            'enabled': 'true',
+            'operations': DEFAULT_MASKED_OPERATIONS
+        }
+        
+        # Global hotkeys (pynput chord syntax), one per operation
+        self.config['HOTKEYS'] = {
+            'enabled': 'false',
+            'paste_result': 'true',
+            'shorten': '<ctrl>+<alt>+s',
+            'improve': '<ctrl>+<alt>+i',
+            'spellcheck': '<ctrl>+<alt>+c',
+            'translate': '<ctrl>+<alt>+t'
+        }
+        
+        # Resident daemon; an empty socket_path uses the per-user default
+        self.config['DAEMON'] = {
+            'socket_path': '',
+            'workers': '4'
+        }
+        
+        # Overnight batch jobs (`text_helper_ia.py batch`)
+        self.config['BATCH'] = {
+            'workers': '4',
+            'operation': 'shorten'
+        }
+        
+        # Local HTTP API (`text_helper_ia.py serve`); keep it on localhost
+        self.config['SERVER'] = {
+            'host': '127.0.0.1',
+            'port': '8765',
+            'max_concurrency': '8',
+            'max_queue': '64'
+        }
+        
+        # Clipboard access: 'auto' (Tk owner thread, pyperclip fallback), 'tk' or 'pyperclip'
+        self.config['CLIPBOARD'] = {
+            'backend': 'auto',
+            'timeout': '2.0'
+        }
+        
+        # E-mail/chat compaction; extra disclaimer markers are '|'-separated
+        self.config['COMPACTION'] = {
+            'enabled': 'false',
+            'restore_stripped': 'false',
+            'disclaimers': ''
+        }
+        
+        # Input limits in tokens; override per model with 'max_input_tokens.<model>'
+        self.config['TOKENS'] = {
+            'max_input_tokens': '4000',
+            'tpm_limit': '0'
+        }
+        
+        # Token and cost accounting, aggregated per day, operation and model
+        self.config['USAGE'] = {
+            'enabled': 'true',
+            'file': os.path.expanduser('~/.text_helper_ia_usage.db'),
+            'retention_days': '400'
+        }
+        
+        # Spending limits (0 = none; cost in USD); when one is reached the
+        # action is 'warn' (log only), 'downgrade' (use downgrade_model) or 'block'
+        self.config['BUDGET'] = {
+            'daily_tokens': '0',
+            'daily_cost': '0',
+            'monthly_cost': '0',
+            'action': 'warn',
+            'downgrade_model': 'gpt-4o-mini'
+        }
+        
+        # Process metrics in Prometheus format: optional localhost endpoint,
+        # and/or a file written on exit (e.g. for node_exporter's textfile collector)
+        self.config['METRICS'] = {
+            'enabled': 'false',
+            'host': '127.0.0.1',
+            'port': '9465',
+            'dump_file': ''
+        }
+        
+        # Opt-in cProfile/tracemalloc capture (or TEXT_HELPER_PROFILE=1);
+        # `--profile-report` summarizes the latest session
+        self.config['PROFILING'] = {
+            'enabled': 'false',
+            'dir': os.path.expanduser('~/.text_helper_ia_profiles'),
+            'memory_interval': '60'
+        }
+        
+        # Processed texts, searchable from the history panel
+        self.config['HISTORY'] = {
+            'enabled': 'true',
+            'file': os.path.expanduser('~/.text_helper_ia_history.db'),
+            'max_entries': '5000'
+        }
+        
+        # Per-job phase timings, one JSON line per job (`--trace-report` reads them)
+        self.config['TRACING'] = {
+            'enabled': 'false',
+            'file': os.path.expanduser('~/.text_helper_ia_traces.jsonl')
+        }
+        
         self.config['LOGGING'] = {
             'level': 'INFO',
             'file': os.path.expanduser('~/.text_helper_ia.log'),
             'max_size': '10485760',  # 10MB
-            'backup_count': '3'
+            'backup_count': '3',
+            'compress': 'false',  # gzip rotated files
+            'console_in_gui': 'false'
         }
     
     def save_config(self) -> None:
         """Save configuration to file"""
-        with open(self.config_file, 'w') as f:
-            self.config.write(f)
+        with self._lock:
+            with open(self.config_file, 'w') as f:
+                self.config.write(f)
+            # Our own write is not an external edit
+            self._mtime = self._file_mtime()
     
     def get(self, section: str, key: str, fallback: Any = None) -> Any:
         """Get configuration value"""
-        return self.config.get(section, key, fallback=fallback)
+        with self._lock:
+            return self.config.get(section, key, fallback=fallback)
     
     def set(self, section: str, key: str, value: Any) -> None:
         """Set configuration value"""
-        if section != 'DEFAULT' and not self.config.has_section(section):
-            self.config.add_section(section)
-        self.config.set(section, key, str(value))
+        self.update({section: {key: value}}, save=False)
     
     def get_openai_config(self) -> Dict[str, Any]:
         """Get OpenAI configuration"""
+        openai = self._snapshot.openai
         return {
-            'api_key': self.get('DEFAULT', 'openai_api_key', ''),
-            'model': self.get('DEFAULT', 'model', 'gpt-3.5-turbo'),
-            'max_tokens': int(self.get('DEFAULT', 'max_tokens', '300')),
-            'temperature': float(self.get('DEFAULT', 'temperature', '0.3')),
-            'timeout': int(self.get('DEFAULT', 'timeout', '30'))
+            'api_key': openai.api_key,
+            'model': openai.model,
+            'max_tokens': openai.max_tokens,
+            'temperature': openai.temperature,
+            'timeout': openai.timeout
         }
     
     def get_ui_config(self) -> Dict[str, Any]:
@@ -79,16 +454,145 @@ class Config:
             'auto_close_delay': int(self.get('UI', 'auto_close_delay', '10'))
         }
     
+    def get_backend(self, operation_type: str) -> str:
+        """Get the backend selected for an operation ('api' or 'local')"""
+        return self._snapshot.backends.get(operation_type) or 'api'
+    
+    def get_translation_config(self) -> Dict[str, Any]:
+        """Get translation shortcut configuration"""
+        snapshot = self._snapshot
+        return {
+            'skip_same_language': snapshot.skip_same_language,
+            'min_confidence': snapshot.min_confidence
+        }
+    
+    def get_similarity_config(self) -> Dict[str, Any]:
+        """Get near-duplicate reuse configuration"""
+        return {
+            'enabled': self.get('SIMILARITY', 'enabled', 'true').lower() == 'true',
+            'threshold': float(self.get('SIMILARITY', 'threshold', '0.9')),
+            'capacity': int(self.get('SIMILARITY', 'capacity', '512'))
+        }
+    
+    def get_masking_config(self) -> Dict[str, Any]:
+        """Get protected-span masking configuration"""
+        snapshot = self._snapshot
+        return {
+            'enabled': snapshot.masking_enabled,
+            'operations': snapshot.masking_operations
+        }
+    
+    def get_hotkeys_config(self) -> Dict[str, Any]:
+        """Get global hotkey configuration"""
+        return {
+            'enabled': self.get('HOTKEYS', 'enabled', 'false').lower() == 'true',
+            'paste_result': self.get('HOTKEYS', 'paste_result', 'true').lower() == 'true'
+        }
+    
+    def get_hotkey(self, operation_type: str) -> str:
+        """Get the hotkey chord for an operation ('' if unbound)"""
+        return self.get('HOTKEYS', operation_type, '').strip()
+    
+    def get_daemon_config(self) -> Dict[str, Any]:
+        """Get resident daemon configuration"""
+        return {
+            'socket_path': self.get('DAEMON', 'socket_path', '') or None,
+            'workers': int(self.get('DAEMON', 'workers', '4'))
+        }
+    
+    def get_batch_config(self) -> Dict[str, Any]:
+        """Get batch job configuration"""
+        return {
+            'workers': int(self.get('BATCH', 'workers', '4')),
+            'operation': self.get('BATCH', 'operation', 'shorten')
+        }
+    
+    def get_server_config(self) -> Dict[str, Any]:
+        """Get local HTTP server configuration"""
+        return {
+            'host': self.get('SERVER', 'host', '127.0.0.1'),
+            'port': int(self.get('SERVER', 'port', '8765')),
+            'max_concurrency': int(self.get('SERVER', 'max_concurrency', '8')),
+            'max_queue': int(self.get('SERVER', 'max_queue', '64'))
+        }
+    
+    def get_clipboard_config(self) -> Dict[str, Any]:
+        """Get clipboard backend configuration"""
+        return {
+            'backend': self.get('CLIPBOARD', 'backend', 'auto'),
+            'timeout': float(self.get('CLIPBOARD', 'timeout', '2.0'))
+        }
+    
+    def get_compaction_config(self) -> Dict[str, Any]:
+        """Get e-mail/chat compaction configuration"""
+        snapshot = self._snapshot
+        return {
+            'enabled': snapshot.compaction_enabled,
+            'restore_stripped': snapshot.restore_stripped,
+            'disclaimers': list(snapshot.disclaimers)
+        }
+    
+    def get_max_input_tokens(self, model: Optional[str] = None) -> int:
+        """Get the input token limit for a model"""
+        return self._snapshot.input_tokens_for(model)
+    
+    def get_tpm_limit(self) -> int:
+        """Get the tokens-per-minute limit (0 disables rate limiting)"""
+        return self._snapshot.tpm_limit
+    
+    def get_metrics_config(self) -> Dict[str, Any]:
+        """Get metrics endpoint configuration"""
+        dump_file = self.get('METRICS', 'dump_file', '')
+        return {
+            'enabled': self.get('METRICS', 'enabled', 'false').lower() == 'true',
+            'host': self.get('METRICS', 'host', '127.0.0.1'),
+            'port': int(self.get('METRICS', 'port', '9465')),
+            'dump_file': os.path.expanduser(dump_file) if dump_file else ''
+        }
+    
+    def get_profiling_config(self) -> Dict[str, Any]:
+        """Get profiling configuration"""
+        return {
+            'enabled': self.get('PROFILING', 'enabled', 'false').lower() == 'true',
+            'dir': os.path.expanduser(self.get('PROFILING', 'dir', '~/.text_helper_ia_profiles')),
+            'memory_interval': float(self.get('PROFILING', 'memory_interval', '60'))
+        }
+    
+    def get_usage_config(self) -> Dict[str, Any]:
+        """Get usage accounting configuration"""
+        return {
+            'enabled': self.get('USAGE', 'enabled', 'true').lower() == 'true',
+            'file': os.path.expanduser(self.get('USAGE', 'file', '~/.text_helper_ia_usage.db')),
+            'retention_days': int(self.get('USAGE', 'retention_days', '400'))
+        }
+    
+    def get_history_config(self) -> Dict[str, Any]:
+        """Get request history configuration"""
+        return {
+            'enabled': self.get('HISTORY', 'enabled', 'true').lower() == 'true',
+            'file': os.path.expanduser(self.get('HISTORY', 'file', '~/.text_helper_ia_history.db')),
+            'max_entries': int(self.get('HISTORY', 'max_entries', '5000'))
+        }
+    
+    def get_tracing_config(self) -> Dict[str, Any]:
+        """Get tracing configuration"""
+        return {
+            'enabled': self.get('TRACING', 'enabled', 'false').lower() == 'true',
+            'file': self.get('TRACING', 'file', os.path.expanduser('~/.text_helper_ia_traces.jsonl'))
+        }
+    
     def get_logging_config(self) -> Dict[str, Any]:
         """Get logging configuration"""
         return {
             'level': self.get('LOGGING', 'level', 'INFO'),
             'file': self.get('LOGGING', 'file', os.path.expanduser('~/.text_helper_ia.log')),
             'max_size': int(self.get('LOGGING', 'max_size', '10485760')),
-            'backup_count': int(self.get('LOGGING', 'backup_count', '3'))
+            'backup_count': int(self.get('LOGGING', 'backup_count', '3')),
+            'compress': self.get('LOGGING', 'compress', 'false').lower() == 'true',
+            'console_in_gui': self.get('LOGGING', 'console_in_gui', 'false').lower() == 'true'
         }
     
     def is_configured(self) -> bool:
         """Check if OpenAI API key is configured"""
-        api_key = self.get('DEFAULT', 'openai_api_key', '')
+        api_key = self._snapshot.openai.api_key
         return bool(api_key and api_key.strip())
@@ -0,0 +1,180 @@
+"""
+Resident daemon holding a warm client, caches and a worker pool
+"""
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from .config import Config
+from .daemon_client import DaemonClient, default_socket_path, recv_frame, send_frame
+from .ia_client import AIClient
+from .logger import Logger
+from .metrics import QUEUE_DEPTH
+from .operations import run_operation
+from .text_processor import TextProcessor
+
+
+# Seconds an idle client connection may hold a worker
+_IDLE_TIMEOUT = 300.0
+
+
+class TextHelperDaemon:
+    """Serve text operations over a Unix domain socket
+
+    The OpenAI client, token counter and similarity cache stay warm across
+    requests, so a client only pays for its own round trip. Connections are
+    handled by a bounded worker pool; each connection may send several
+    requests.
+    """
+
+    def __init__(self, config: Config, ai_client: AIClient, text_processor: TextProcessor,
+                 logger: Logger, socket_path: Optional[str] = None, workers: int = 4):
+        self.config = config
+        self.ai_client = ai_client
+        self.text_processor = text_processor
+        self.logger = logger
+        self.socket_path = socket_path or default_socket_path()
+        self.workers = workers
+        self._server: Optional[socket.socket] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopped = threading.Event()
+        self._started_at = time.time()
+        self._stats_lock = threading.Lock()
+        self._connections = set()
+        self.requests = 0
+        self.errors = 0
+
+    def bind(self) -> None:
+        """Create the listening socket (owner-only permissions)
+
+        Raises:
+            RuntimeError: If another daemon already serves the socket
+        """
+        if os.path.exists(self.socket_path):
+            if DaemonClient(self.socket_path, timeout=1.0).ping():
+                raise RuntimeError(f"daemon already running at {self.socket_path}")
+            os.unlink(self.socket_path)  # Stale socket from a crashed daemon
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(64)
+        self._server = server
+
+    def serve_forever(self) -> None:
+        """Accept connections until stop() is called"""
+        if self._server is None:
+            self.bind()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='Daemon')
+        self._server.settimeout(0.5)
+        self.logger.info("Daemon listening on %s (%s workers)", self.socket_path, self.workers)
+        try:
+            while not self._stopped.is_set():
+                try:
+                    connection, _ = self._server.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    if self._stopped.is_set():
+                        break
+                    raise
+                # Connections wait here while every worker is busy
+                QUEUE_DEPTH.inc('daemon')
+                self._executor.submit(self._serve_connection, connection)
+        finally:
+            self._close()
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        """Answer every request on one connection"""
+        QUEUE_DEPTH.dec('daemon')
+        with self._stats_lock:
+            self._connections.add(connection)
+        with connection:
+            connection.settimeout(_IDLE_TIMEOUT)
+            try:
+                while not self._stopped.is_set():
+                    request = recv_frame(connection)
+                    if request is None:
+                        return
+                    send_frame(connection, self.handle(request))
+            except (OSError, ValueError) as e:
+                if not self._stopped.is_set():
+                    self.logger.warning("Daemon connection error: %s", e)
+            finally:
+                with self._stats_lock:
+                    self._connections.discard(connection)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request"""
+        request_type = request.get('type')
+        with self._stats_lock:
+            self.requests += 1
+
+        if request_type == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+        if request_type == 'stats':
+            return {'ok': True, 'stats': self.get_stats()}
+        if request_type == 'shutdown':
+            self.stop()
+            return {'ok': True}
+        if request_type != 'process':
+            return self._error(f"unknown request type: {request_type}")
+
+        operation_type = request.get('operation')
+        text = request.get('text')
+        if not operation_type or not isinstance(text, str):
+            return self._error("'operation' and 'text' are required")
+        start = time.perf_counter()
+        try:
+            result = run_operation(self.config, self.ai_client, self.text_processor, text, operation_type)
+        except Exception as e:
+            return self._error(str(e))
+        self.logger.info("Daemon processed %s in %.0f ms", operation_type, (time.perf_counter() - start) * 1000)
+        return {'ok': True, 'result': result}
+
+    def _error(self, message: str) -> Dict[str, Any]:
+        """Build an error response"""
+        with self._stats_lock:
+            self.errors += 1
+        self.logger.warning("Daemon request failed: %s", message)
+        return {'ok': False, 'error': message}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get daemon statistics"""
+        with self._stats_lock:
+            stats: Dict[str, Any] = {'requests': self.requests, 'errors': self.errors}
+        stats['uptime'] = time.time() - self._started_at
+        if self.ai_client.similarity_cache:
+            stats['similarity'] = self.ai_client.similarity_cache.get_stats()
+        return stats
+
+    def stop(self) -> None:
+        """Stop accepting connections"""
+        self._stopped.set()
+
+    def _close(self) -> None:
+        """Close the socket and wait for in-flight requests"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        # Wake workers blocked on idle connections
+        with self._stats_lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.logger.info("Daemon stopped: %s", self.get_stats())
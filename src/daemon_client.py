@@ -0,0 +1,134 @@
+"""
+Thin client for the resident daemon
+
+Imports only the standard library so `text_helper_ia.py --send` starts in
+milliseconds; all the heavy lifting happens in the already-warm daemon.
+"""
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+# Frame: 4-byte big-endian payload length, then a UTF-8 JSON object
+_HEADER = struct.Struct('!I')
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def default_socket_path() -> str:
+    """Per-user socket path, in XDG_RUNTIME_DIR when available"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, 'text-helper-ia.sock')
+    return os.path.join(tempfile.gettempdir(), f'text-helper-ia-{os.getuid()}.sock')
+
+
+def send_frame(sock: socket.socket, message: Dict[str, Any]) -> None:
+    """Send one framed message"""
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, or None if the peer closed first"""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(min(size - len(buffer), 1 << 20))
+        if not chunk:
+            return None
+        buffer += chunk
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Receive one framed message, or None if the connection closed"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"frame too large: {size} bytes")
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    return json.loads(payload.decode('utf-8'))
+
+
+class DaemonClient:
+    """Send requests to the resident daemon over its Unix socket"""
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 120.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request and wait for its response
+
+        Raises:
+            ConnectionError: If the daemon is not running or hung up
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                raise ConnectionError(f"daemon not running at {self.socket_path}") from e
+            send_frame(sock, message)
+            response = recv_frame(sock)
+        if response is None:
+            raise ConnectionError("daemon closed the connection")
+        return response
+
+    def process(self, operation_type: str, text: str) -> str:
+        """Run an operation on text
+
+        Raises:
+            RuntimeError: If the daemon reports an error
+        """
+        response = self.request({'type': 'process', 'operation': operation_type, 'text': text})
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'unknown error'))
+        return response['result']
+
+    def ping(self) -> bool:
+        """Check if the daemon is up"""
+        try:
+            return bool(self.request({'type': 'ping'}).get('ok'))
+        except (ConnectionError, OSError):
+            return False
+
+
+def send_main(argv: List[str]) -> int:
+    """Entry point of `text_helper_ia.py --send OPERATION [--socket PATH] < input`
+
+    Returns:
+        Process exit code
+    """
+    socket_path = None
+    if '--socket' in argv:
+        index = argv.index('--socket')
+        if index + 1 >= len(argv):
+            print("Uso: text_helper_ia.py --send OPERACAO [--socket CAMINHO] < entrada", file=sys.stderr)
+            return 2
+        socket_path = argv[index + 1]
+        argv = argv[:index] + argv[index + 2:]
+    if len(argv) != 1:
+        print("Uso: text_helper_ia.py --send OPERACAO [--socket CAMINHO] < entrada", file=sys.stderr)
+        return 2
+
+    text = sys.stdin.read()
+    try:
+        result = DaemonClient(socket_path).process(argv[0], text)
+    except ConnectionError as e:
+        print(f"Daemon indisponível ({e}). Inicie com: text_helper_ia.py --daemon", file=sys.stderr)
+        return 3
+    except (RuntimeError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    sys.stdout.write(result)
+    if not result.endswith('\n'):
+        sys.stdout.write('\n')
+    return 0
@@ -0,0 +1,311 @@
+"""
+Local emojify engine backed by an Aho-Corasick keyword automaton
+"""
+import struct
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+# Keyword -> emoji lexicon (pt-BR). Entries ending with '*' are stems and
+# match any word that starts with them ("feliz*" matches "felizes").
+# Multi-word phrases are matched as a whole.
+DEFAULT_LEXICON: Dict[str, str] = {
+    'feliz*': '😊', 'felic*': '😊', 'alegr*': '😄', 'sorri*': '😁',
+    'rindo': '😂', 'risada*': '😂', 'kkk*': '😂', 'haha*': '😂',
+    'triste*': '😢', 'tristeza': '😢', 'chor*': '😭', 'saudade*': '🥺',
+    'raiva': '😠', 'bravo': '😠', 'irritad*': '😤', 'medo': '😨',
+    'amor': '❤️', 'amo': '❤️', 'te amo': '❤️', 'coração': '❤️', 'paix*': '😍',
+    'beijo*': '😘', 'abraço*': '🤗', 'obrigad*': '🙏', 'valeu': '🙏',
+    'por favor': '🙏', 'parabéns': '🎉', 'parabens': '🎉', 'comemor*': '🥳',
+    'festa*': '🎉', 'aniversário': '🎂', 'aniversario': '🎂', 'bolo*': '🎂',
+    'presente*': '🎁', 'natal': '🎄', 'ano novo': '🎆', 'sucesso': '🏆',
+    'vitória': '🏆', 'vitoria': '🏆', 'campeã*': '🏆', 'campeo*': '🏆',
+    'meta': '🎯', 'metas': '🎯', 'objetivo*': '🎯', 'ideia*': '💡', 'dica*': '💡',
+    'atenção': '⚠️', 'atencao': '⚠️', 'cuidado': '⚠️', 'urgente': '🚨',
+    'importante': '❗', 'problema*': '⚠️', 'erro*': '❌', 'falha*': '❌',
+    'pronto': '✅', 'concluí*': '✅', 'conclui*': '✅', 'finaliz*': '✅',
+    'aprovad*': '✅', 'confirmad*': '✅', 'reunião': '📅', 'reuniao': '📅',
+    'agenda*': '📅', 'prazo*': '⏰', 'hoje': '📆', 'amanhã': '📆',
+    'amanha': '📆', 'bom dia': '☀️', 'boa tarde': '🌤️', 'boa noite': '🌙',
+    'e-mail': '📧', 'email*': '📧', 'mensage*': '💬', 'telefon*': '📞',
+    'ligação': '📞', 'ligar': '📞', 'dinheiro': '💰', 'pagament*': '💳',
+    'venda*': '📈', 'crescimento': '📈', 'queda': '📉', 'relatório*': '📊',
+    'relatorio*': '📊', 'dados': '📊', 'gráfico*': '📊', 'grafico*': '📊',
+    'computador*': '💻', 'código': '💻', 'codigo': '💻', 'projeto*': '🚀',
+    'lançamento': '🚀', 'lancamento': '🚀', 'trabalh*': '💼', 'equipe*': '🤝',
+    'parceria*': '🤝', 'acordo*': '🤝', 'estud*': '📚', 'livro*': '📖',
+    'escola*': '🏫', 'música*': '🎵', 'musica*': '🎵', 'filme*': '🎬',
+    'foto*': '📸', 'viage*': '✈️', 'viaj*': '✈️', 'férias': '🏖️',
+    'ferias': '🏖️', 'praia*': '🏖️', 'sol': '☀️', 'chuva*': '🌧️',
+    'frio': '🥶', 'calor': '🥵', 'café': '☕', 'cafe': '☕', 'comida*': '🍽️',
+    'almoço': '🍽️', 'almoco': '🍽️', 'jantar': '🍽️', 'pizza*': '🍕',
+    'cerveja*': '🍺', 'casa': '🏠', 'carro*': '🚗', 'saúde': '💪',
+    'saude': '💪', 'força': '💪', 'forca': '💪', 'academia': '🏋️',
+    'cachorr*': '🐶', 'gato': '🐱', 'gatos': '🐱', 'gatinh*': '🐱',
+    'flor*': '🌸', 'tempo': '⏳',
+    'rápid*': '⚡', 'rapid*': '⚡', 'energia': '⚡', 'segur*': '🔒',
+    'senha*': '🔑', 'chave*': '🔑', 'pergunta*': '❓', 'dúvida*': '🤔',
+    'duvida*': '🤔', 'pens*': '🤔', 'incrível': '🤩', 'incrivel': '🤩',
+    'ótimo': '👍', 'otimo': '👍', 'legal': '😎', 'top': '🔝',
+}
+
+# Lower-casing plus accent folding in a single length-preserving table, so
+# match offsets in the folded text are valid offsets in the original text.
+_FOLD_TABLE = str.maketrans(
+    'ÁÀÂÃÄáàâãäÉÈÊËéèêëÍÌÎÏíìîïÓÒÔÕÖóòôõöÚÙÛÜúùûüÇçÑñ',
+    'aaaaaaaaaaeeeeeeeeiiiiiiiioooooooooouuuuuuuuccnn'
+)
+
+_MAGIC = b'THEA'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHIII')
+
+
+def _fold(text: str) -> str:
+    """Lower-case and strip pt-BR accents without changing the length"""
+    folded = text.translate(_FOLD_TABLE).lower()
+    if len(folded) != len(text):
+        # A few code points grow under lower(); fold them one by one
+        folded = ''.join(c.translate(_FOLD_TABLE).lower()[:1] or c for c in text)
+    return folded
+
+
+class EmojiAutomaton:
+    """Aho-Corasick automaton over a keyword lexicon, stored in flat arrays
+
+    Every state owns a contiguous, code-point sorted slice of the transition
+    arrays, so lookups are a binary search over a few entries and the whole
+    automaton serializes to a single compact byte string.
+    """
+
+    def __init__(self, offsets: array, labels: array, targets: array,
+                 fail: array, output: array, lengths: array, stems: bytes,
+                 emojis: List[str]):
+        self.offsets = offsets
+        self.labels = labels
+        self.targets = targets
+        self.fail = fail
+        self.output = output
+        self.lengths = lengths
+        self.stems = stems
+        self.emojis = emojis
+
+    @classmethod
+    def compile(cls, lexicon: Dict[str, str]) -> 'EmojiAutomaton':
+        """Compile a keyword -> emoji lexicon into an automaton"""
+        goto: List[Dict[str, int]] = [{}]
+        state_output: List[int] = [-1]
+        lengths: List[int] = []
+        stems = bytearray()
+        emojis: List[str] = []
+
+        for keyword, emoji in lexicon.items():
+            is_stem = keyword.endswith('*')
+            pattern = _fold(keyword.rstrip('*').strip())
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    state_output.append(-1)
+                state = nxt
+            if state_output[state] == -1:
+                state_output[state] = len(lengths)
+                lengths.append(len(pattern))
+                stems.append(1 if is_stem else 0)
+                emojis.append(emoji)
+
+        # Breadth-first construction of failure links. Each state keeps only
+        # the longest pattern ending at it, inherited through the fail chain.
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(char, 0) if state else 0
+                if state_output[nxt] == -1:
+                    state_output[nxt] = state_output[fail[nxt]]
+
+        offsets = array('I', [0])
+        labels = array('I')
+        targets = array('I')
+        for transitions in goto:
+            for char in sorted(transitions):
+                labels.append(ord(char))
+                targets.append(transitions[char])
+            offsets.append(len(labels))
+
+        return cls(offsets, labels, targets, array('I', fail), array('i', state_output),
+                   array('H', lengths), bytes(stems), emojis)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the automaton to its compact binary form"""
+        emoji_blob = '\0'.join(self.emojis).encode('utf-8')
+        header = _HEADER.pack(_MAGIC, _VERSION, len(self.fail), len(self.labels), len(self.lengths))
+        return b''.join([
+            header,
+            self.offsets.tobytes(), self.labels.tobytes(), self.targets.tobytes(),
+            self.fail.tobytes(), self.output.tobytes(), self.lengths.tobytes(),
+            self.stems, emoji_blob,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'EmojiAutomaton':
+        """Load an automaton previously produced by to_bytes()"""
+        magic, version, n_states, n_edges, n_patterns = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Invalid emoji automaton data")
+
+        pos = _HEADER.size
+
+        def take(typecode: str, count: int) -> array:
+            nonlocal pos
+            arr = array(typecode)
+            size = arr.itemsize * count
+            arr.frombytes(data[pos:pos + size])
+            pos += size
+            return arr
+
+        offsets = take('I', n_states + 1)
+        labels = take('I', n_edges)
+        targets = take('I', n_edges)
+        fail = take('I', n_states)
+        output = take('i', n_states)
+        lengths = take('H', n_patterns)
+        stems = data[pos:pos + n_patterns]
+        pos += n_patterns
+        emojis = data[pos:].decode('utf-8').split('\0') if n_patterns else []
+        return cls(offsets, labels, targets, fail, output, lengths, stems, emojis)
+
+    def _step(self, state: int, code: int) -> int:
+        """Follow goto/fail transitions for one input code point"""
+        offsets, labels = self.offsets, self.labels
+        while True:
+            lo, hi = offsets[state], offsets[state + 1]
+            while lo < hi:
+                mid = (lo + hi) >> 1
+                label = labels[mid]
+                if label == code:
+                    return self.targets[mid]
+                if label < code:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if state == 0:
+                return 0
+            state = self.fail[state]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Find non-overlapping whole-word keyword matches in one pass
+
+        Returns:
+            List of (start, end, emoji) with end pointing past the matched word
+        """
+        folded = _fold(text)
+        size = len(folded)
+        matches: List[Tuple[int, int, str]] = []
+        state = 0
+
+        for i, char in enumerate(folded):
+            state = self._step(state, ord(char))
+            pattern = self.output[state]
+            if pattern < 0:
+                continue
+
+            start = i + 1 - self.lengths[pattern]
+            if start > 0 and folded[start - 1].isalnum():
+                continue
+            end = i + 1
+            if self.stems[pattern]:
+                while end < size and folded[end].isalnum():
+                    end += 1
+            elif end < size and folded[end].isalnum():
+                continue
+
+            # Prefer the longer keyword when matches overlap ("bom" vs "bom dia")
+            if matches and start < matches[-1][1]:
+                prev_start, prev_end, _ = matches[-1]
+                if end - start <= prev_end - prev_start:
+                    continue
+                matches.pop()
+            matches.append((start, end, self.emojis[pattern]))
+
+        return matches
+
+
+class LocalEmojifier:
+    """Offline replacement for the 'emojify' API operation"""
+
+    def __init__(self, automaton: Optional[EmojiAutomaton] = None,
+                 words_per_emoji: int = 6, max_emojis: int = 40):
+        self.automaton = automaton or get_default_automaton()
+        self.words_per_emoji = words_per_emoji
+        self.max_emojis = max_emojis
+
+    def annotate(self, text: str) -> str:
+        """Insert emojis after matched keywords, respecting density limits"""
+        if not text:
+            return ""
+
+        matches = self.automaton.find(text)
+        if not matches:
+            return text
+
+        parts: List[str] = []
+        last = 0
+        added = 0
+        last_emoji = None
+        next_allowed_word = 0
+        word_count = 0
+        scanned = 0
+
+        for start, end, emoji in matches:
+            # Count words up to this match incrementally (single forward scan)
+            word_count += _count_words(text, scanned, start)
+            scanned = start
+            if added >= self.max_emojis:
+                break
+            if word_count < next_allowed_word or emoji == last_emoji:
+                continue
+            parts.append(text[last:end])
+            parts.append(' ' + emoji)
+            last = end
+            added += 1
+            last_emoji = emoji
+            next_allowed_word = word_count + self.words_per_emoji
+
+        parts.append(text[last:])
+        return ''.join(parts)
+
+
+def _count_words(text: str, start: int, end: int) -> int:
+    """Count word starts in text[start:end]"""
+    count = 0
+    prev_alnum = start > 0 and text[start - 1].isalnum()
+    for i in range(start, end):
+        is_alnum = text[i].isalnum()
+        if is_alnum and not prev_alnum:
+            count += 1
+        prev_alnum = is_alnum
+    return count
+
+
+_default_automaton: Optional[EmojiAutomaton] = None
+
+
+def get_default_automaton() -> EmojiAutomaton:
+    """Return the automaton for DEFAULT_LEXICON, compiled once per process"""
+    global _default_automaton
+    if _default_automaton is None:
+        _default_automaton = EmojiAutomaton.compile(DEFAULT_LEXICON)
+    return _default_automaton
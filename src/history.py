@@ -0,0 +1,208 @@
+"""
+Local request history in SQLite with full-text search
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+
+# Characters of the result shown in list rows
+PREVIEW_CHARS = 160
+
+# Upper bound for ids (SQLite rowids are signed 64-bit), for the first page
+_MAX_ID = 2 ** 63 - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    input_hash TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    model TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    latency_ms REAL,
+    input BLOB NOT NULL,
+    output BLOB NOT NULL,
+    preview TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_input ON history (input_hash, operation);
+"""
+
+# Contentless: the index only, the texts stay compressed in `history`
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    input, output, content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+def input_hash(text: str, operation: str) -> str:
+    """Key of an input for exact lookups"""
+    return hashlib.sha256(f"{operation}\0{text}".encode('utf-8')).hexdigest()
+
+
+def _pack(text: str) -> bytes:
+    return zlib.compress(text.encode('utf-8'), 6)
+
+
+def _unpack(blob: bytes) -> str:
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def fts_query(query: str) -> str:
+    """Turn what the user typed into an FTS5 query: every word, as a prefix"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+class HistoryStore:
+    """Processed texts with their operation, model, tokens and latency
+
+    WAL mode lets the Tk thread read the history while a worker records a
+    result. Inputs and outputs are stored zlib-compressed; the FTS5 index
+    is contentless, so the texts are not stored twice. Without FTS5 in the
+    local SQLite build, search falls back to scanning recent entries.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.fts = False
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (callers hold the lock)"""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            try:
+                connection.executescript(_FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def record(self, text: str, operation: str, result: str, model: Optional[str] = None,
+               input_tokens: Optional[int] = None, output_tokens: Optional[int] = None,
+               latency_ms: Optional[float] = None) -> int:
+        """Store one processed text; returns its id"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                cursor = connection.execute(
+                    'INSERT INTO history (created_at, input_hash, operation, model, input_tokens, output_tokens,'
+                    ' latency_ms, input, output, preview) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (time.time(), input_hash(text, operation), operation, model, input_tokens, output_tokens,
+                     latency_ms, _pack(text), _pack(result), ' '.join(result.split())[:PREVIEW_CHARS])
+                )
+                entry_id = cursor.lastrowid
+                if self.fts:
+                    connection.execute('INSERT INTO history_fts (rowid, input, output) VALUES (?, ?, ?)',
+                                       (entry_id, text, result))
+                self._prune(connection)
+            return entry_id
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        """Drop the oldest entries beyond max_entries"""
+        if self.max_entries <= 0:
+            return
+        rows = connection.execute(
+            'SELECT id, input, output FROM history ORDER BY id DESC LIMIT -1 OFFSET ?', (self.max_entries,)
+        ).fetchall()
+        for row in rows:
+            if self.fts:
+                # Contentless FTS5 rows are deleted by repeating their values
+                connection.execute(
+                    "INSERT INTO history_fts (history_fts, rowid, input, output) VALUES ('delete', ?, ?, ?)",
+                    (row['id'], _unpack(row['input']), _unpack(row['output']))
+                )
+            connection.execute('DELETE FROM history WHERE id = ?', (row['id'],))
+
+    def lookup(self, text: str, operation: str) -> Optional[str]:
+        """Latest result for exactly this input and operation"""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT output FROM history WHERE input_hash = ? AND operation = ? ORDER BY id DESC LIMIT 1',
+                (input_hash(text, operation), operation)
+            ).fetchone()
+        return _unpack(row['output']) if row else None
+
+    def search(self, query: str = '', limit: int = 50, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """One page of entries, newest first, matching query (all if empty)
+
+        Pages are keyed on the last id loaded (before_id), not an offset, so
+        entries recorded while a search is being paged do not shift the
+        next page. Rows carry a preview of the result, not the texts; get()
+        loads an entry in full.
+        """
+        columns = 'h.id, h.created_at, h.operation, h.model, h.input_tokens, h.output_tokens, h.latency_ms, h.preview'
+        query = query.strip()
+        before_id = _MAX_ID if before_id is None else before_id
+        with self._lock:
+            connection = self._connect()
+            if not query:
+                rows = connection.execute(
+                    f'SELECT {columns} FROM history h WHERE h.id < ? ORDER BY h.id DESC LIMIT ?', (before_id, limit)
+                ).fetchall()
+            elif self.fts:
+                rows = connection.execute(
+                    f'SELECT {columns} FROM history_fts JOIN history h ON h.id = history_fts.rowid'
+                    f' WHERE history_fts MATCH ? AND h.id < ? ORDER BY h.id DESC LIMIT ?',
+                    (fts_query(query), before_id, limit)
+                ).fetchall()
+            else:
+                rows = self._scan(connection, query, limit, before_id, columns)
+        return [dict(row) for row in rows]
+
+    def _scan(self, connection: sqlite3.Connection, query: str, limit: int, before_id: int,
+              columns: str) -> List[sqlite3.Row]:
+        """Search without FTS5: decompress entries newest first"""
+        terms = query.casefold().split()
+        matches = []
+        rows = connection.execute(
+            f'SELECT {columns}, h.input, h.output FROM history h WHERE h.id < ? ORDER BY h.id DESC', (before_id,))
+        for row in rows:
+            haystack = (_unpack(row['input']) + '\n' + _unpack(row['output'])).casefold()
+            if all(term in haystack for term in terms):
+                matches.append(row)
+                if len(matches) >= limit:
+                    break
+        return [{key: row[key] for key in row.keys() if key not in ('input', 'output')}
+                for row in matches]
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """One entry with its full input and output"""
+        with self._lock:
+            row = self._connect().execute('SELECT * FROM history WHERE id = ?', (entry_id,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry['input'] = _unpack(entry['input'])
+        entry['output'] = _unpack(entry['output'])
+        return entry
+
+    def count(self) -> int:
+        """Number of stored entries"""
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,193 @@
+"""
+Global hotkey daemon for zero-click processing
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from .config import Config
+from .ia_client import AIClient
+from .logger import Logger
+from .operations import run_operation
+from .text_processor import TextProcessor
+
+try:
+    from pynput import keyboard
+except ImportError:  # Optional dependency, hotkeys are unavailable without it
+    keyboard = None
+
+
+# Latency samples kept for the percentile stats
+LATENCY_SAMPLES = 200
+
+
+def _percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class HotkeyDaemon:
+    """Run operations on the current selection from global hotkeys
+
+    The pynput listener thread only timestamps the chord and hands it to a
+    worker thread, which grabs the selection through the clipboard service,
+    processes it and puts the result back on the clipboard (optionally
+    pasting it over the selection). No Tk widget is built on this path.
+
+    Every run records hotkey-to-result latency split into capture, process
+    and output phases.
+    """
+
+    def __init__(self, config: Config, ai_client: AIClient, text_processor: TextProcessor, logger: Logger):
+        self.config = config
+        self.ai_client = ai_client
+        self.text_processor = text_processor
+        self.logger = logger
+        self._listener = None
+        self._busy = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._stats_lock = threading.Lock()
+        self.dropped = 0
+        self.failed = 0
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check if pynput is installed"""
+        return keyboard is not None
+
+    def get_bindings(self) -> Dict[str, str]:
+        """Map each configured chord to its operation"""
+        bindings = {}
+        # 'translate' picks its direction at run time, so it has no prompt of its own
+        for operation in list(self.ai_client.get_system_prompts()) + ['translate']:
+            chord = self.config.get_hotkey(operation)
+            if chord:
+                bindings[chord] = operation
+        return bindings
+
+    def start(self) -> bool:
+        """Start listening for the configured chords
+
+        Returns:
+            False if pynput is missing or no chord is configured
+        """
+        if keyboard is None:
+            self.logger.warning("pynput not installed, global hotkeys disabled")
+            return False
+        bindings = self.get_bindings()
+        if not bindings:
+            self.logger.warning("No hotkeys configured")
+            return False
+
+        self._listener = keyboard.GlobalHotKeys({
+            chord: self._make_handler(operation) for chord, operation in bindings.items()
+        })
+        self._listener.daemon = True
+        self._listener.start()
+        self.logger.info("Hotkeys active: %s", bindings)
+        return True
+
+    def _make_handler(self, operation_type: str) -> Callable[[], None]:
+        """Build the listener callback for an operation"""
+        def on_activate():
+            pressed_at = time.perf_counter()
+            # Never block the listener thread: it would delay every keystroke
+            threading.Thread(
+                target=self.handle,
+                args=(operation_type, pressed_at),
+                name=f'Hotkey-{operation_type}',
+                daemon=True
+            ).start()
+        return on_activate
+
+    def handle(self, operation_type: str, pressed_at: Optional[float] = None) -> Optional[str]:
+        """Process the current selection and put the result back
+
+        Returns:
+            The result, or None if there was nothing to do or it failed
+        """
+        pressed_at = pressed_at or time.perf_counter()
+        if not self._busy.acquire(blocking=False):
+            self.dropped += 1
+            self.logger.info("Hotkey %s ignored: previous operation still running", operation_type)
+            return None
+
+        try:
+            # Only the current selection: falling back to the clipboard would
+            # process unrelated older text and paste it into the focused window
+            text = self.text_processor.get_selected_text()
+            captured_at = time.perf_counter()
+            if not text:
+                self.logger.info("Hotkey %s: nothing selected", operation_type)
+                return None
+
+            try:
+                result = run_operation(self.config, self.ai_client, self.text_processor, text, operation_type)
+            except ValueError as e:
+                self.logger.warning("Hotkey %s: %s", operation_type, e)
+                return None
+            processed_at = time.perf_counter()
+
+            # Only CLIPBOARD is written: taking PRIMARY would clear the
+            # selection the paste is meant to replace
+            if self.text_processor.copy_to_clipboard(result) and self.config.get_hotkeys_config()['paste_result']:
+                self._paste()
+            done_at = time.perf_counter()
+
+            self._record(operation_type, pressed_at, captured_at, processed_at, done_at)
+            return result
+        except Exception as e:
+            self.failed += 1
+            self.logger.error("Hotkey %s failed: %s", operation_type, e)
+            return None
+        finally:
+            self._busy.release()
+
+    def _paste(self) -> None:
+        """Paste the clipboard over the selection in the focused window"""
+        if keyboard is None:
+            return
+        controller = keyboard.Controller()
+        with controller.pressed(keyboard.Key.ctrl):
+            controller.tap('v')
+
+    def _record(self, operation_type: str, pressed_at: float, captured_at: float,
+                processed_at: float, done_at: float) -> None:
+        """Record one hotkey-to-result latency sample"""
+        sample = {
+            'capture': captured_at - pressed_at,
+            'process': processed_at - captured_at,
+            'output': done_at - processed_at,
+            'total': done_at - pressed_at
+        }
+        with self._stats_lock:
+            self._latencies.append(sample)
+        self.logger.info("Hotkey %s done in %.0f ms (capture %.0f ms, process %.0f ms, output %.0f ms)",
+                         operation_type, sample['total'] * 1000, sample['capture'] * 1000,
+                         sample['process'] * 1000, sample['output'] * 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hotkey-to-result latency statistics (milliseconds)"""
+        with self._stats_lock:
+            samples = list(self._latencies)
+        stats: Dict[str, Any] = {'runs': len(samples), 'dropped': self.dropped, 'failed': self.failed}
+        for phase in ('capture', 'process', 'output', 'total'):
+            values = [sample[phase] * 1000 for sample in samples]
+            stats[f'{phase}_p50_ms'] = _percentile(values, 0.5)
+            stats[f'{phase}_p95_ms'] = _percentile(values, 0.95)
+        return stats
+
+    def stop(self) -> None:
+        """Stop listening"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self.logger.info("Hotkeys stopped: %s", self.get_stats())
+
+    def join(self) -> None:
+        """Block until the listener stops"""
+        if self._listener is not None:
+            self._listener.join()
@@ -1,10 +1,35 @@
 """
 IA client for OpenAI integration
 """
-from typing import Dict, Optional, Any
-from openai import OpenAI
-from .config import Config
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .config import Config, ConfigSnapshot
 from .logger import Logger
+from .emojify import LocalEmojifier
+from .langid import LanguageIdentifier
+from .masking import ProtectedSpanMasker
+from .metrics import (API_RETRIES, BUDGET_EXCEEDED, CACHE_LOOKUPS, COST, FIRST_TOKEN_SECONDS, OPERATION_SECONDS,
+                      OPERATIONS, RATE_LIMITED, TOKENS)
+from .segmenter import SentenceSegmenter
+from .similarity import SimilarityCache
+from .tokens import TokenBudget, TokenCounter, TokenRateLimiter
+from .tracing import span
+from .usage import BudgetExceeded, UsageLedger
+
+
+# Target language of each translation operation
+TRANSLATION_TARGETS = {
+    'translate_en': 'en',
+    'translate_pt': 'pt'
+}
+
+# Retries after a transient API failure; the SDK's own retries are off so
+# each one is counted (same policy as the SDK: exponential backoff capped
+# at API_MAX_BACKOFF seconds, or the server's Retry-After)
+API_MAX_RETRIES = 2
+API_MAX_BACKOFF = 8.0
 
 
 class AIClient:
@@ -14,27 +39,191 @@ class AIClient:
         self.config = config
         self.logger = logger
         self.client = None
+        self._api_key = ''
+        self._client_lock = threading.Lock()
+        self._local_engines = {
+            'emojify': LocalEmojifier
+        }
+        self._local_instances: Dict[str, Any] = {}
+        self.language_identifier = LanguageIdentifier()
+        self.masker = ProtectedSpanMasker()
+        self.segmenter = SentenceSegmenter()
+        self.similarity_cache: Optional[SimilarityCache] = None
+        similarity_config = self.config.get_similarity_config()
+        if similarity_config['enabled']:
+            self.similarity_cache = SimilarityCache(
+                similarity_config['capacity'], similarity_config['threshold']
+            )
+        self.token_budget = TokenBudget(TokenCounter(self.config.get('DEFAULT', 'model', 'gpt-3.5-turbo')))
+        self.rate_limiter: Optional[TokenRateLimiter] = None
+        self.usage: Optional[UsageLedger] = None
+        usage_config = self.config.get_usage_config()
+        if usage_config['enabled']:
+            self.usage = UsageLedger(usage_config['file'], usage_config['retention_days'])
+        self._call_usage = threading.local()
         self._setup_clients()
+        self.config.add_listener(self._on_config_change)
     
     def _setup_clients(self) -> None:
-        """Setup OpenAI clients"""
+        """Setup OpenAI clients
+        
+        The client itself is created on the first request: importing openai
+        costs more than the rest of the startup, and the config dialog,
+        local backends and daemon clients never need it.
+        """
         openai_config = self.config.get_openai_config()
-        api_key = openai_config['api_key']
+        self._api_key = openai_config['api_key']
+        self.client = None
+        
+        tpm_limit = self.config.get_tpm_limit()
+        self.rate_limiter = TokenRateLimiter(tpm_limit) if tpm_limit > 0 else None
         
-        if not api_key:
+        if not self._api_key:
             self.logger.warning("OpenAI API key not configured")
-            return
+    
+    def _get_client(self):
+        """Get the OpenAI client, creating it on first use"""
+        with self._client_lock:
+            if self.client is None:
+                with span('client_setup'):
+                    from openai import OpenAI
+                    try:
+                        self.client = OpenAI(api_key=self._api_key, timeout=self.config.get_openai_config()['timeout'],
+                                             max_retries=0)
+                        self.logger.info("OpenAI client initialized successfully")
+                    except Exception as e:
+                        self.logger.error("Failed to initialize OpenAI client: %s", e)
+                        raise
+            return self.client
+    
+    def warm_up(self) -> Optional[threading.Thread]:
+        """Create the OpenAI client in a background thread
         
-        try:
-            self.client = OpenAI(api_key=api_key, timeout=openai_config['timeout'])
-            self.logger.info("OpenAI client initialized successfully")
-        except Exception as e:
-            self.logger.error(f"Failed to initialize OpenAI client: {e}")
-            raise
+        Long-running modes (server, daemon) call this before serving so the
+        first request does not pay for importing openai.
+        """
+        if not self._api_key:
+            return None
+        
+        def build():
+            try:
+                self._get_client()
+            except Exception:
+                pass  # Logged by _get_client; the first request will retry
+        
+        thread = threading.Thread(target=build, name='ClientWarmUp', daemon=True)
+        thread.start()
+        return thread
+    
+    def _on_config_change(self, old: ConfigSnapshot, new: ConfigSnapshot) -> None:
+        """Rebuild only what the changed settings affect"""
+        if (old.openai.api_key, old.openai.timeout) != (new.openai.api_key, new.openai.timeout):
+            with self._client_lock:
+                self._api_key = new.openai.api_key
+                self.client = None
+            self.logger.info("OpenAI key or timeout changed, client will be rebuilt on the next request")
+        if old.tpm_limit != new.tpm_limit:
+            self.rate_limiter = TokenRateLimiter(new.tpm_limit) if new.tpm_limit > 0 else None
+            self.logger.info("TPM limit changed to %s", new.tpm_limit)
     
     def is_configured(self) -> bool:
         """Check if client is properly configured"""
-        return self.client is not None
+        return bool(self._api_key)
+    
+    def uses_local_backend(self, operation_type: str) -> bool:
+        """Check if an operation is configured to run on a local engine"""
+        return (operation_type in self._local_engines and
+                self.config.get_backend(operation_type) == 'local')
+    
+    def _process_locally(self, text: str, operation_type: str) -> str:
+        """Process text with the offline engine for the operation"""
+        engine = self._local_instances.get(operation_type)
+        if engine is None:
+            engine = self._local_engines[operation_type]()
+            self._local_instances[operation_type] = engine
+        result = engine.annotate(text)
+        self.logger.info("Text processed locally: %s", operation_type)
+        return result
+    
+    def resolve_translation(self, text: str, operation_type: str, skip_same_language: bool = True) -> Optional[str]:
+        """Resolve translation operations using local language detection
+        
+        'translate' picks the direction from the detected language. Returns
+        None when the text is already in the target language, meaning the
+        API call can be skipped (unless skip_same_language is False).
+        """
+        if operation_type == 'translate':
+            operation_type = self.language_identifier.pick_translation(text)
+            self.logger.info("Translation direction picked: %s", operation_type)
+        
+        target = TRANSLATION_TARGETS.get(operation_type)
+        if target:
+            translation_config = self.config.get_translation_config()
+            if skip_same_language and translation_config['skip_same_language']:
+                language = self.language_identifier.dominant_language(
+                    text, translation_config['min_confidence']
+                )
+                if language == target:
+                    self.logger.info("Text already in '%s', skipping %s", target, operation_type)
+                    return None
+        return operation_type
+    
+    def preflight(self, text: str, operation_type: str) -> Dict[str, Any]:
+        """Count tokens and check model limits before calling the API"""
+        openai_settings = self.config.snapshot().openai
+        model = openai_settings.model
+        if self.token_budget.counter.model != model:
+            self.token_budget = TokenBudget(TokenCounter(model))
+        return self.token_budget.preflight(
+            text,
+            model,
+            openai_settings.max_tokens,
+            self.get_system_prompts().get(operation_type, ''),
+            self.get_user_prompts().get(operation_type, '{text}'),
+            self.config.get_max_input_tokens(model)
+        )
+    
+    def mask_text(self, text: str, operation_type: str) -> Tuple[str, List[str]]:
+        """Mask protected spans when the operation is configured for it"""
+        masking_config = self.config.get_masking_config()
+        if not masking_config['enabled'] or operation_type not in masking_config['operations']:
+            return text, []
+        masked_text, spans = self.masker.mask(text)
+        if spans:
+            self.logger.debug("Masked %d protected spans for %s", len(spans), operation_type)
+        return masked_text, spans
+    
+    def _restore_masked(self, masked_text: str, result: str, spans: List[str], operation_type: str) -> str:
+        """Restore protected spans, retrying per chunk if placeholders were lost"""
+        expected = self.masker.placeholders_in(masked_text)
+        if not self.masker.missing(result, expected):
+            return self.masker.restore(result, spans)
+        
+        self.logger.warning("Placeholders lost in %s result, retrying per chunk", operation_type)
+        pieces = []
+        for start, end in self.segmenter.paragraphs(masked_text):
+            chunk = masked_text[start:end]
+            if self.masker.is_placeholder_only(chunk):
+                pieces.append(chunk)
+                continue
+            chunk_result = self._complete(chunk, operation_type)
+            if self.masker.missing(chunk_result, self.masker.placeholders_in(chunk)):
+                # Last resort: this chunk goes unmasked
+                self.logger.warning("Placeholders lost again, sending chunk unmasked: %s", operation_type)
+                chunk_result = self._complete(self.masker.restore(chunk, spans), operation_type)
+            pieces.append(chunk_result)
+        return self.masker.restore('\n\n'.join(pieces), spans)
+    
+    def get_draft(self, text: str, operation_type: str) -> Optional[str]:
+        """Get a cached result for a near-duplicate input to offer as a draft"""
+        if not self.similarity_cache or not text:
+            return None
+        match = self.similarity_cache.lookup(operation_type, text)
+        CACHE_LOOKUPS.inc(self._metric_label(operation_type), 'hit' if match else 'miss')
+        if match:
+            self.logger.info("Near-duplicate draft found for %s (similarity %.2f)", operation_type, match[1])
+            return match[0]
+        return None
     
     def get_system_prompts(self) -> Dict[str, str]:
         """Get system prompts for different operations"""
@@ -74,61 +263,384 @@ class AIClient:
             'rewrite': "Por favor, reescreva este texto de forma mais envolvente e clara. Responda em português brasileiro:\n\n{text}"
         }
     
-    def process_text(self, text: str, operation_type: str) -> str:
-        """Process text using OpenAI API with timeout protection"""
+    def _metric_label(self, operation_type: str) -> str:
+        """Operation name for metric labels; unknown names share one series"""
+        if operation_type in self.get_system_prompts() or operation_type == 'translate':
+            return operation_type
+        return 'other'
+    
+    def last_usage(self) -> Optional[Dict[str, Any]]:
+        """Model, tokens and cost of the calling thread's last process_text()
+        or stream_text(); None if it made no API call"""
+        return getattr(self._call_usage, 'totals', None)
+    
+    def _select_model(self, model: str) -> str:
+        """Apply the budget: the model to call, or BudgetExceeded to block"""
+        budget = self.config.snapshot().budget
+        if not self.usage or not budget.enabled:
+            return model
+        try:
+            limit = self.usage.exceeded(budget)
+        except Exception as e:
+            self.logger.warning("Could not check usage budget: %s", e)
+            return model
+        if limit is None:
+            return model
+        BUDGET_EXCEEDED.inc(budget.action)
+        if budget.action == 'block':
+            raise BudgetExceeded(f"Orçamento de uso atingido ({limit}). Ajuste os limites em [BUDGET].")
+        if budget.action == 'downgrade' and budget.downgrade_model and budget.downgrade_model != model:
+            self.logger.warning("Usage budget reached (%s), using %s instead of %s", limit,
+                                budget.downgrade_model, model)
+            return budget.downgrade_model
+        self.logger.warning("Usage budget reached (%s)", limit)
+        return model
+    
+    def _account(self, operation_type: str, model: str, input_tokens: int, output_tokens: int,
+                 estimated: bool = False) -> None:
+        """Count the tokens and cost of one API call"""
+        TOKENS.inc(model, 'in', amount=input_tokens)
+        TOKENS.inc(model, 'out', amount=output_tokens)
+        cost = 0.0
+        if self.usage:
+            try:
+                cost = self.usage.record(operation_type, model, input_tokens, output_tokens, estimated)
+            except Exception as e:
+                self.logger.warning("Could not record usage: %s", e)
+        if cost:
+            COST.inc(model, amount=cost)
+        totals = getattr(self._call_usage, 'totals', None)
+        if totals is None:
+            totals = self._call_usage.totals = {'model': model, 'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0}
+        totals['input_tokens'] += input_tokens
+        totals['output_tokens'] += output_tokens
+        totals['cost'] += cost
+    
+    def process_text(self, text: str, operation_type: str, skip_same_language: bool = True) -> str:
+        """Process text using OpenAI API with timeout protection
+        
+        skip_same_language=False always sends translations, for text known
+        to mix languages.
+        """
+        label = self._metric_label(operation_type)
+        self._call_usage.totals = None
+        start = time.perf_counter()
+        try:
+            result = self._process_text(text, operation_type, skip_same_language)
+        except Exception:
+            OPERATIONS.inc(label, 'error')
+            raise
+        OPERATIONS.inc(label, 'ok')
+        OPERATION_SECONDS.observe(time.perf_counter() - start, label)
+        return result
+    
+    def _process_text(self, text: str, operation_type: str, skip_same_language: bool = True) -> str:
+        """process_text() without the metrics"""
+        if self.uses_local_backend(operation_type):
+            if not text or not text.strip():
+                raise ValueError("Text cannot be empty")
+            with span('local_engine', operation=operation_type):
+                return self._process_locally(text, operation_type)
+        
         if not self.is_configured():
             raise Exception("OpenAI client not configured. Please set up your API key.")
         
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
         
+        result, request = self._prepare(text, operation_type, skip_same_language)
+        if result is not None:
+            return result
+        return self._send(text, request)
+    
+    def _prepare(self, text: str, operation_type: str,
+                 skip_same_language: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Resolve, look up, mask and preflight a request before the API call
+        
+        Shared by process_text() and stream_text(), so both trace the same
+        phases.
+        
+        Returns:
+            (result, request): result is the reply when no API call is
+            needed (skipped translation, cache hit); otherwise request has
+            the resolved operation, masked text, masked spans and preflight
+        """
+        with span('resolve_translation') as attributes:
+            resolved_operation = self.resolve_translation(text, operation_type, skip_same_language)
+            attributes['skipped'] = resolved_operation is None
+        if resolved_operation is None:
+            return text.strip(), {}
+        operation_type = resolved_operation
+        
+        if self.similarity_cache and self.similarity_cache.is_safe(operation_type):
+            with span('cache_lookup') as attributes:
+                match = self.similarity_cache.lookup(operation_type, text)
+                attributes['cache_hit'] = match is not None
+            CACHE_LOOKUPS.inc(self._metric_label(operation_type), 'hit' if match else 'miss')
+            if match:
+                self.logger.info("Reusing near-duplicate result for %s (similarity %.2f)", operation_type, match[1])
+                return match[0], {}
+        
+        with span('mask') as attributes:
+            masked_text, spans = self.mask_text(text, operation_type)
+            attributes['masked_spans'] = len(spans)
+        with span('preflight') as attributes:
+            preflight = self.preflight(masked_text, operation_type)
+            attributes['prompt_tokens'] = preflight['prompt_tokens']
+        if not preflight['fits'] or preflight['needs_chunking']:
+            raise Exception(
+                f"Texto muito longo para o modelo {preflight['model']}: "
+                f"{preflight['input_tokens']} tokens (limite {preflight['max_input_tokens']})."
+            )
+        self.logger.debug("Preflight: %s prompt tokens, estimated cost $%.5f",
+                          preflight['prompt_tokens'], preflight['estimated_cost'])
+        return None, {'operation': operation_type, 'masked_text': masked_text, 'spans': spans,
+                      'preflight': preflight}
+    
+    def _send(self, text: str, request: Dict[str, Any]) -> str:
+        """Send a prepared request and return the whole reply"""
+        operation_type = request['operation']
+        masked_text = request['masked_text']
+        spans = request['spans']
         try:
-            openai_config = self.config.get_openai_config()
-            system_prompts = self.get_system_prompts()
-            user_prompts = self.get_user_prompts()
-            
-            if operation_type not in system_prompts:
+            if operation_type not in self.get_system_prompts():
                 raise ValueError(f"Unknown operation type: {operation_type}")
             
-            self.logger.info(f"Processing text with operation: {operation_type}")
+            self.logger.info("Processing text with operation: %s", operation_type)
+            result = self._complete(masked_text, operation_type, request['preflight']['total_tokens'])
+            if spans:
+                with span('restore_masked'):
+                    result = self._restore_masked(masked_text, result, spans, operation_type)
+            
+            if self.similarity_cache:
+                self.similarity_cache.store(operation_type, text, result)
+            self.logger.info("Text processed successfully: %s", operation_type)
+            return result
             
-            # Create request with timeout
-            response = self.client.chat.completions.create(
-                model=openai_config['model'],
+        except Exception as e:
+            raise self._api_error(e)
+    
+    def _api_error(self, e: Exception) -> Exception:
+        """Log an API failure and turn it into a user-facing error"""
+        error_msg = str(e)
+        if isinstance(e, BudgetExceeded):
+            self.logger.error("Request blocked by usage budget: %s", e)
+            return e
+        elif "timeout" in error_msg.lower():
+            self.logger.error("OpenAI API timeout: %s", e)
+            return Exception("Timeout ao processar texto. Tente novamente.")
+        elif "rate limit" in error_msg.lower():
+            self.logger.error("OpenAI API rate limit: %s", e)
+            return Exception("Limite de requisições excedido. Aguarde um momento e tente novamente.")
+        elif "authentication" in error_msg.lower() or "unauthorized" in error_msg.lower():
+            self.logger.error("OpenAI API authentication error: %s", e)
+            return Exception("Erro de autenticação. Verifique sua chave de API.")
+        else:
+            self.logger.error("Error processing text with OpenAI: %s", e)
+            return Exception(f"Falha ao processar texto: {error_msg}")
+    
+    def stream_text(self, text: str, operation_type: str) -> Iterator[str]:
+        """Process text, yielding the reply in pieces as the API sends it
+        
+        Replies that need the whole text before they can be returned (local
+        engines, cache hits, skipped translations, masked spans) come as a
+        single piece. The request goes through the same traced phases as
+        process_text(), once.
+        """
+        self._call_usage.totals = None
+        if (self.uses_local_backend(operation_type) or not self.is_configured()
+                or not text or not text.strip()):
+            yield self.process_text(text, operation_type)
+            return
+        
+        label = self._metric_label(operation_type)
+        start = time.perf_counter()
+        try:
+            result, request = self._prepare(text, operation_type)
+            if result is None and (request['spans'] or request['operation'] not in self.get_system_prompts()):
+                # Restoring masked spans needs the whole reply
+                result = self._send(text, request)
+        except Exception:
+            OPERATIONS.inc(label, 'error')
+            raise
+        if result is not None:
+            OPERATIONS.inc(label, 'ok')
+            OPERATION_SECONDS.observe(time.perf_counter() - start, label)
+            yield result
+            return
+        operation_type = request['operation']
+        preflight = request['preflight']
+        
+        self.logger.info("Streaming text with operation: %s", operation_type)
+        usage: Dict[str, Any] = {}
+        pieces = []
+        try:
+            with span('model', stream=True, prompt_tokens=preflight['prompt_tokens']) as attributes:
+                started = time.perf_counter()
+                for piece in self._complete_stream(text, operation_type, preflight['total_tokens'], usage):
+                    if not pieces:
+                        piece = piece.lstrip()
+                        if not piece:
+                            continue
+                        first_token = time.perf_counter() - started
+                        attributes['first_token_ms'] = round(first_token * 1000, 3)
+                        FIRST_TOKEN_SECONDS.observe(first_token, label)
+                    pieces.append(piece)
+                    yield piece
+                attributes['chunks'] = len(pieces)
+                attributes['model'] = usage.get('model')
+        except Exception as e:
+            OPERATIONS.inc(label, 'error')
+            raise self._api_error(e)
+        if not pieces:
+            OPERATIONS.inc(label, 'error')
+            raise self._api_error(Exception("Empty response from OpenAI API"))
+        
+        if 'prompt_tokens' in usage:
+            self._account(operation_type, usage['model'], usage['prompt_tokens'], usage['completion_tokens'])
+        else:
+            # No usage chunk (e.g. a proxy that drops it): count the reply locally
+            self._account(operation_type, usage['model'], preflight['prompt_tokens'],
+                          self.token_budget.counter.count(''.join(pieces)), estimated=True)
+        OPERATIONS.inc(label, 'ok')
+        OPERATION_SECONDS.observe(time.perf_counter() - start, label)
+        
+        if self.similarity_cache:
+            self.similarity_cache.store(operation_type, text, ''.join(pieces).strip())
+        self.logger.info("Text streamed successfully: %s", operation_type)
+    
+    def _complete(self, text: str, operation_type: str, total_tokens: Optional[int] = None) -> str:
+        """Send one chat completion request and return the stripped reply"""
+        openai_settings = self.config.snapshot().openai
+        
+        if self.rate_limiter:
+            if total_tokens is None:
+                total_tokens = self.preflight(text, operation_type)['total_tokens']
+            with span('rate_limit_wait', tokens=total_tokens):
+                if not self.rate_limiter.acquire(total_tokens, openai_settings.timeout):
+                    RATE_LIMITED.inc('local')
+                    raise Exception("rate limit: local TPM budget exhausted")
+        
+        model = self._select_model(openai_settings.model)
+        
+        # Create request with timeout
+        with span('model', model=model) as attributes:
+            response = self._create_completion(
+                model=model,
                 messages=[
                     {
                         "role": "system",
-                        "content": system_prompts[operation_type]
+                        "content": self.get_system_prompts()[operation_type]
                     },
                     {
                         "role": "user",
-                        "content": user_prompts[operation_type].format(text=text)
+                        "content": self.get_user_prompts()[operation_type].format(text=text)
                     }
                 ],
-                max_tokens=openai_config['max_tokens'],
-                temperature=openai_config['temperature'],
-                timeout=openai_config['timeout']  # Ensure timeout is applied
+                max_tokens=openai_settings.max_tokens,
+                temperature=openai_settings.temperature,
+                timeout=openai_settings.timeout  # Ensure timeout is applied
             )
-            
-            if not response.choices or not response.choices[0].message.content:
-                raise Exception("Empty response from OpenAI API")
-            
-            result = response.choices[0].message.content.strip()
-            self.logger.info(f"Text processed successfully: {operation_type}")
-            return result
-            
-        except Exception as e:
-            error_msg = str(e)
-            if "timeout" in error_msg.lower():
-                self.logger.error(f"OpenAI API timeout: {e}")
-                raise Exception("Timeout ao processar texto. Tente novamente.")
-            elif "rate limit" in error_msg.lower():
-                self.logger.error(f"OpenAI API rate limit: {e}")
-                raise Exception("Limite de requisições excedido. Aguarde um momento e tente novamente.")
-            elif "authentication" in error_msg.lower() or "unauthorized" in error_msg.lower():
-                self.logger.error(f"OpenAI API authentication error: {e}")
-                raise Exception("Erro de autenticação. Verifique sua chave de API.")
-            else:
-                self.logger.error(f"Error processing text with OpenAI: {e}")
-                raise Exception(f"Falha ao processar texto: {error_msg}")
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                attributes['prompt_tokens'] = usage.prompt_tokens
+                attributes['completion_tokens'] = usage.completion_tokens
+                self._account(operation_type, model, usage.prompt_tokens, usage.completion_tokens)
+        
+        if not response.choices or not response.choices[0].message.content:
+            raise Exception("Empty response from OpenAI API")
+        
+        return response.choices[0].message.content.strip()
+    
+    def _complete_stream(self, text: str, operation_type: str, total_tokens: Optional[int] = None,
+                         usage: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Send one streaming chat completion request and yield the content deltas
+        
+        If given, usage gets the model called and, once the stream ends, the
+        prompt_tokens/completion_tokens reported in its final chunk.
+        """
+        openai_settings = self.config.snapshot().openai
+        if usage is None:
+            usage = {}
+        
+        if self.rate_limiter:
+            if total_tokens is None:
+                total_tokens = self.preflight(text, operation_type)['total_tokens']
+            with span('rate_limit_wait', tokens=total_tokens):
+                if not self.rate_limiter.acquire(total_tokens, openai_settings.timeout):
+                    RATE_LIMITED.inc('local')
+                    raise Exception("rate limit: local TPM budget exhausted")
+        
+        model = usage['model'] = self._select_model(openai_settings.model)
+        stream = self._create_completion(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": self.get_system_prompts()[operation_type]
+                },
+                {
+                    "role": "user",
+                    "content": self.get_user_prompts()[operation_type].format(text=text)
+                }
+            ],
+            max_tokens=openai_settings.max_tokens,
+            temperature=openai_settings.temperature,
+            timeout=openai_settings.timeout,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            chunk_usage = getattr(chunk, 'usage', None)
+            if chunk_usage is not None:
+                usage['prompt_tokens'] = chunk_usage.prompt_tokens
+                usage['completion_tokens'] = chunk_usage.completion_tokens
+    
+    def _create_completion(self, **request) -> Any:
+        """Create a chat completion, retrying transient failures"""
+        client = self._get_client()
+        attempt = 0
+        while True:
+            try:
+                return client.chat.completions.create(**request)
+            except Exception as e:
+                reason = self._retry_reason(e)
+                if reason == 'rate_limit':
+                    RATE_LIMITED.inc('api')
+                if reason is None or attempt >= API_MAX_RETRIES:
+                    raise
+                attempt += 1
+                API_RETRIES.inc(reason)
+                delay = self._retry_delay(e, attempt)
+                self.logger.warning("OpenAI request failed (%s), retry %d in %.1fs", reason, attempt, delay)
+                time.sleep(delay)
     
+    @staticmethod
+    def _retry_reason(e: Exception) -> Optional[str]:
+        """Why a failed request is worth retrying, or None if it is not"""
+        import openai
+        if isinstance(e, openai.APITimeoutError):
+            return 'timeout'
+        if isinstance(e, openai.APIConnectionError):
+            return 'connection'
+        status = getattr(e, 'status_code', None)
+        if status == 429:
+            return 'rate_limit'
+        if status in (408, 409) or (isinstance(status, int) and status >= 500):
+            return 'server_error'
+        return None
+    
+    @staticmethod
+    def _retry_delay(e: Exception, attempt: int) -> float:
+        """Seconds to wait before a retry: Retry-After if sent, else backoff with jitter"""
+        response = getattr(e, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            retry_after = float(headers.get('retry-after', ''))
+            if 0 <= retry_after <= 60:
+                return retry_after
+        except (TypeError, ValueError):
+            pass
+        return min(0.5 * 2 ** (attempt - 1), API_MAX_BACKOFF) * (1 - 0.25 * random.random())
@@ -0,0 +1,190 @@
+"""
+Fast local language identification (pt/en) with character trigrams
+"""
+import math
+import re
+from typing import List, Optional, Tuple
+
+
+# Precomputed trigram profile table. Each weight is the smoothed log-odds
+# ratio P(trigram | pt) / P(trigram | en), scaled by 100: positive values
+# point to Portuguese, negative values to English.
+_TRIGRAM_WEIGHTS = {
+    ' a ': 61, ' ab': -86, ' an': -153, ' ao': 193, ' ar': -258, ' as': 121,
+    ' at': -97, ' be': -221, ' bu': -284, ' ch': -60, ' co': 81, ' da': 50,
+    ' de': 166, ' di': 160, ' e ': 360, ' el': 239, ' em': 270, ' es': 232,
+    ' ev': -196, ' fo': -123, ' fr': -86, ' fu': 84, ' go': -86, ' ha': -148,
+    ' he': -258, ' ho': -80, ' i ': -331, ' im': -86, ' in': -62, ' is': -196,
+    ' it': -315, ' ju': 193, ' kn': -196, ' la': -80, ' le': -60, ' li': -60,
+    ' ma': 56, ' me': 101, ' mo': -86, ' mu': 121, ' na': 84, ' ne': -284,
+    ' no': 73, ' nã': 239, ' o ': 342, ' of': -247, ' os': 282, ' pa': 232,
+    ' pe': 126, ' po': 141, ' pr': 109, ' qu': 265, ' se': 65, ' sh': -221,
+    ' so': -60, ' st': -241, ' te': 84, ' th': -495, ' ti': -86, ' to': -116,
+    ' tr': 61, ' um': 255, ' un': -196, ' va': 219, ' vi': 129, ' vo': 270,
+    ' wa': -258, ' we': -296, ' wh': -296, ' wi': -338, ' wo': -284,
+    ' yo': -345, ' é ': 282, 'a a': 255, 'a c': 183, 'a d': 282, 'a e': 342,
+    'a i': 193, 'a l': 84, 'a m': 129, 'a n': 193, 'a o': 282, 'a p': 168,
+    'a q': 239, 'a r': 193, 'a s': 193, 'a t': 193, 'a v': 219, 'aba': 193,
+    'acc': -196, 'ada': 239, 'ade': 109, 'ado': 219, 'age': -111, 'ais': 193,
+    'al ': 50, 'alh': 193, 'all': -196, 'am ': 109, 'amb': 193, 'amo': 239,
+    'an ': -196, 'ana': 193, 'anc': -196, 'and': -196, 'ang': -111,
+    'anh': 193, 'ant': 109, 'any': -221, 'anç': 193, 'ar ': 245, 'ara': 293,
+    'are': -175, 'ari': 193, 'art': -86, 'as ': 162, 'ase': -86, 'at ': -345,
+    'ate': -258, 'ati': -205, 'aul': 193, 'aus': -111, 'ave': -86,
+    'ay ': -221, 'ays': -196, 'açã': 282, 'bal': 193, 'be ': -196,
+    'bec': -221, 'ber': -86, 'ble': -60, 'but': -241, 'cas': 193, 'cat': -111,
+    'cau': -111, 'caç': 193, 'ce ': -111, 'cer': 109, 'cia': 239, 'cid': 193,
+    'cis': 84, 'ck ': -221, 'com': 141, 'con': 65, 'cou': -86, 'cê ': 239,
+    'd a': -196, 'd g': -196, 'd i': -196, 'd m': -241, 'd s': -196,
+    'd t': -323, 'd w': -241, 'da ': 328, 'dad': 239, 'das': 255, 'day': -258,
+    'de ': 300, 'der': 84, 'dia': 219, 'din': -86, 'do ': 148, 'dos': 219,
+    'e b': -221, 'e c': -83, 'e e': 84, 'e h': -196, 'e i': -170, 'e m': 88,
+    'e n': -111, 'e p': 109, 'e q': 193, 'e r': -86, 'e s': -120, 'e u': 84,
+    'e v': 129, 'e w': -338, 'eas': -241, 'eca': -111, 'eci': 146,
+    'ed ': -331, 'eek': -196, 'een': -196, 'egu': 255, 'ei ': 239, 'eir': 84,
+    'ela': 282, 'elh': 193, 'em ': 129, 'ema': 160, 'eme': -196, 'emp': 239,
+    'en ': -315, 'end': -272, 'ens': 84, 'ent': 41, 'er ': -103, 'ery': -258,
+    'es ': 41, 'esc': 193, 'ese': 109, 'esp': 219, 'est': 160, 'et ': -162,
+    'eu ': 255, 'eve': -77, 'ew ': -241, 'ext': -196, 'ey ': -241,
+    'f t': -296, 'for': -95, 'g i': -196, 'g t': -196, 'ge ': -196, 'gue': 84,
+    'gun': 193, 'h a': -196, 'h t': -272, 'han': -221, 'hat': -306,
+    'he ': -459, 'her': -258, 'hey': -196, 'his': -221, 'ho ': 146,
+    'hor': 219, 'hou': -221, 'hã ': 193, 'i w': -196, 'ia ': 321, 'ias': 239,
+    'ida': 146, 'ies': -196, 'ill': -272, 'imp': -60, 'in ': -306,
+    'ing': -323, 'io ': 193, 'ion': -241, 'is ': -111, 'isa': 219,
+    'ish': -196, 'ist': 146, 'it ': -296, 'ita': 219, 'ith': -306, 'ito': 239,
+    'its': -196, 'ity': -196, 'k t': -196, 'kno': -196, 'l é': 193,
+    'la ': 255, 'lan': -86, 'lat': -131, 'laç': 219, 'ld ': -284, 'le ': -63,
+    'lea': -241, 'lho': 255, 'll ': -272, 'ly ': -221, 'm a': 132, 'm c': 129,
+    'm d': 219, 'm p': 193, 'm q': 193, 'ma ': 293, 'mai': 78, 'mas': 282,
+    'mbe': -196, 'me ': -111, 'mel': 193, 'men': 62, 'mes': 84, 'mil': -60,
+    'mor': -97, 'mos': 109, 'mpo': 109, 'mui': 255, 'my ': -196, 'n a': -221,
+    'n i': -241, 'n m': -221, 'n o': -196, 'n t': -306, 'n y': -196,
+    'na ': 282, 'nce': -148, 'nci': 219, 'nd ': -377, 'nda': 109, 'ndo': 193,
+    'ne ': -196, 'new': -196, 'nex': -86, 'ng ': -331, 'ngu': -86, 'nhã': 193,
+    'nin': -196, 'nk ': -196, 'no ': 270, 'nom': 109, 'nos': 219, 'not': -111,
+    'now': -196, 'nsa': 193, 'nt ': -241, 'nta': 193, 'nte': 115, 'nti': -80,
+    'nto': 255, 'nts': -196, 'ny ': -221, 'não': 239, 'nça': 219, 'o a': 160,
+    'o c': 293, 'o d': 336, 'o e': 293, 'o f': 239, 'o l': 84, 'o m': 255,
+    'o o': 193, 'o p': 270, 'o q': 219, 'o s': 239, 'o v': 219, 'o y': -196,
+    'ocê': 239, 'od ': -196, 'ode': 84, 'odo': 193, 'of ': -345, 'om ': 203,
+    'omi': 193, 'on ': -351, 'one': -111, 'ono': 84, 'ont': 109, 'ood': -196,
+    'ora': 219, 'ore': -86, 'ork': -241, 'orq': 193, 'os ': 422, 'ot ': -258,
+    'ou ': -101, 'oul': -272, 'our': -272, 'out': -86, 'ove': -221,
+    'ow ': -272, 'par': 160, 'pel': 255, 'pes': 193, 'ple': -131, 'po ': 193,
+    'por': 142, 'pre': 129, 'qua': 109, 'que': 384, 'qui': 219, 'r c': 129,
+    'r f': -111, 'r p': 193, 'r t': -162, 'ra ': 303, 'rab': 219, 'ral': -86,
+    'rar': 84, 'ras': 193, 'rat': -111, 're ': -111, 'rec': 219, 'res': 121,
+    'ria': 293, 'rk ': -221, 'ro ': 239, 'ros': 239, 'row': -196, 'rqu': 219,
+    'rs ': -196, 'rtu': 193, 'ry ': -272, 's b': -148, 's c': 109, 's d': 365,
+    's e': 181, 's i': -90, 's m': 151, 's n': 84, 's o': -60, 's p': 211,
+    's t': -65, 's w': -241, 'sa ': 270, 'sar': 219, 'se ': -56, 'seg': 239,
+    'sem': 239, 'seu': 84, 'sho': -196, 'sso': 239, 'st ': -272, 'sta': 181,
+    'ste': 109, 'str': 219, 'são': 193, 't a': -111, 't b': -241, 't h': -221,
+    't i': -296, 't l': -221, 't s': -196, 't t': -323, 't w': -272,
+    't y': -196, 'ta ': 282, 'tam': 239, 'tar': 129, 'tas': 219, 'te ': 193,
+    'tem': 160, 'ter': -77, 'th ': -315, 'tha': -306, 'the': -468,
+    'thi': -258, 'til': -196, 'tim': -196, 'tio': -323, 'to ': -37,
+    'tod': 129, 'tos': 193, 'tra': 129, 'tre': 193, 'tro': 193, 'ts ': -296,
+    'tte': -196, 'tug': 193, 'ty ': -221, 'u n': 193, 'ua ': 193, 'uag': -196,
+    'ue ': 204, 'uei': 193, 'uit': 255, 'uld': -272, 'uma': 255, 'und': 84,
+    'ur ': -258, 'use': -162, 'ut ': -284, 'va ': 193, 've ': -162,
+    'ver': -49, 'voc': 239, 'w t': -221, 'was': -241, 'we ': -241,
+    'wee': -221, 'whe': -221, 'wil': -196, 'wit': -306, 'wor': -241,
+    'wou': -196, 'xt ': -196, 'y a': -241, 'y i': -221, 'y s': -221,
+    'y t': -221, 'you': -338, 'ys ': -221, 'ão ': 365, 'çam': 219, 'ção': 282,
+    'çõe': 193, 'é o': 239, 'ões': 255,
+}
+
+_NON_LETTER = re.compile(r'[\W\d_]+')
+_SENTENCE = re.compile(r'[^.!?\n]+[.!?]*')
+
+# Trigram weights assume independence, which makes raw sums overconfident
+_CONFIDENCE_DAMPING = 400.0
+
+
+class LanguageIdentifier:
+    """Classify text as Portuguese ('pt') or English ('en') in microseconds"""
+    
+    def __init__(self, min_hits: int = 3, max_chars: int = 2000):
+        self.min_hits = min_hits
+        self.max_chars = max_chars
+    
+    def score(self, text: str) -> Tuple[int, int]:
+        """Sum trigram weights over the text
+        
+        Returns:
+            Tuple of (score, matched_trigrams)
+        """
+        normalized = ' ' + _NON_LETTER.sub(' ', text[:self.max_chars].lower()).strip() + ' '
+        get = _TRIGRAM_WEIGHTS.get
+        score = 0
+        hits = 0
+        for i in range(len(normalized) - 2):
+            weight = get(normalized[i:i + 3])
+            if weight:
+                score += weight
+                hits += 1
+        return score, hits
+    
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Classify text
+        
+        Returns:
+            Tuple of (language, confidence); language is 'unknown' when the
+            text has too little signal
+        """
+        if not text:
+            return 'unknown', 0.0
+        score, hits = self.score(text)
+        if hits < self.min_hits or score == 0:
+            return 'unknown', 0.0
+        confidence = 1.0 / (1.0 + math.exp(-abs(score) / _CONFIDENCE_DAMPING))
+        return ('pt' if score > 0 else 'en'), confidence
+    
+    def detect_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """Split text into sentence spans and label each with its language
+        
+        Consecutive spans in the same language are merged; spans without
+        enough signal inherit the language of the previous span.
+        
+        Returns:
+            List of (start, end, language)
+        """
+        spans: List[Tuple[int, int, str]] = []
+        for match in _SENTENCE.finditer(text):
+            if not match.group().strip():
+                continue
+            language, _ = self.classify(match.group())
+            if language == 'unknown' and spans:
+                language = spans[-1][2]
+            if spans and spans[-1][2] == language:
+                spans[-1] = (spans[-1][0], match.end(), language)
+            else:
+                spans.append((match.start(), match.end(), language))
+        return spans
+    
+    def is_mixed(self, text: str, min_share: float = 0.15) -> bool:
+        """Check if text contains a significant amount of both languages"""
+        totals = {'pt': 0, 'en': 0}
+        for start, end, language in self.detect_spans(text):
+            if language in totals:
+                totals[language] += end - start
+        covered = totals['pt'] + totals['en']
+        if not covered:
+            return False
+        return min(totals.values()) / covered >= min_share
+    
+    def dominant_language(self, text: str, min_confidence: float = 0.9) -> Optional[str]:
+        """Get the language of text when it is confidently monolingual"""
+        language, confidence = self.classify(text)
+        if language == 'unknown' or confidence < min_confidence:
+            return None
+        if len(text) > 200 and self.is_mixed(text):
+            return None
+        return language
+    
+    def pick_translation(self, text: str) -> str:
+        """Pick the translation operation for text ('translate_en' or 'translate_pt')"""
+        language, _ = self.classify(text)
+        return 'translate_pt' if language == 'en' else 'translate_en'
@@ -1,71 +1,142 @@
 """
 Logging configuration for Text Helper IA
 """
+import atexit
+import gzip
 import logging
 import logging.handlers
 import os
-from typing import Dict, Any
+import queue
+import shutil
+from typing import Any
 from .config import Config
 
 
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them in the calling thread
+
+    The stock QueueHandler merges msg % args before queueing, which would
+    put the formatting cost back on the UI thread and the workers.
+    Tracebacks are still rendered here, while they are current.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress a rotated log file (runs on the listener thread)"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _stop_listener(listener) -> None:
+    """Stop a QueueListener once; stopping twice is an error in the stdlib"""
+    if listener is not None and listener._thread is not None:
+        listener.stop()
+
+
 class Logger:
-    """Logger configuration manager"""
-    
+    """Logger configuration manager
+
+    Callers only put records on a queue; a QueueListener thread formats
+    them and does the file I/O, rotation and optional gzip compression, so
+    a slow disk never stalls the UI or a worker. Messages accept %-style
+    arguments, formatted only if the record is actually emitted:
+
+        logger.info("Processed %s in %.0f ms", operation, elapsed)
+    """
+
     def __init__(self, config: Config):
         self.config = config
         self.logger = None
+        self._listener = None
+        self._console_handler = None
+        self._file_handler = None
         self._setup_logging()
-    
+        atexit.register(self.close)
+
     def _setup_logging(self) -> None:
         """Setup logging configuration"""
         logging_config = self.config.get_logging_config()
-        
+
         # Create logger
         self.logger = logging.getLogger('text_helper_ia')
         self.logger.setLevel(getattr(logging, logging_config['level']))
-        
-        # Clear existing handlers
+
+        # Clear existing handlers, stopping the listener of a previous setup
+        for handler in self.logger.handlers:
+            _stop_listener(getattr(handler, 'listener', None))
         self.logger.handlers.clear()
-        
+
         # Create formatter
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        
+
         # File handler with rotation
         log_file = logging_config['file']
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        
-        file_handler = logging.handlers.RotatingFileHandler(
+
+        self._file_handler = logging.handlers.RotatingFileHandler(
             log_file,
             maxBytes=logging_config['max_size'],
             backupCount=logging_config['backup_count']
         )
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-        
+        self._file_handler.setFormatter(formatter)
+        if logging_config['compress']:
+            self._file_handler.namer = lambda name: name + '.gz'
+            self._file_handler.rotator = _gzip_rotator
+
         # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-    
+        self._console_handler = logging.StreamHandler()
+        self._console_handler.setFormatter(formatter)
+
+        # Only the queue handler runs in the calling thread
+        records = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(
+            records, self._file_handler, self._console_handler, respect_handler_level=True
+        )
+        queue_handler = _DeferredQueueHandler(records)
+        queue_handler.listener = self._listener
+        self.logger.addHandler(queue_handler)
+        self._listener.start()
+
+    def set_console(self, enabled: bool) -> None:
+        """Attach or drop the console handler (GUI sessions have no console)"""
+        handlers = [self._file_handler] + ([self._console_handler] if enabled else [])
+        # Swapping the tuple is atomic for the listener thread
+        self._listener.handlers = tuple(handlers)
+
+    def close(self) -> None:
+        """Flush queued records and stop the listener thread"""
+        _stop_listener(self._listener)
+
     def get_logger(self) -> logging.Logger:
         """Get the configured logger"""
         return self.logger
-    
-    def info(self, message: str) -> None:
+
+    def info(self, message: str, *args: Any) -> None:
         """Log info message"""
-        self.logger.info(message)
-    
-    def warning(self, message: str) -> None:
+        self.logger.info(message, *args)
+
+    def warning(self, message: str, *args: Any) -> None:
         """Log warning message"""
-        self.logger.warning(message)
-    
-    def error(self, message: str) -> None:
+        self.logger.warning(message, *args)
+
+    def error(self, message: str, *args: Any) -> None:
         """Log error message"""
-        self.logger.error(message)
-    
-    def debug(self, message: str) -> None:
+        self.logger.error(message, *args)
+
+    def debug(self, message: str, *args: Any) -> None:
         """Log debug message"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
+
+    def is_enabled_for(self, level: int) -> bool:
+        """Check if a level would be emitted (to skip building costly messages)"""
+        return self.logger.isEnabledFor(level)
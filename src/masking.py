@@ -0,0 +1,83 @@
+"""
+Protected-span masking for code, URLs, e-mail addresses and stack traces
+"""
+import re
+from typing import List, Tuple
+
+
+PLACEHOLDER_OPEN = '⟦'
+PLACEHOLDER_CLOSE = '⟧'
+
+# Every protected construct in one alternation, so the text is scanned once.
+# Order matters: multi-line blocks win over the URLs they may contain.
+_PROTECTED = re.compile(
+    # Fenced code blocks
+    r'^[ \t]*(?P<fence>```|~~~)[^\n]*\n[\s\S]*?^[ \t]*(?P=fence)[ \t]*$'
+    # Python tracebacks, up to and including the exception line
+    r'|^Traceback \(most recent call last\):[ \t]*\n(?:[ \t]+[^\n]*\n)+[^\n]*'
+    # Java/JavaScript stack traces: optional exception line plus two or more frames
+    r'|(?:^[\w.$]+(?:Exception|Error)\b[^\n]*\n)?^[ \t]+at \S[^\n]*(?:\n[ \t]+at \S[^\n]*)+'
+    # Inline code
+    r'|`[^`\n]+`'
+    # URLs, without trailing sentence punctuation
+    r'|\b(?:https?://|www\.)[^\s<>"\'`]*[^\s<>"\'`.,;:!?)\]]'
+    # E-mail addresses
+    r'|[\w.+-]+@[\w-]+(?:\.[\w-]+)+',
+    re.MULTILINE
+)
+_PLACEHOLDER = re.compile(re.escape(PLACEHOLDER_OPEN) + r'(\d+)' + re.escape(PLACEHOLDER_CLOSE))
+
+
+def placeholder(index: int) -> str:
+    """Placeholder token for the span at index"""
+    return f'{PLACEHOLDER_OPEN}{index}{PLACEHOLDER_CLOSE}'
+
+
+class ProtectedSpanMasker:
+    """Swap protected spans for compact placeholders and back
+
+    The model never sees the protected text, so it cannot corrupt it, and a
+    long URL or traceback costs a couple of tokens instead of dozens.
+    """
+
+    def mask(self, text: str) -> Tuple[str, List[str]]:
+        """Replace protected spans with placeholders
+
+        Returns:
+            Tuple of (masked text, original spans by placeholder index). Text
+            that already contains placeholder brackets is left unmasked.
+        """
+        if not text or PLACEHOLDER_OPEN in text:
+            return text, []
+
+        spans: List[str] = []
+
+        def replace(match) -> str:
+            spans.append(match.group())
+            return placeholder(len(spans) - 1)
+
+        return _PROTECTED.sub(replace, text), spans
+
+    def restore(self, text: str, spans: List[str]) -> str:
+        """Put the original spans back in place of their placeholders"""
+        if not spans:
+            return text
+
+        def replace(match) -> str:
+            index = int(match.group(1))
+            return spans[index] if index < len(spans) else match.group()
+
+        return _PLACEHOLDER.sub(replace, text)
+
+    def placeholders_in(self, text: str) -> List[int]:
+        """Indexes of the placeholders present in text"""
+        return [int(index) for index in _PLACEHOLDER.findall(text)]
+
+    def is_placeholder_only(self, text: str) -> bool:
+        """Check if text holds nothing but placeholders and whitespace"""
+        return bool(_PLACEHOLDER.search(text)) and not _PLACEHOLDER.sub('', text).strip()
+
+    def missing(self, text: str, indexes: List[int]) -> List[int]:
+        """Indexes whose placeholder did not survive in text"""
+        present = set(self.placeholders_in(text))
+        return [index for index in indexes if index not in present]
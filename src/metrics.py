@@ -0,0 +1,371 @@
+"""
+In-process metrics registry with Prometheus text output
+
+Counters, gauges and histograms are striped: each update takes one of a
+few small locks picked by the calling thread's index, so workers, the Tk
+loop and the server rarely contend. Reads (render, dump) merge the stripes.
+"""
+import bisect
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Number of lock stripes per metric
+_STRIPES = 8
+
+# Upper bounds (seconds) of the default latency buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Event-loop lag is much shorter than an API call
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+Labels = Tuple[str, ...]
+
+# Stripe of each thread: consecutive indexes as threads first update a
+# metric (thread idents are aligned addresses, useless modulo a power of 2)
+_thread_index = itertools.count()
+_thread_local = threading.local()
+
+
+def _thread_stripe() -> int:
+    try:
+        return _thread_local.stripe
+    except AttributeError:
+        stripe = _thread_local.stripe = next(_thread_index) % _STRIPES
+        return stripe
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = '') -> str:
+    """Render {name="value",...}; extra is appended as is (e.g. le="0.5")"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Shared parts of the metric types: name, help, labels and stripes"""
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._locks = [threading.Lock() for _ in range(_STRIPES)]
+        self._stripes: List[Dict[Labels, object]] = [{} for _ in range(_STRIPES)]
+
+    def _stripe(self) -> int:
+        return _thread_stripe()
+
+    def _check(self, labels: Labels) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. `OPERATIONS.inc('shorten', 'ok')`"""
+
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add amount to the series with these label values"""
+        self._check(labels)
+        i = self._stripe()
+        with self._locks[i]:
+            stripe = self._stripes[i]
+            stripe[labels] = stripe.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        """Current value of every series"""
+        merged: Dict[Labels, float] = {}
+        for lock, stripe in zip(self._locks, self._stripes):
+            with lock:
+                items = list(stripe.items())
+            for labels, value in items:
+                merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def value(self, *labels: str) -> float:
+        """Current value of one series"""
+        return self.values().get(labels, 0)
+
+    def render(self) -> List[str]:
+        return self.header() + [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                                for labels, value in sorted(self.values().items())]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. queue depth
+
+    Set values are not additive across threads, so a gauge uses a single
+    lock; gauges change far less often than counters.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._lock = self._locks[0]
+        self._values = self._stripes[0]
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the series to value"""
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add amount (may be negative) to the series"""
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Subtract amount from the series"""
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        """Current value of one series"""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                                for labels, value in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets, plus sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation"""
+        self._check(labels)
+        # Non-cumulative slot; the last one is +Inf. Cumulated on render.
+        slot = bisect.bisect_left(self.buckets, value)
+        i = self._stripe()
+        with self._locks[i]:
+            stripe = self._stripes[i]
+            series = stripe.get(labels)
+            if series is None:
+                # [count per slot..., sum]
+                series = stripe[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict[Labels, Tuple[List[int], float, int]]:
+        """Cumulative bucket counts, sum and count of every series"""
+        merged: Dict[Labels, List[float]] = {}
+        for lock, stripe in zip(self._locks, self._stripes):
+            with lock:
+                items = [(labels, list(series)) for labels, series in stripe.items()]
+            for labels, series in items:
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = series
+                else:
+                    for j, value in enumerate(series):
+                        total[j] += value
+        result = {}
+        for labels, series in merged.items():
+            cumulative, running = [], 0
+            for count in series[:-1]:
+                running += count
+                cumulative.append(running)
+            result[labels] = (cumulative, series[-1], running)
+        return result
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, (cumulative, total, count) in sorted(self.snapshot().items()):
+            bounds = [repr(float(b)) for b in self.buckets] + ['+Inf']
+            for bound, value in zip(bounds, cumulative):
+                le = f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {value}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total:.6f}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of this process, rendered in Prometheus text format
+
+    Registering a name twice returns the existing metric, so modules can
+    declare the metrics they update at import time.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, help_text, labelnames, buckets)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: str) -> None:
+        """Write render() to a file atomically (e.g. on exit, for node_exporter's textfile collector)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+# Process-wide registry and the metrics the app reports
+REGISTRY = MetricsRegistry()
+
+OPERATIONS = REGISTRY.counter(
+    'text_helper_operations_total', 'Text operations processed, by operation and outcome (ok, error)',
+    ('operation', 'outcome'))
+OPERATION_SECONDS = REGISTRY.histogram(
+    'text_helper_operation_duration_seconds', 'Latency of successful text operations', ('operation',))
+FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    'text_helper_time_to_first_token_seconds', 'Time until the first streamed piece of a reply', ('operation',))
+TOKENS = REGISTRY.counter(
+    'text_helper_tokens_total', 'Tokens sent to (in) and received from (out) the API', ('model', 'direction'))
+COST = REGISTRY.counter(
+    'text_helper_cost_usd_total', 'API spend in USD at list prices, by model', ('model',))
+BUDGET_EXCEEDED = REGISTRY.counter(
+    'text_helper_budget_exceeded_total', 'Requests made over a usage budget, by action taken', ('action',))
+CACHE_LOOKUPS = REGISTRY.counter(
+    'text_helper_cache_lookups_total', 'Near-duplicate cache lookups, by operation and result (hit, miss)',
+    ('operation', 'result'))
+API_RETRIES = REGISTRY.counter(
+    'text_helper_api_retries_total', 'API requests retried, by reason', ('reason',))
+RATE_LIMITED = REGISTRY.counter(
+    'text_helper_rate_limited_total', 'Requests refused by the API (429) or the local TPM budget', ('source',))
+QUEUE_DEPTH = REGISTRY.gauge(
+    'text_helper_queue_depth', 'Work waiting for a free worker, by component', ('component',))
+UI_LAG = REGISTRY.histogram(
+    'text_helper_ui_event_loop_lag_seconds', 'How late Tk ran a periodic probe callback', (), LAG_BUCKETS)
+
+
+class MetricsServer:
+    """Serve a registry on http://host:port/metrics from a daemon thread"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = '127.0.0.1', port: int = 9465):
+        # Imported here: http.server pulls in the email package, which
+        # headless runs should not pay for
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start serving in the background"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='MetricsServer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the port"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._server.server_close()
+
+
+class EventLoopLagProbe:
+    """Measure Tk event-loop lag with a periodic after() callback
+
+    The callback asks to run every interval seconds; how late it actually
+    runs is the time the loop spent busy with other work.
+    """
+
+    def __init__(self, root, interval: float = 0.5, histogram: Histogram = UI_LAG):
+        self.root = root
+        self.interval = interval
+        self.histogram = histogram
+        self._expected = 0.0
+        self._after_id = None
+
+    def start(self) -> None:
+        """Start probing"""
+        self._schedule()
+
+    def _schedule(self) -> None:
+        self._expected = time.perf_counter() + self.interval
+        self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+
+    def _tick(self) -> None:
+        self.histogram.observe(max(0.0, time.perf_counter() - self._expected))
+        self._schedule()
+
+    def stop(self) -> None:
+        """Stop probing"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
@@ -0,0 +1,229 @@
+"""
+Structure-preserving, table-driven text normalizer
+"""
+import re
+import unicodedata
+from array import array
+from bisect import bisect_right
+from typing import Callable, List, Tuple
+
+
+# Control and zero-width characters removed in the translate pass. Newlines
+# and tabs are kept; they carry paragraph and list structure.
+_REMOVED_CHARS = (
+    [c for c in range(0x00, 0x20) if c not in (0x09, 0x0A, 0x0D)] +
+    list(range(0x7F, 0xA0)) +
+    [0x00AD, 0x200B, 0x200C, 0x200D, 0x2060, 0xFEFF]
+)
+
+_TRANSLATE_TABLE = {code: None for code in _REMOVED_CHARS}
+# Unicode spaces become ASCII spaces, line separators become newlines
+_TRANSLATE_TABLE.update({code: ' ' for code in (0x00A0, 0x1680, 0x202F, 0x205F, 0x3000)})
+_TRANSLATE_TABLE.update({code: ' ' for code in range(0x2000, 0x200B)})
+_TRANSLATE_TABLE.update({0x0D: '\n', 0x0085: '\n', 0x2028: '\n', 0x2029: '\n'})
+_TRANSLATE_TABLE = str.maketrans(_TRANSLATE_TABLE)
+
+# Runs of characters touched by the translate table
+_TRANSLATE_RUN = re.compile('[' + ''.join(re.escape(chr(c)) for c in sorted(_TRANSLATE_TABLE)) + ']+')
+
+# The offset-tracking path replays normalize() as a chain of regex steps
+_CRLF = re.compile(r'\r\n')
+# Non-ASCII runs plus the preceding character: the only places NFC can change
+_NFC_CANDIDATE = re.compile(r'.?[^\x00-\x7f]+', re.S)
+# Space/tab runs inside a line, except a lone space (already normalized)
+_HSPACE_RUN = re.compile(r'(?<=\S)(?! (?![ \t]))[ \t]+')
+# Line breaks with surrounding spaces and the indentation of the next line
+_LINE_BREAK = re.compile(r'[ \t]*\n(?:[ \t]*\n)*([ \t]*)')
+_LIST_MARKER = re.compile(r'(?:[-*•+]|\d{1,3}[.)])[ \t]+\S')
+_EDGES = re.compile(r'^[ \t\n]+|[ \t\n]+$')
+
+
+def _translate_run(match) -> str:
+    """Apply the translate table to a matched run"""
+    return match.group().translate(_TRANSLATE_TABLE)
+
+
+def _line_break(match) -> str:
+    """Keep one or two newlines, and list indentation"""
+    newlines = '\n' if match.group().count('\n') == 1 else '\n\n'
+    if match.group(1) and _LIST_MARKER.match(match.string, match.end()):
+        return newlines + match.group(1)
+    return newlines
+
+
+class OffsetMap:
+    """Maps positions in normalized text back to the original text
+
+    Stored as segments: inside a linear segment positions advance together;
+    a replaced segment (collapsed whitespace, composed characters) maps every
+    position to the start of what it replaced.
+    """
+
+    __slots__ = ('_out', '_orig', '_linear', 'length', 'original_length')
+
+    def __init__(self, out_starts: array, orig_starts: array, linear: bytearray,
+                 length: int, original_length: int):
+        self._out = out_starts
+        self._orig = orig_starts
+        self._linear = linear
+        self.length = length
+        self.original_length = original_length
+
+    @classmethod
+    def identity(cls, length: int) -> 'OffsetMap':
+        """Map for unchanged text"""
+        return cls(array('l', [0]), array('l', [0]), bytearray(b'\x01'), length, length)
+
+    def __len__(self) -> int:
+        return self.length + 1
+
+    def __getitem__(self, pos: int) -> int:
+        """Original offset of normalized position pos (0 <= pos <= length)"""
+        if pos < 0:
+            pos += self.length + 1
+        if pos >= self.length:
+            return self.original_length
+        i = bisect_right(self._out, pos) - 1
+        if self._linear[i]:
+            return self._orig[i] + pos - self._out[i]
+        return self._orig[i]
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Map a normalized (start, end) span to the original text"""
+        if end <= start:
+            original = self[start]
+            return original, original
+        return self[start], self[end - 1] + 1
+
+    def _pieces(self, start: int, length: int):
+        """Yield (offset, original_start, linear) covering [start, start + length)"""
+        i = max(0, bisect_right(self._out, start) - 1)
+        end = start + length
+        pos = start
+        while pos < end:
+            seg_end = self._out[i + 1] if i + 1 < len(self._out) else self.length
+            if self._linear[i]:
+                yield pos - start, self._orig[i] + pos - self._out[i], True
+            else:
+                yield pos - start, self._orig[i], False
+            pos = seg_end
+            i += 1
+
+    def compose(self, segments: List[Tuple[int, int, bool]], length: int) -> 'OffsetMap':
+        """Chain a step's local segments (new pos -> this text) onto this map"""
+        out_starts = array('l')
+        orig_starts = array('l')
+        linear = bytearray()
+
+        def add(out_start: int, orig_start: int, is_linear: bool) -> None:
+            if out_starts and out_starts[-1] == out_start:
+                out_starts.pop()
+                orig_starts.pop()
+                linear.pop()
+            elif (out_starts and is_linear and linear[-1] and
+                  orig_starts[-1] + out_start - out_starts[-1] == orig_start):
+                return
+            out_starts.append(out_start)
+            orig_starts.append(orig_start)
+            linear.append(1 if is_linear else 0)
+
+        for index, (out_start, src_start, is_linear) in enumerate(segments):
+            seg_end = segments[index + 1][0] if index + 1 < len(segments) else length
+            if is_linear:
+                for offset, orig_start, piece_linear in self._pieces(src_start, seg_end - out_start):
+                    add(out_start + offset, orig_start, piece_linear)
+            else:
+                add(out_start, self[src_start], False)
+
+        if not out_starts:
+            out_starts.append(0)
+            orig_starts.append(self.original_length)
+            linear.append(0)
+        return OffsetMap(out_starts, orig_starts, linear, length, self.original_length)
+
+
+def _tracked_sub(pattern, repl: Callable, text: str) -> Tuple[str, List[Tuple[int, int, bool]]]:
+    """re.sub that also returns (out_start, src_start, linear) segments"""
+    pieces = []
+    segments: List[Tuple[int, int, bool]] = []
+    out = 0
+    last = 0
+    for match in pattern.finditer(text):
+        replacement = repl(match)
+        if replacement == match.group():
+            continue
+        if match.start() > last:
+            segments.append((out, last, True))
+            pieces.append(text[last:match.start()])
+            out += match.start() - last
+        if replacement:
+            segments.append((out, match.start(), False))
+            pieces.append(replacement)
+            out += len(replacement)
+        last = match.end()
+    if last < len(text) or not segments:
+        segments.append((out, last, True))
+        pieces.append(text[last:])
+    return ''.join(pieces), segments
+
+
+class TextNormalizer:
+    """Normalize text while preserving paragraphs and lists
+
+    - NFC Unicode normalization, so identical text always has identical
+      code points (better cache hit rates)
+    - control and zero-width characters stripped, Unicode spaces mapped to
+      ASCII, all through one precompiled translate table
+    - space/tab runs collapsed, trailing spaces removed
+    - at most one blank line between paragraphs; list indentation kept
+    """
+
+    def normalize(self, text: str) -> str:
+        """Normalize text"""
+        if not text:
+            return ""
+        text = unicodedata.normalize('NFC', text.replace('\r\n', '\n'))
+        # Translate only the matched runs: str.translate with a dict table
+        # is slow on non-ASCII text, while the regex scan runs in C
+        text = _TRANSLATE_RUN.sub(_translate_run, text)
+        
+        # Line-level pass using C-level split/join for whitespace collapsing
+        lines = []
+        blank = False
+        for line in text.split('\n'):
+            words = line.split()
+            if not words:
+                blank = True
+                continue
+            content = ' '.join(words)
+            if lines:
+                if blank:
+                    lines.append('')
+                if line[0] in ' \t' and _LIST_MARKER.match(content):
+                    content = line[:len(line) - len(line.lstrip(' \t'))] + content
+            blank = False
+            lines.append(content)
+        return '\n'.join(lines)
+
+    def normalize_with_offsets(self, text: str) -> Tuple[str, OffsetMap]:
+        """Normalize text and build a map back to original offsets
+
+        Produces exactly the same text as normalize().
+        """
+        offsets = OffsetMap.identity(len(text or ''))
+        if not text:
+            return "", offsets
+
+        steps = [(_CRLF, lambda m: '\n')]
+        if not unicodedata.is_normalized('NFC', text):
+            steps.append((_NFC_CANDIDATE, lambda m: unicodedata.normalize('NFC', m.group())))
+        steps += [
+            (_TRANSLATE_RUN, _translate_run),
+            (_HSPACE_RUN, lambda m: ' '),
+            (_LINE_BREAK, _line_break),
+            (_EDGES, lambda m: ''),
+        ]
+        for pattern, repl in steps:
+            text, segments = _tracked_sub(pattern, repl, text)
+            offsets = offsets.compose(segments, len(text))
+        return text, offsets
@@ -0,0 +1,54 @@
+"""
+Headless text operation shared by the hotkey daemon, the resident daemon and the CLI
+"""
+from typing import Any, Dict, Iterator, Optional, Tuple
+from .config import Config
+from .ia_client import AIClient
+from .text_processor import TextProcessor
+
+
+def _prepare(config: Config, text_processor: TextProcessor, text: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Clean, compact and validate text
+
+    Raises:
+        ValueError: If the text is too short or over the model token limit
+    """
+    cleaned_text = text_processor.clean_text(text)
+    compaction = None
+    if config.get_compaction_config()['enabled']:
+        compaction = text_processor.compact_text(cleaned_text)
+        cleaned_text = compaction['text']
+
+    max_tokens = config.get_max_input_tokens(config.get_openai_config()['model'])
+    if not text_processor.validate_text(cleaned_text, max_tokens):
+        raise ValueError(f"O texto deve ter no mínimo 3 caracteres e no máximo {max_tokens} tokens.")
+    return cleaned_text, compaction
+
+
+def run_operation(config: Config, ai_client: AIClient, text_processor: TextProcessor,
+                  text: str, operation_type: str) -> str:
+    """Clean, compact, validate and process text like the main window does
+
+    Raises:
+        ValueError: If the text is too short or over the model token limit
+    """
+    cleaned_text, compaction = _prepare(config, text_processor, text)
+    result = ai_client.process_text(cleaned_text, operation_type)
+    if compaction and config.get_compaction_config()['restore_stripped']:
+        result = text_processor.restore_compacted(result, compaction)
+    return result
+
+
+def stream_operation(config: Config, ai_client: AIClient, text_processor: TextProcessor,
+                     text: str, operation_type: str) -> Iterator[str]:
+    """Like run_operation(), but yield the result in pieces as it arrives
+
+    Raises:
+        ValueError: If the text is too short or over the model token limit
+    """
+    cleaned_text, compaction = _prepare(config, text_processor, text)
+    if compaction and config.get_compaction_config()['restore_stripped']:
+        # Restoring needs the whole reply, so it comes as one piece
+        yield text_processor.restore_compacted(ai_client.process_text(cleaned_text, operation_type), compaction)
+        return
+    yield from ai_client.stream_text(cleaned_text, operation_type)
@@ -0,0 +1,233 @@
+"""
+Streaming file-to-file processing pipeline for large documents
+"""
+import codecs
+import json
+import mmap
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .ia_client import TRANSLATION_TARGETS, AIClient
+from .logger import Logger
+from .text_processor import TextProcessor
+
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+
+CHUNK_SEPARATOR = '\n\n'
+
+
+class FilePipeline:
+    """Process a file through normalize -> segment -> process -> write
+
+    Every stage is a generator pulling from the previous one, so only a
+    read block, one chunk being assembled and at most max_in_flight chunks
+    at the API are held in memory, whatever the document size. The input
+    is memory-mapped and decoded incrementally.
+
+    A journal next to the output records the last chunk written; re-running
+    the same job resumes after it.
+    """
+
+    def __init__(self, ai_client: AIClient, text_processor: TextProcessor, logger: Logger,
+                 chunk_tokens: int = 2000, max_in_flight: int = 4, block_size: int = 1 << 20):
+        self.ai_client = ai_client
+        self.text_processor = text_processor
+        self.logger = logger
+        self.chunk_tokens = chunk_tokens
+        self.max_in_flight = max_in_flight
+        self.block_size = block_size
+
+    # Stage 1: read + normalize
+
+    def read_blocks(self, input_path: str) -> Iterator[str]:
+        """Yield decoded text blocks that end on paragraph boundaries"""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        with open(input_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                carry = ''
+                for pos in range(0, len(mapped), self.block_size):
+                    text = carry + decoder.decode(mapped[pos:pos + self.block_size])
+                    cut = None
+                    for match in _PARAGRAPH_BREAK.finditer(text, max(0, len(text) - self.block_size)):
+                        cut = match.end()
+                    if cut is None:
+                        # No paragraph break yet; keep accumulating unless runaway
+                        if len(text) < 4 * self.block_size:
+                            carry = text
+                            continue
+                        cut = len(text)
+                    carry = text[cut:]
+                    yield text[:cut]
+                carry += decoder.decode(b'', final=True)
+                if carry:
+                    yield carry
+
+    def normalize(self, blocks: Iterator[str]) -> Iterator[str]:
+        """Normalize each block"""
+        for block in blocks:
+            cleaned = self.text_processor.clean_text(block)
+            if cleaned:
+                yield cleaned
+
+    # Stage 2: segment
+
+    def segment(self, blocks: Iterator[str]) -> Iterator[str]:
+        """Group paragraphs into chunks of at most chunk_tokens tokens"""
+        count = self.text_processor.count_tokens
+        current: List[str] = []
+        current_tokens = 0
+        for block in blocks:
+            for start, end in self.text_processor.split_paragraphs(block):
+                paragraph = block[start:end]
+                for piece in self._split_oversized(paragraph):
+                    tokens = count(piece)
+                    if current and current_tokens + tokens > self.chunk_tokens:
+                        yield CHUNK_SEPARATOR.join(current)
+                        current, current_tokens = [], 0
+                    current.append(piece)
+                    current_tokens += tokens
+        if current:
+            yield CHUNK_SEPARATOR.join(current)
+
+    def _split_oversized(self, paragraph: str) -> Iterator[str]:
+        """Split a paragraph larger than a chunk at sentence, then word, boundaries"""
+        count = self.text_processor.count_tokens
+        if count(paragraph) <= self.chunk_tokens:
+            yield paragraph
+            return
+
+        piece: List[str] = []
+        piece_tokens = 0
+        for start, end in self.text_processor.split_sentences(paragraph):
+            sentence = paragraph[start:end]
+            units = [sentence] if count(sentence) <= self.chunk_tokens else sentence.split(' ')
+            for unit in units:
+                tokens = count(unit) + 1
+                if piece and piece_tokens + tokens > self.chunk_tokens:
+                    yield ' '.join(piece)
+                    piece, piece_tokens = [], 0
+                piece.append(unit)
+                piece_tokens += tokens
+        if piece:
+            yield ' '.join(piece)
+
+    # Stage 3: process
+
+    def process(self, chunks: Iterator[str], operation_type: str, skip: int = 0) -> Iterator[Tuple[int, str]]:
+        """Process chunks with bounded concurrency, yielding results in order
+
+        The next chunk is only pulled from upstream when a slot is free,
+        which propagates backpressure all the way to the file reader.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='FilePipeline') as executor:
+            in_flight = deque()
+            for index, chunk in enumerate(chunks):
+                if index < skip:
+                    continue
+                in_flight.append((index, executor.submit(self._process_chunk, chunk, operation_type)))
+                if len(in_flight) >= self.max_in_flight:
+                    done_index, future = in_flight.popleft()
+                    yield done_index, future.result()
+            while in_flight:
+                done_index, future = in_flight.popleft()
+                yield done_index, future.result()
+
+    def _process_chunk(self, chunk: str, operation_type: str) -> str:
+        """Process one chunk; a chunk mixing languages is always translated
+
+        Skipping a translation because the chunk is mostly in the target
+        language would leave its other-language sentences untranslated.
+        """
+        translating = operation_type == 'translate' or operation_type in TRANSLATION_TARGETS
+        if translating and self.ai_client.language_identifier.is_mixed(chunk):
+            return self.ai_client.process_text(chunk, operation_type, skip_same_language=False)
+        return self.ai_client.process_text(chunk, operation_type)
+
+    # Stage 4: write
+
+    def run(self, input_path: str, output_path: str, operation_type: str, resume: bool = True) -> Dict[str, Any]:
+        """Run the whole pipeline, resuming from the journal when possible"""
+        start_time = time.time()
+        journal_path = output_path + '.journal'
+        signature = self._input_signature(input_path, operation_type)
+
+        journal = self._load_journal(journal_path) if resume else None
+        if journal and journal.get('signature') == signature and os.path.exists(output_path):
+            done = journal['chunks_done']
+            output_bytes = journal['output_bytes']
+            self.logger.info("Resuming %s after chunk %s (%s bytes written)", input_path, done, output_bytes)
+        else:
+            done, output_bytes = 0, 0
+
+        chunks = self.segment(self.normalize(self.read_blocks(input_path)))
+
+        processed = 0
+        mode = 'r+b' if done else 'wb'
+        with open(output_path, mode) as out:
+            out.truncate(output_bytes)
+            out.seek(output_bytes)
+            for index, result in self.process(chunks, operation_type, skip=done):
+                data = ((CHUNK_SEPARATOR if index else '') + result).encode('utf-8')
+                out.write(data)
+                out.flush()
+                os.fsync(out.fileno())
+                output_bytes += len(data)
+                done = index + 1
+                processed += 1
+                self._save_journal(journal_path, {
+                    'signature': signature,
+                    'chunks_done': done,
+                    'output_bytes': output_bytes
+                })
+                self.logger.info("Chunk %s written (%s bytes)", done, output_bytes)
+
+        # Finished: the journal is only needed for crashed runs
+        if os.path.exists(journal_path):
+            os.unlink(journal_path)
+
+        stats = {
+            'chunks': done,
+            'processed': processed,
+            'resumed': done - processed,
+            'input_bytes': os.path.getsize(input_path),
+            'output_bytes': output_bytes,
+            'elapsed': time.time() - start_time
+        }
+        self.logger.info("File pipeline finished: %s", stats)
+        return stats
+
+    @staticmethod
+    def _input_signature(input_path: str, operation_type: str) -> Dict[str, Any]:
+        """Identify an input file and operation for resume checks"""
+        stat = os.stat(input_path)
+        return {
+            'path': os.path.abspath(input_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'operation': operation_type
+        }
+
+    @staticmethod
+    def _load_journal(journal_path: str) -> Optional[Dict[str, Any]]:
+        """Load the resume journal, if any"""
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_journal(journal_path: str, state: Dict[str, Any]) -> None:
+        """Atomically replace the resume journal"""
+        tmp_path = journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, journal_path)
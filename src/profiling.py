@@ -0,0 +1,258 @@
+"""
+Opt-in profiling of the request path and the Tk callbacks
+
+Nothing is wrapped, imported or started unless profiling is enabled
+([PROFILING] enabled = true or TEXT_HELPER_PROFILE=1), so a disabled
+profiler costs nothing.
+"""
+import functools
+import glob
+import inspect
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Environment switch, for profiling a session without editing the config
+PROFILE_ENV = 'TEXT_HELPER_PROFILE'
+
+
+def profiling_enabled(config_enabled: bool) -> bool:
+    """Config value, overridden by TEXT_HELPER_PROFILE=1/0"""
+    value = os.environ.get(PROFILE_ENV)
+    if value is None:
+        return config_enabled
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class Profiler:
+    """Capture cProfile stats around selected calls and tracemalloc snapshots
+
+    Each session writes to its own timestamped directory:
+
+        cpu.prof              pstats of every captured call, merged
+        mem-0001.snapshot...  tracemalloc snapshots every memory_interval s
+
+    From Python 3.12 cProfile runs once per process, so there a call that
+    starts while another is being captured runs unprofiled (counted in
+    'skipped'); older versions profile each thread separately.
+    """
+
+    def __init__(self, output_dir: str, memory_interval: float = 60.0, frames: int = 10):
+        self.session_dir = os.path.join(output_dir, time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}')
+        self.memory_interval = memory_interval
+        self.frames = frames
+        self.captured = 0
+        self.skipped = 0
+        self._stats = None
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._memory_thread: Optional[threading.Thread] = None
+        self._snapshots = 0
+        self._restore: List[Callable[[], None]] = []
+        self._active = threading.local()
+
+    def start(self) -> None:
+        """Create the session directory and start the memory snapshots"""
+        os.makedirs(self.session_dir, exist_ok=True)
+        if self.memory_interval > 0:
+            import tracemalloc
+            tracemalloc.start(self.frames)
+            self._memory_thread = threading.Thread(target=self._memory_loop, name='ProfilerMemory', daemon=True)
+            self._memory_thread.start()
+
+    def profile(self, func: Callable) -> Callable:
+        """Wrap func so each call is captured with cProfile
+
+        Generator functions are captured across all their steps, so a
+        streamed reply is profiled up to its last piece. A call made while
+        the same thread is already captured (stream_text falling back to
+        process_text) runs inside the outer capture.
+        """
+        import cProfile
+
+        if inspect.isgeneratorfunction(func):
+            return self._profile_generator(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(self._active, 'profiling', False):
+                return func(*args, **kwargs)
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process
+                with self._stats_lock:
+                    self.skipped += 1
+                return func(*args, **kwargs)
+            self._active.profiling = True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._active.profiling = False
+                profile.disable()
+                self._merge(profile)
+
+        return wrapper
+
+    def _profile_generator(self, func: Callable) -> Callable:
+        """Capture every step of the generator into one profile"""
+        import cProfile
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(self._active, 'profiling', False):
+                return (yield from func(*args, **kwargs))
+            profile = cProfile.Profile()
+            generator = func(*args, **kwargs)
+            captured = False
+            try:
+                while True:
+                    try:
+                        profile.enable()
+                        active = True
+                    except ValueError:
+                        active = False
+                    self._active.profiling = active
+                    try:
+                        item = next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        self._active.profiling = False
+                        if active:
+                            profile.disable()
+                            captured = True
+                    yield item
+            finally:
+                generator.close()
+                if captured:
+                    self._merge(profile)
+                else:
+                    with self._stats_lock:
+                        self.skipped += 1
+
+        return wrapper
+
+    def instrument(self, obj: Any, method: str) -> None:
+        """Profile calls to obj.method (undone by stop())"""
+        original = getattr(obj, method)
+        setattr(obj, method, self.profile(original))
+        self._restore.append(lambda: setattr(obj, method, original))
+
+    def instrument_tk(self) -> None:
+        """Profile the callbacks run by the Tk event loop
+
+        Callbacks scheduled with after() on any widget are captured, except
+        the periodic ticks of the UI dispatcher and the lag probe, which
+        would add a capture every frame; the callbacks the dispatcher runs
+        are captured one by one instead.
+        """
+        import tkinter
+        from .metrics import EventLoopLagProbe
+        from .ui.dispatcher import UIDispatcher
+        internal_ticks = (UIDispatcher._tick, EventLoopLagProbe._tick)
+        original_after = tkinter.Misc.after
+        original_post = UIDispatcher.post
+        profile = self.profile
+
+        def after(widget, ms, func=None, *args):
+            if func is not None and getattr(func, '__func__', None) not in internal_ticks:
+                func = profile(func)
+            return original_after(widget, ms, func, *args)
+
+        def post(dispatcher, callback, *args, key=None):
+            return original_post(dispatcher, profile(callback), *args, key=key)
+
+        tkinter.Misc.after = after
+        UIDispatcher.post = post
+        self._restore.append(lambda: setattr(tkinter.Misc, 'after', original_after))
+        self._restore.append(lambda: setattr(UIDispatcher, 'post', original_post))
+
+    def _merge(self, profile) -> None:
+        import pstats
+        with self._stats_lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.captured += 1
+
+    def _memory_loop(self) -> None:
+        while not self._stop.wait(self.memory_interval):
+            self.snapshot_memory()
+
+    def snapshot_memory(self) -> Optional[str]:
+        """Write a tracemalloc snapshot; returns its path"""
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return None
+        self._snapshots += 1
+        path = os.path.join(self.session_dir, f'mem-{self._snapshots:04d}.snapshot')
+        tracemalloc.take_snapshot().dump(path)
+        return path
+
+    def stop(self) -> Dict[str, Any]:
+        """Undo the instrumentation and write the results
+
+        Returns:
+            Dict with the session directory, captured/skipped calls and
+            the number of memory snapshots
+        """
+        for restore in reversed(self._restore):
+            restore()
+        self._restore.clear()
+        self._stop.set()
+        if self._memory_thread is not None:
+            self._memory_thread.join(timeout=5.0)
+            self._memory_thread = None
+            import tracemalloc
+            self.snapshot_memory()
+            tracemalloc.stop()
+        with self._stats_lock:
+            if self._stats is not None:
+                self._stats.dump_stats(os.path.join(self.session_dir, 'cpu.prof'))
+        return {'dir': self.session_dir, 'captured': self.captured, 'skipped': self.skipped,
+                'snapshots': self._snapshots}
+
+
+# Report
+
+def latest_session(output_dir: str) -> Optional[str]:
+    """Most recent session directory with results, if any"""
+    sessions = sorted(path for path in glob.glob(os.path.join(output_dir, '*'))
+                      if os.path.isdir(path) and os.listdir(path))
+    return sessions[-1] if sessions else None
+
+
+def format_report(session_dir: str, top: int = 20) -> str:
+    """Top functions of cpu.prof and top allocation sites of the snapshots"""
+    import io
+    import pstats
+    import tracemalloc
+
+    lines = [f"Sessão: {session_dir}", '']
+    cpu_path = os.path.join(session_dir, 'cpu.prof')
+    if os.path.exists(cpu_path):
+        out = io.StringIO()
+        stats = pstats.Stats(cpu_path, stream=out)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(top)
+        lines += [f"CPU: {top} funções com maior tempo acumulado", out.getvalue().strip(), '']
+    else:
+        lines += ["CPU: nenhuma chamada capturada", '']
+
+    snapshots = sorted(glob.glob(os.path.join(session_dir, 'mem-*.snapshot')))
+    if snapshots:
+        last = tracemalloc.Snapshot.load(snapshots[-1])
+        lines.append(f"Memória: {top} maiores pontos de alocação ({os.path.basename(snapshots[-1])})")
+        for stat in last.statistics('lineno')[:top]:
+            lines.append(f"  {stat.size / 1024:10.1f} KiB {stat.count:8d} blocos  {stat.traceback[0]}")
+        if len(snapshots) > 1:
+            first = tracemalloc.Snapshot.load(snapshots[0])
+            lines += ['', f"Memória: maior crescimento desde {os.path.basename(snapshots[0])}"]
+            for stat in last.compare_to(first, 'lineno')[:top]:
+                lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocos  {stat.traceback[0]}")
+    else:
+        lines.append("Memória: nenhum snapshot")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,107 @@
+"""
+Offset-preserving pt-BR sentence and paragraph segmenter
+"""
+import re
+from typing import FrozenSet, Iterable, Iterator, Optional, Tuple
+
+
+# Abbreviations (lower-case, without the final period) that do not end a
+# sentence. Internal periods are kept: "p.ex." is stored as "p.ex". Words
+# that are also ordinary Portuguese words ("ter", "mar", "dez") are left out.
+PT_BR_ABBREVIATIONS: FrozenSet[str] = frozenset({
+    # Titles and forms of address
+    'sr', 'sra', 'srs', 'sras', 'srta', 'dr', 'dra', 'drs', 'dras', 'prof', 'profa',
+    'profs', 'eng', 'enga', 'adv', 'arq', 'exmo', 'exma', 'ilmo', 'ilma', 'v.exa',
+    'v.sa', 'rev', 'pe', 'sto', 'sta', 'dir', 'gen', 'cel', 'cap', 'ten', 'sgt',
+    'maj', 'des', 'min', 'pres', 'dep', 'sen',
+    # Latin and general abbreviations
+    'etc', 'p.ex', 'ex', 'i.e', 'e.g', 'cf', 'vs', 'obs', 'aprox', 'ref', 'refs',
+    'a.c', 'd.c', 'a.m', 'p.m', 'ps', 'p.s', 'n.b', 'op', 'cit', 'ibid', 'id', 'et', 'al',
+    # References inside documents
+    'art', 'arts', 'inc', 'caps', 'pág', 'págs', 'pag', 'pags', 'pp', 'fl', 'fls',
+    'fig', 'figs', 'tab', 'vol', 'vols', 'ed', 'eds', 'nº', 'núm', 'num', 'sec',
+    'séc', 'doc', 'anex', 'proc',
+    # Addresses and companies
+    'av', 'rod', 'pça', 'pca', 'trav', 'apto', 'apt', 'ap', 'bl', 'cj', 'tel',
+    'cep', 'ltda', 'cia', 'depto', 'dept', 'adm', 'qtd', 'qtde', 'und',
+    # Months and weekdays
+    'jan', 'fev', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov',
+    'seg', 'qua', 'qui', 'sex', 'sáb', 'sab',
+})
+
+# Sentence-end candidates: terminal punctuation (plus closing quotes and
+# brackets) followed by whitespace that is not followed by a lower-case
+# letter ("etc. e mais" continues the sentence). The regex starts with a
+# character class, so the engine skips straight to punctuation in C; only
+# single periods are then checked against the abbreviation index.
+_SENTENCE_END = re.compile(r'[.!?…][.!?…"\'”’»)\]]*(?=[ \t\r\n]+(?![a-zß-öø-ÿ]))')
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t\r]*\n[ \t\r\n]*')
+_SPACE = ' \t\r\n'
+_WORD_OPENERS = '\t\r(["\'«“‘'
+
+
+class SentenceSegmenter:
+    """Split text into sentences and paragraphs as (start, end) spans
+
+    Segments are yielded lazily and never copied: callers slice the original
+    string only when they need the text. Spans exclude surrounding whitespace.
+    """
+
+    def __init__(self, abbreviations: Iterable[str] = PT_BR_ABBREVIATIONS):
+        self.abbreviations = frozenset(a.lower().rstrip('.') for a in abbreviations)
+        # Longest abbreviation plus the preceding separator
+        self._window = max((len(a) for a in self.abbreviations), default=0) + 1
+
+    def is_abbreviation(self, text: str, period: int) -> bool:
+        """Check if the period at text[period] closes an abbreviation or an initial"""
+        window = self._window
+        word = text[period - window if period > window else 0:period]
+        word = word.rpartition(' ')[2].rpartition('\n')[2].lstrip(_WORD_OPENERS)
+        # Single-letter initials: "J. Silva"
+        if len(word) == 1:
+            return word.isalpha()
+        return word.lower() in self.abbreviations
+
+    def sentences(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of each sentence in text[start:end]
+
+        Sentences never cross a blank line.
+        """
+        if end is None:
+            end = len(text)
+        finditer = _SENTENCE_END.finditer
+        is_abbreviation = self.is_abbreviation
+        for paragraph_start, paragraph_end in self.paragraphs(text, start, end):
+            sentence_start = paragraph_start
+            for match in finditer(text, paragraph_start, paragraph_end):
+                match_start, match_end = match.span()
+                if match_end - match_start == 1 and text[match_start] == '.' and is_abbreviation(text, match_start):
+                    continue
+                yield sentence_start, match_end
+                sentence_start = match_end + 1
+                while text[sentence_start] in _SPACE:
+                    sentence_start += 1
+            yield sentence_start, paragraph_end
+
+    def paragraphs(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of each paragraph (blank-line separated)"""
+        if end is None:
+            end = len(text)
+        paragraph_start = start
+        for match in _PARAGRAPH_BREAK.finditer(text, start, end):
+            span = self._trim(text, paragraph_start, match.start())
+            if span:
+                yield span
+            paragraph_start = match.end()
+        span = self._trim(text, paragraph_start, end)
+        if span:
+            yield span
+
+    @staticmethod
+    def _trim(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Trim whitespace from a span, returning None if it is empty"""
+        while start < end and text[start] in _SPACE:
+            start += 1
+        while end > start and text[end - 1] in _SPACE:
+            end -= 1
+        return (start, end) if start < end else None
@@ -0,0 +1,472 @@
+"""
+Local HTTP API exposing the text operations
+"""
+import asyncio
+import contextlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+from .config import Config
+from .ia_client import AIClient
+from .metrics import QUEUE_DEPTH, REGISTRY
+from .logger import Logger
+from .operations import run_operation, stream_operation
+from .text_processor import TextProcessor
+
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BATCH_REQUESTS = 1000
+
+# Seconds a keep-alive connection may wait for its next request
+_KEEP_ALIVE_TIMEOUT = 30.0
+
+# Upper bounds (seconds) of the request latency histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class HTTPError(Exception):
+    """Error answered with an HTTP status and a JSON body"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class ServerMetrics:
+    """HTTP request counters and latency histograms of one server
+
+    Only touched from the event loop thread, so no locking is needed.
+    Process-wide metrics (tokens, retries, cache hits...) live in
+    metrics.REGISTRY.
+    """
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.buckets: Dict[str, List[int]] = {}
+        self.latency_sum: Dict[str, float] = {}
+        self.latency_count: Dict[str, int] = {}
+        self.in_flight = 0
+        self._waiting = 0
+        self.rejected = 0
+
+    @property
+    def waiting(self) -> int:
+        """Operations waiting for a free slot (mirrored in the process registry)"""
+        return self._waiting
+
+    @waiting.setter
+    def waiting(self, value: int) -> None:
+        self._waiting = value
+        QUEUE_DEPTH.set(value, 'server')
+
+    def observe(self, operation: str, status: int, seconds: float) -> None:
+        """Record one finished operation"""
+        key = (operation, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if status != 200:
+            return
+        buckets = self.buckets.setdefault(operation, [0] * len(LATENCY_BUCKETS))
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        self.latency_sum[operation] = self.latency_sum.get(operation, 0.0) + seconds
+        self.latency_count[operation] = self.latency_count.get(operation, 0) + 1
+
+    def render(self, similarity: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+        """Render the metrics in Prometheus text format"""
+        lines = [
+            '# HELP text_helper_requests_total Operations served, by operation and HTTP status',
+            '# TYPE text_helper_requests_total counter'
+        ]
+        for (operation, status), count in sorted(self.requests.items()):
+            lines.append(f'text_helper_requests_total{{operation="{operation}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP text_helper_request_duration_seconds Latency of successful operations',
+            '# TYPE text_helper_request_duration_seconds histogram'
+        ]
+        for operation, buckets in sorted(self.buckets.items()):
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f'text_helper_request_duration_seconds_bucket{{operation="{operation}",le="{bound}"}} {count}')
+            count = self.latency_count[operation]
+            lines.append(f'text_helper_request_duration_seconds_bucket{{operation="{operation}",le="+Inf"}} {count}')
+            lines.append(f'text_helper_request_duration_seconds_sum{{operation="{operation}"}} {self.latency_sum[operation]:.6f}')
+            lines.append(f'text_helper_request_duration_seconds_count{{operation="{operation}"}} {count}')
+
+        lines += [
+            '# HELP text_helper_in_flight Operations running now',
+            '# TYPE text_helper_in_flight gauge',
+            f'text_helper_in_flight {self.in_flight}',
+            '# HELP text_helper_rejected_total Requests refused because the queue was full',
+            '# TYPE text_helper_rejected_total counter',
+            f'text_helper_rejected_total {self.rejected}'
+        ]
+
+        if similarity is not None:
+            lines += [
+                '# HELP text_helper_similarity_hits_total Near-duplicate cache hits',
+                '# TYPE text_helper_similarity_hits_total counter'
+            ]
+            for operation, stats in sorted(similarity.items()):
+                lines.append(f'text_helper_similarity_hits_total{{operation="{operation}"}} {stats["hits"]}')
+            lines += [
+                '# HELP text_helper_similarity_lookups_total Near-duplicate cache lookups',
+                '# TYPE text_helper_similarity_lookups_total counter'
+            ]
+            for operation, stats in sorted(similarity.items()):
+                lines.append(f'text_helper_similarity_lookups_total{{operation="{operation}"}} {stats["lookups"]}')
+        return '\n'.join(lines) + '\n'
+
+
+class TextHelperServer:
+    """Serve the text operations over HTTP/1.1 on asyncio
+
+    Endpoints:
+        POST /v1/{operation}   {"text": ...} -> {"result": ...}; with
+                               "stream": true (or ?stream=1, or
+                               Accept: text/event-stream) the reply is
+                               server-sent events: delta*, then done or error
+        POST /v1/batch         {"requests": [{"operation", "text", "id"}]}
+        GET  /v1/operations    available operations
+        GET  /metrics          Prometheus text format
+        GET  /health
+
+    Operations run on a thread pool behind a semaphore of max_concurrency
+    slots; when max_queue requests are already waiting, new ones get 503.
+    Connections are kept alive between requests, except for event streams.
+    The client, caches and rate limiter are shared by every caller.
+    """
+
+    def __init__(self, config: Config, ai_client: AIClient, text_processor: TextProcessor, logger: Logger,
+                 host: str = '127.0.0.1', port: int = 8765, max_concurrency: int = 8, max_queue: int = 64):
+        self.config = config
+        self.ai_client = ai_client
+        self.text_processor = text_processor
+        self.logger = logger
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.metrics = ServerMetrics()
+        self.ready = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    def get_operations(self) -> List[str]:
+        """Operations accepted by /v1/{operation}"""
+        return sorted(list(self.ai_client.get_system_prompts()) + ['translate'])
+
+    def serve_forever(self) -> None:
+        """Run the server until stop() is called"""
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """Accept connections until stop() is called"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='Server')
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.logger.info("HTTP server listening on http://%s:%s (%s slots, queue %s)",
+                         self.host, self.port, self.max_concurrency, self.max_queue)
+        self.ready.set()
+        try:
+            await self._stop_event.wait()
+        finally:
+            server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await server.wait_closed()
+            self._executor.shutdown(wait=False)
+            self.logger.info("HTTP server stopped")
+
+    def stop(self) -> None:
+        """Stop the server (thread-safe)"""
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    # HTTP
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer requests on one connection until it closes"""
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader, writer), _KEEP_ALIVE_TIMEOUT)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {'error': e.message}, False, e.headers)
+                    return
+                if request is None:
+                    return
+                if not await self._dispatch(request, writer):
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> Optional[Dict[str, Any]]:
+        """Read one request, or None if the client closed the connection"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "headers too large")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, separator, value = line.partition(':')
+            if not separator:
+                raise HTTPError(400, "malformed header")
+            headers[name.strip().lower()] = value.strip()
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise HTTPError(411, "chunked request bodies are not supported")
+        try:
+            length = int(headers.get('content-length', '0'))
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"body over {MAX_BODY_BYTES} bytes")
+        if length and headers.get('expect', '').lower() == '100-continue':
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        connection = headers.get('connection', '').lower()
+        return {
+            'method': method,
+            'path': url.path,
+            'query': parse_qs(url.query),
+            'headers': headers,
+            'body': body,
+            'keep_alive': connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        }
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str,
+                    keep_alive: bool, headers: Optional[Dict[str, str]] = None) -> None:
+        """Write a complete response"""
+        head = [
+            f'HTTP/1.1 {status} {HTTPStatus(status).phrase}',
+            f'Content-Type: {content_type}',
+            f'Content-Length: {len(body)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}'
+        ]
+        head += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any,
+                         keep_alive: bool, headers: Optional[Dict[str, str]] = None) -> None:
+        """Write a JSON response"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        await self._send(writer, status, body, 'application/json; charset=utf-8', keep_alive, headers)
+
+    @staticmethod
+    def _parse_json(request: Dict[str, Any]) -> Dict[str, Any]:
+        """Decode a JSON object body"""
+        try:
+            payload = json.loads(request['body'].decode('utf-8'))
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return payload
+
+    async def _dispatch(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> bool:
+        """Route one request; returns whether to keep the connection"""
+        keep_alive = request['keep_alive']
+        method, path = request['method'], request['path'].rstrip('/')
+        try:
+            if path == '/health':
+                self._require(method, 'GET')
+                await self._send_json(writer, 200, {'ok': True}, keep_alive)
+            elif path == '/metrics':
+                self._require(method, 'GET')
+                similarity = self.ai_client.similarity_cache.get_stats() if self.ai_client.similarity_cache else None
+                # Queue depth, tokens, retries etc. come from the process registry
+                body = (self.metrics.render(similarity) + REGISTRY.render()).encode('utf-8')
+                await self._send(writer, 200, body, 'text/plain; version=0.0.4; charset=utf-8', keep_alive)
+            elif path == '/v1/operations':
+                self._require(method, 'GET')
+                await self._send_json(writer, 200, {'operations': self.get_operations()}, keep_alive)
+            elif path == '/v1/batch':
+                self._require(method, 'POST')
+                await self._send_json(writer, 200, await self._batch(self._parse_json(request)), keep_alive)
+            elif path.startswith('/v1/'):
+                self._require(method, 'POST')
+                operation = path[len('/v1/'):]
+                if operation not in self.get_operations():
+                    raise HTTPError(404, f"unknown operation: {operation}")
+                payload = self._parse_json(request)
+                text = payload.get('text')
+                if not isinstance(text, str):
+                    raise HTTPError(400, "'text' is required")
+                if (payload.get('stream') or request['query'].get('stream', ['0'])[0] not in ('0', '')
+                        or 'text/event-stream' in request['headers'].get('accept', '')):
+                    await self._stream(writer, operation, text)
+                    return False
+                result = await self._run(operation, text)
+                await self._send_json(writer, 200, {'operation': operation, 'result': result}, keep_alive)
+            else:
+                raise HTTPError(404, f"not found: {path}")
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {'error': e.message}, keep_alive, e.headers)
+        return keep_alive
+
+    @staticmethod
+    def _require(method: str, expected: str) -> None:
+        """Reject other HTTP methods"""
+        if method != expected:
+            raise HTTPError(405, f"use {expected}", {'Allow': expected})
+
+    # Operations
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, admit: bool = True):
+        """Hold one of the max_concurrency slots, refusing if the queue is full"""
+        if admit and self._semaphore.locked() and self.metrics.waiting >= self.max_queue:
+            self.metrics.rejected += 1
+            raise HTTPError(503, "servidor ocupado, tente novamente", {'Retry-After': '1'})
+        self.metrics.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.metrics.waiting -= 1
+        self.metrics.in_flight += 1
+        try:
+            yield
+        finally:
+            self.metrics.in_flight -= 1
+            self._semaphore.release()
+
+    async def _run(self, operation: str, text: str, admit: bool = True) -> str:
+        """Run one operation on the thread pool"""
+        async with self._slot(admit):
+            start = time.perf_counter()
+            try:
+                result = await self._loop.run_in_executor(
+                    self._executor, run_operation, self.config, self.ai_client, self.text_processor, text, operation
+                )
+            except ValueError as e:
+                self.metrics.observe(operation, 422, time.perf_counter() - start)
+                raise HTTPError(422, str(e))
+            except Exception as e:
+                self.metrics.observe(operation, 502, time.perf_counter() - start)
+                raise HTTPError(502, str(e))
+            self.metrics.observe(operation, 200, time.perf_counter() - start)
+            return result
+
+    async def _batch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a list of requests; identical ones are processed once"""
+        requests = payload.get('requests')
+        if not isinstance(requests, list) or not requests:
+            raise HTTPError(400, "'requests' must be a non-empty list")
+        if len(requests) > MAX_BATCH_REQUESTS:
+            raise HTTPError(413, f"at most {MAX_BATCH_REQUESTS} requests per batch")
+        operations = self.get_operations()
+        default_operation = payload.get('operation')
+        for item in requests:
+            if not isinstance(item, dict) or not isinstance(item.get('text'), str):
+                raise HTTPError(400, "every request needs 'text'")
+            if (item.get('operation') or default_operation) not in operations:
+                raise HTTPError(404, f"unknown operation: {item.get('operation') or default_operation}")
+
+        # One admission check for the whole batch; its items then queue for slots
+        if self._semaphore.locked() and self.metrics.waiting >= self.max_queue:
+            self.metrics.rejected += 1
+            raise HTTPError(503, "servidor ocupado, tente novamente", {'Retry-After': '1'})
+
+        async def outcome(operation: str, text: str) -> Dict[str, Any]:
+            try:
+                return {'result': await self._run(operation, text, admit=False)}
+            except HTTPError as e:
+                return {'error': e.message, 'status': e.status}
+
+        tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        for item in requests:
+            key = (item.get('operation') or default_operation, item['text'])
+            if key not in tasks:
+                tasks[key] = asyncio.ensure_future(outcome(*key))
+        await asyncio.gather(*tasks.values())
+
+        results = []
+        for index, item in enumerate(requests):
+            key = (item.get('operation') or default_operation, item['text'])
+            entry = {'id': item.get('id', index), 'operation': key[0]}
+            entry.update(tasks[key].result())
+            results.append(entry)
+        return {'results': results, 'unique': len(tasks)}
+
+    async def _stream(self, writer: asyncio.StreamWriter, operation: str, text: str) -> None:
+        """Answer with server-sent events as the reply arrives"""
+        events: asyncio.Queue = asyncio.Queue()
+        loop = self._loop
+
+        def produce():
+            try:
+                for piece in stream_operation(self.config, self.ai_client, self.text_processor, text, operation):
+                    loop.call_soon_threadsafe(events.put_nowait, ('delta', piece))
+                loop.call_soon_threadsafe(events.put_nowait, ('done', None))
+            except ValueError as e:
+                loop.call_soon_threadsafe(events.put_nowait, ('error', (422, str(e))))
+            except Exception as e:
+                loop.call_soon_threadsafe(events.put_nowait, ('error', (502, str(e))))
+
+        async with self._slot():
+            start = time.perf_counter()
+            writer.write(
+                b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n'
+                b'Cache-Control: no-cache\r\nConnection: close\r\n\r\n'
+            )
+            producer = loop.run_in_executor(self._executor, produce)
+            pieces = []
+            status = 200
+            try:
+                while True:
+                    kind, value = await events.get()
+                    if kind == 'delta':
+                        pieces.append(value)
+                        self._write_event(writer, 'delta', {'text': value})
+                    elif kind == 'done':
+                        self._write_event(writer, 'done', {'operation': operation, 'result': ''.join(pieces)})
+                        break
+                    else:
+                        status = value[0]
+                        self._write_event(writer, 'error', {'status': value[0], 'error': value[1]})
+                        break
+                    await writer.drain()
+                await writer.drain()
+            finally:
+                # Keep the slot until the worker is done, even if the client left
+                await producer
+                self.metrics.observe(operation, status, time.perf_counter() - start)
+
+    @staticmethod
+    def _write_event(writer: asyncio.StreamWriter, event: str, payload: Dict[str, Any]) -> None:
+        """Write one server-sent event"""
+        data = json.dumps(payload, ensure_ascii=False)
+        writer.write(f'event: {event}\ndata: {data}\n\n'.encode('utf-8'))
@@ -0,0 +1,198 @@
+"""
+Near-duplicate result reuse with SimHash fingerprints and LSH banding
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+
+FINGERPRINT_BITS = 64
+
+# Operations whose result can be reused as-is for a near-duplicate input.
+# Other operations only get the cached result offered as a draft.
+SAFE_OPERATIONS = frozenset({'analyze', 'summarize'})
+
+_TOKEN = re.compile(r'\w+')
+_DIGITS = re.compile(r'\d+')
+
+
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash of a feature"""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(text: str) -> int:
+    """Compute the 64-bit SimHash of text over word counts
+
+    Digits are collapsed so dates, amounts and ids barely move the fingerprint.
+    """
+    features: Dict[str, int] = {}
+    for token in _TOKEN.findall(_DIGITS.sub('0', text.lower())):
+        features[token] = features.get(token, 0) + 1
+    if not features:
+        return 0
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature, weight in features.items():
+        h = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if h >> bit & 1:
+                weights[bit] += weight
+            else:
+                weights[bit] -= weight
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def similarity(a: int, b: int) -> float:
+    """Similarity of two fingerprints (1.0 means identical)"""
+    return 1.0 - bin(a ^ b).count('1') / FINGERPRINT_BITS
+
+
+class NearDuplicateIndex:
+    """Bounded LRU index of recent inputs with LSH band buckets
+
+    The fingerprint is split into bands; two inputs become candidates when
+    they share at least one band exactly, so a lookup only compares against
+    a handful of entries instead of the whole index. With the default eight
+    8-bit bands, any pair within 7 differing bits is guaranteed to collide.
+    """
+
+    def __init__(self, capacity: int = 512, bands: int = 8):
+        if FINGERPRINT_BITS % bands:
+            raise ValueError("bands must divide the fingerprint size")
+        self.capacity = capacity
+        self.bands = bands
+        self._band_bits = FINGERPRINT_BITS // bands
+        self._band_mask = (1 << self._band_bits) - 1
+        self._entries: 'OrderedDict[int, str]' = OrderedDict()
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.lookups = 0
+        self.hits = 0
+        self.candidates_checked = 0
+        self.lookup_time = 0.0
+
+    def _band_keys(self, fingerprint: int):
+        """Yield (band index, band value) pairs for a fingerprint"""
+        for band in range(self.bands):
+            yield band, (fingerprint >> (band * self._band_bits)) & self._band_mask
+
+    def add(self, text: str, result: str) -> int:
+        """Index a processed input and its result"""
+        fingerprint = simhash(text)
+        with self._lock:
+            if fingerprint in self._entries:
+                self._entries.move_to_end(fingerprint)
+            else:
+                for band, key in self._band_keys(fingerprint):
+                    self._buckets[band].setdefault(key, set()).add(fingerprint)
+                if len(self._entries) >= self.capacity:
+                    self._evict_oldest()
+            self._entries[fingerprint] = result
+        return fingerprint
+
+    def _evict_oldest(self) -> None:
+        """Drop the least recently used entry (lock must be held)"""
+        fingerprint, _ = self._entries.popitem(last=False)
+        for band, key in self._band_keys(fingerprint):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def lookup(self, text: str, threshold: float = 0.9) -> Optional[Tuple[str, float]]:
+        """Find the most similar indexed input above threshold
+
+        Returns:
+            Tuple of (cached result, similarity) or None
+        """
+        start = time.perf_counter()
+        fingerprint = simhash(text)
+        best: Optional[Tuple[str, float]] = None
+
+        with self._lock:
+            candidates: Set[int] = set()
+            for band, key in self._band_keys(fingerprint):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    candidates.update(bucket)
+
+            best_fingerprint = None
+            for candidate in candidates:
+                score = similarity(fingerprint, candidate)
+                if score >= threshold and (best is None or score > best[1]):
+                    best = (self._entries[candidate], score)
+                    best_fingerprint = candidate
+            if best_fingerprint is not None:
+                self._entries.move_to_end(best_fingerprint)
+
+            self.lookups += 1
+            self.candidates_checked += len(candidates)
+            if best is not None:
+                self.hits += 1
+            self.lookup_time += time.perf_counter() - start
+
+        return best
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get lookup statistics"""
+        lookups = self.lookups or 1
+        return {
+            'entries': len(self._entries),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / lookups,
+            'avg_candidates': self.candidates_checked / lookups,
+            'avg_lookup_us': self.lookup_time / lookups * 1e6,
+        }
+
+
+class SimilarityCache:
+    """Per-operation near-duplicate indexes"""
+
+    def __init__(self, capacity: int = 512, threshold: float = 0.9):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._indexes: Dict[str, NearDuplicateIndex] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, operation_type: str) -> NearDuplicateIndex:
+        """Get or create the index for an operation"""
+        with self._lock:
+            index = self._indexes.get(operation_type)
+            if index is None:
+                index = NearDuplicateIndex(self.capacity)
+                self._indexes[operation_type] = index
+            return index
+
+    def lookup(self, operation_type: str, text: str) -> Optional[Tuple[str, float]]:
+        """Find a cached result for a near-duplicate input"""
+        return self._index(operation_type).lookup(text, self.threshold)
+
+    def store(self, operation_type: str, text: str, result: str) -> None:
+        """Remember a result for later reuse"""
+        self._index(operation_type).add(text, result)
+
+    def is_safe(self, operation_type: str) -> bool:
+        """Check if cached results can be returned directly for an operation"""
+        return operation_type in SAFE_OPERATIONS
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get statistics for every operation index"""
+        with self._lock:
+            indexes = dict(self._indexes)
+        return {operation: index.get_stats() for operation, index in indexes.items()}
@@ -1,34 +1,59 @@
 """
 Text processing utilities and clipboard management
 """
-import time
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .clipboard import CLIPBOARD, PRIMARY, ClipboardService
+from .compaction import DEFAULT_DISCLAIMER_MARKERS, EmailCompactor
 from .logger import Logger
+from .tokens import TokenCounter
+from .normalizer import OffsetMap, TextNormalizer
+from .segmenter import SentenceSegmenter
+from .tracing import span
+
+
+# Default input limit, in tokens, when the caller does not pass a model limit
+DEFAULT_MAX_INPUT_TOKENS = 4000
 
 
 class TextProcessor:
     """Text processing and clipboard management utilities"""
     
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, token_counter: Optional[TokenCounter] = None,
+                 clipboard: Optional[ClipboardService] = None):
         self.logger = logger
+        self._clipboard = clipboard
+        self.token_counter = token_counter or TokenCounter()
+        self.normalizer = TextNormalizer()
+        self.segmenter = SentenceSegmenter()
+        self.compactor = EmailCompactor()
+    
+    @property
+    def clipboard(self) -> ClipboardService:
+        """Clipboard service, created on first use"""
+        if self._clipboard is None:
+            self._clipboard = ClipboardService(self.logger)
+        return self._clipboard
     
     def get_selected_text(self) -> Optional[str]:
-        """Get selected text - DISABLED to prevent system freezing"""
-        self.logger.info("Selected text capture disabled to prevent system freezing")
-        return None
+        """Get the current selection (X11 PRIMARY)"""
+        text = self.clipboard.read(PRIMARY)
+        return text if text and text.strip() else None
     
     def get_text_from_clipboard(self) -> Optional[str]:
-        """Get text from clipboard - DISABLED to prevent freezing"""
-        self.logger.info("Clipboard reading disabled to prevent system freezing")
-        return None
+        """Get text from the clipboard"""
+        text = self.clipboard.read(CLIPBOARD)
+        return text if text and text.strip() else None
     
     def get_text_from_source(self) -> Tuple[Optional[str], str, bool]:
-        """Get text from clipboard only (selected text capture disabled)
+        """Get text from the selection, falling back to the clipboard
         
         Returns:
             Tuple of (text, source_type, has_selection)
         """
-        # Only use clipboard to prevent system freezing
+        selected_text = self.get_selected_text()
+        if selected_text:
+            return selected_text, "selecionado", True
+        
         clipboard_text = self.get_text_from_clipboard()
         if clipboard_text:
             return clipboard_text, "clipboard", False
@@ -36,18 +61,23 @@ class TextProcessor:
             return None, None, False
     
     def copy_to_clipboard(self, text: str) -> bool:
-        """Copy text to clipboard - DISABLED to prevent freezing"""
-        self.logger.info("Clipboard copying disabled to prevent system freezing")
+        """Copy text to the clipboard"""
+        if self.clipboard.write(text, CLIPBOARD):
+            self.logger.info("Text copied to clipboard")
+            return True
         return False
     
     def replace_selected_text(self, text: str) -> bool:
-        """Replace selected text - DISABLED to prevent system freezing"""
-        self.logger.info("Selected text replacement disabled to prevent system freezing")
-        return False
+        """Put text on the clipboard and the selection, ready to paste over it"""
+        copied = self.copy_to_clipboard(text)
+        return self.clipboard.write(text, PRIMARY) and copied
     
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text (memoized)"""
+        return self.token_counter.count(text)
     
-    def validate_text(self, text: str) -> bool:
-        """Validate text input"""
+    def validate_text(self, text: str, max_tokens: int = DEFAULT_MAX_INPUT_TOKENS) -> bool:
+        """Validate text input against a minimum length and a token limit"""
         if not text or not text.strip():
             return False
         
@@ -55,21 +85,65 @@ class TextProcessor:
         if len(text.strip()) < 3:
             return False
         
-        if len(text.strip()) > 10000:  # 10k characters limit
+        with span('validate', max_tokens=max_tokens) as attributes:
+            tokens = attributes['input_tokens'] = self.count_tokens(text.strip())
+        if tokens > max_tokens:
             return False
         
         return True
     
     def clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
+        """Clean and normalize text, preserving paragraphs and lists"""
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        cleaned = ' '.join(text.split())
-        
-        # Remove control characters except newlines and tabs
-        cleaned = ''.join(char for char in cleaned if ord(char) >= 32 or char in '\n\t')
+        with span('clean', chars=len(text)):
+            return self.normalizer.normalize(text)
+    
+    def clean_text_with_offsets(self, text: str) -> Tuple[str, OffsetMap]:
+        """Clean text and map cleaned positions back to the original text"""
+        return self.normalizer.normalize_with_offsets(text or "")
+    
+    
+    def split_sentences(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of each sentence in text"""
+        return self.segmenter.sentences(text or "")
+    
+    def split_paragraphs(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of each paragraph in text"""
+        return self.segmenter.paragraphs(text or "")
+    
+    def set_disclaimer_markers(self, markers: Iterable[str]) -> None:
+        """Add user-configured disclaimer markers to the built-in ones"""
+        self.compactor.disclaimer_markers = tuple(
+            marker.casefold() for marker in list(DEFAULT_DISCLAIMER_MARKERS) + list(markers)
+        )
+    
+    def compact_text(self, text: str) -> Dict[str, Any]:
+        """Strip quoted replies, repeated signatures and disclaimers
         
-        return cleaned.strip()
+        Returns:
+            Dict with the compacted 'text', the 'removed' parts (restorable
+            with restore_compacted) and token counts before and after
+        """
+        with span('compact') as attributes:
+            compacted, removed = self.compactor.compact(text or "")
+            original_tokens = self.count_tokens(text or "")
+            compacted_tokens = self.count_tokens(compacted)
+            attributes['tokens_saved'] = original_tokens - compacted_tokens
+        if removed:
+            kinds = ', '.join(sorted({part['kind'] for part in removed}))
+            self.logger.info("Compaction removed %s parts (%s), saving %s of %s tokens",
+                             len(removed), kinds, original_tokens - compacted_tokens, original_tokens)
+        return {
+            'text': compacted,
+            'removed': removed,
+            'original_tokens': original_tokens,
+            'compacted_tokens': compacted_tokens,
+            'tokens_saved': original_tokens - compacted_tokens
+        }
     
+    def restore_compacted(self, result: str, compaction: Dict[str, Any],
+                          kinds: Optional[List[str]] = None) -> str:
+        """Append the parts stripped by compact_text() to a processed result"""
+        return self.compactor.restore(result, compaction['removed'], kinds)
@@ -0,0 +1,212 @@
+"""
+Offline token counting, preflight budgeting and TPM rate limiting
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency, fall back to the estimator
+    tiktoken = None
+
+
+# Context window and price (USD per 1M tokens) for the supported models
+MODEL_LIMITS: Dict[str, Dict[str, float]] = {
+    'gpt-3.5-turbo': {'context_window': 16385, 'input_price': 0.5, 'output_price': 1.5},
+    'gpt-4': {'context_window': 8192, 'input_price': 30.0, 'output_price': 60.0},
+    'gpt-4-turbo': {'context_window': 128000, 'input_price': 10.0, 'output_price': 30.0},
+    'gpt-4o': {'context_window': 128000, 'input_price': 2.5, 'output_price': 10.0},
+    'gpt-4o-mini': {'context_window': 128000, 'input_price': 0.15, 'output_price': 0.6},
+}
+DEFAULT_MODEL_LIMITS = {'context_window': 8192, 'input_price': 10.0, 'output_price': 30.0}
+
+# Chat formatting overhead per message and per reply (OpenAI cookbook values)
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+
+# Average characters per token of cl100k_base on pt-BR prose; used by the
+# estimator and refined by TokenCounter.calibrate() when tiktoken exists
+DEFAULT_CHARS_PER_TOKEN = 3.6
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """Count tokens with tiktoken when available, otherwise estimate them
+
+    Counts are memoized per text hash in a bounded LRU, so repeated
+    validation and preflight of the same text is free.
+    """
+
+    def __init__(self, model: str = 'gpt-3.5-turbo', cache_size: int = 1024,
+                 chars_per_token: float = DEFAULT_CHARS_PER_TOKEN):
+        self.model = model
+        self.cache_size = cache_size
+        self.chars_per_token = chars_per_token
+        self._encoding = self._load_encoding(model)
+        self._cache: 'OrderedDict[bytes, int]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_encoding(model: str):
+        """Load the BPE encoding for a model, if tiktoken is installed"""
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(model)
+        except Exception:
+            try:
+                return tiktoken.get_encoding('cl100k_base')
+            except Exception:
+                return None
+
+    @property
+    def is_exact(self) -> bool:
+        """Check if counts come from a real BPE tokenizer"""
+        return self._encoding is not None
+
+    def estimate(self, text: str) -> int:
+        """Estimate the token count without a tokenizer
+
+        Words are split into chunks of chars_per_token characters;
+        punctuation and symbols count as one token each.
+        """
+        tokens = 0
+        for piece in _PIECES.findall(text):
+            tokens += math.ceil(len(piece) / self.chars_per_token) if piece[0].isalnum() or piece[0] == '_' else 1
+        return tokens
+
+    def count(self, text: str) -> int:
+        """Count tokens in text (memoized per text hash)"""
+        if not text:
+            return 0
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        if self._encoding is not None:
+            tokens = len(self._encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = self.estimate(text)
+
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def calibrate(self, samples: Iterable[str]) -> float:
+        """Fit chars_per_token against the exact tokenizer
+
+        Returns:
+            The calibrated characters-per-token ratio
+        """
+        if self._encoding is None:
+            return self.chars_per_token
+        chars = 0
+        tokens = 0
+        for sample in samples:
+            words = ''.join(_PIECES.findall(sample))
+            chars += len(words)
+            tokens += len(self._encoding.encode(sample, disallowed_special=()))
+        if chars and tokens:
+            self.chars_per_token = chars / tokens
+        return self.chars_per_token
+
+
+class TokenRateLimiter:
+    """Token bucket limiting tokens per minute (TPM)"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Refill the bucket (lock must be held)"""
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: int, timeout: Optional[float] = None) -> bool:
+        """Wait until tokens are available and consume them
+
+        Requests larger than the bucket are clamped to its capacity.
+
+        Returns:
+            False if the timeout expired first
+        """
+        tokens = min(float(tokens), self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._available >= tokens:
+                    self._available -= tokens
+                    return True
+                wait = (tokens - self._available) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class TokenBudget:
+    """Preflight checks against model context windows and prices"""
+
+    def __init__(self, counter: Optional[TokenCounter] = None):
+        self.counter = counter or TokenCounter()
+
+    @staticmethod
+    def get_model_limits(model: str) -> Dict[str, float]:
+        """Get context window and prices for a model"""
+        return MODEL_LIMITS.get(model, DEFAULT_MODEL_LIMITS)
+
+    def preflight(self, text: str, model: str, max_output_tokens: int,
+                  system_prompt: str = '', user_template: str = '{text}',
+                  max_input_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Validate a request before sending it
+
+        Returns:
+            Dict with token counts, predicted cost, whether the prompt fits the
+            context window and whether the input should be chunked
+        """
+        limits = self.get_model_limits(model)
+        input_tokens = self.counter.count(text)
+        overhead = (self.counter.count(system_prompt) +
+                    self.counter.count(user_template.replace('{text}', '')) +
+                    2 * MESSAGE_OVERHEAD_TOKENS + REPLY_OVERHEAD_TOKENS)
+        prompt_tokens = input_tokens + overhead
+        context_window = int(limits['context_window'])
+
+        # Input budget: the configured limit, capped by what fits the window
+        available = max(0, context_window - overhead - max_output_tokens)
+        input_limit = min(max_input_tokens, available) if max_input_tokens else available
+
+        cost = (prompt_tokens * limits['input_price'] + max_output_tokens * limits['output_price']) / 1_000_000
+        return {
+            'model': model,
+            'exact': self.counter.is_exact,
+            'input_tokens': input_tokens,
+            'prompt_tokens': prompt_tokens,
+            'max_output_tokens': max_output_tokens,
+            'total_tokens': prompt_tokens + max_output_tokens,
+            'context_window': context_window,
+            'max_input_tokens': input_limit,
+            'fits': prompt_tokens + max_output_tokens <= context_window,
+            'needs_chunking': input_tokens > input_limit,
+            'chunks': max(1, math.ceil(input_tokens / input_limit)) if input_limit else 0,
+            'estimated_cost': cost,
+        }
@@ -0,0 +1,313 @@
+"""
+Per-job tracing: phase spans, a JSON-lines exporter and a latency report
+"""
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# The trace of the job running on the current thread
+_local = threading.local()
+
+# Percentiles printed by format_report()
+REPORT_PERCENTILES = (50, 90, 99)
+
+
+class Trace:
+    """One job: an id, its operation and the spans of its phases"""
+
+    __slots__ = ('trace_id', 'operation', 'source', 'start', 'wall_start', 'spans',
+                 'attributes', 'error', 'finished')
+
+    def __init__(self, operation: str, source: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.operation = operation
+        self.source = source
+        self.start = time.perf_counter()
+        self.wall_start = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.finished = False
+
+    def add_span(self, name: str, start: float, end: float, attributes: Optional[Dict[str, Any]] = None) -> None:
+        """Record a phase from perf_counter() start and end times"""
+        span = {'name': name, 'start_ms': round((start - self.start) * 1000, 3),
+                'ms': round((end - start) * 1000, 3)}
+        if attributes:
+            span.update(attributes)
+        # list.append is atomic: worker and UI thread spans can interleave
+        self.spans.append(span)
+
+    def to_record(self, end: float) -> Dict[str, Any]:
+        """Compact dict written by the exporter"""
+        record = {'trace_id': self.trace_id, 'ts': round(self.wall_start, 3), 'op': self.operation,
+                  'source': self.source, 'ms': round((end - self.start) * 1000, 3), 'spans': self.spans}
+        if self.attributes:
+            record['attrs'] = self.attributes
+        if self.error:
+            record['error'] = self.error
+        return record
+
+
+class span:
+    """Time a phase of the current thread's trace
+
+        with span('model', model=name) as attributes:
+            ...
+            attributes['completion_tokens'] = usage.completion_tokens
+
+    Without an active trace this is a no-op, so instrumented code costs a
+    thread-local lookup when tracing is disabled.
+    """
+
+    __slots__ = ('name', 'attributes', '_trace', '_start')
+
+    def __init__(self, name: str, **attributes: Any):
+        self.name = name
+        self.attributes = attributes
+        self._trace = getattr(_local, 'trace', None)
+
+    def __enter__(self) -> Dict[str, Any]:
+        if self._trace is not None:
+            self._start = time.perf_counter()
+        return self.attributes
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._trace is not None:
+            if exc_type is not None:
+                self.attributes['error'] = exc_type.__name__
+            self._trace.add_span(self.name, self._start, time.perf_counter(), self.attributes)
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace active on this thread, if any"""
+    return getattr(_local, 'trace', None)
+
+
+def annotate(**attributes: Any) -> None:
+    """Attach attributes to the current trace (no-op without one)"""
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.attributes.update(attributes)
+
+
+class activate:
+    """Make a trace current on this thread (e.g. in a worker thread)"""
+
+    __slots__ = ('_trace', '_previous')
+
+    def __init__(self, trace: Optional[Trace]):
+        self._trace = trace
+
+    def __enter__(self) -> Optional[Trace]:
+        self._previous = getattr(_local, 'trace', None)
+        _local.trace = self._trace
+        return self._trace
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _local.trace = self._previous
+
+
+def traced_callback(name: str, callback: Callable[[], Any], trace: Optional[Trace] = None) -> Callable[[], Any]:
+    """Wrap a callback posted to the Tk loop so its scheduling delay is traced
+
+    The span starts when the callback is wrapped (i.e. posted) and carries
+    'wait_ms', the time spent waiting for the event loop to run it.
+    """
+    trace = trace or getattr(_local, 'trace', None)
+    if trace is None:
+        return callback
+    posted = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        try:
+            with activate(trace):
+                return callback()
+        finally:
+            trace.add_span(name, posted, time.perf_counter(),
+                           {'wait_ms': round((started - posted) * 1000, 3)})
+
+    return run
+
+
+class JsonLinesExporter:
+    """Append finished traces to a file, one compact JSON object per line
+
+    Writes happen on a background thread so finishing a trace from the Tk
+    loop never waits for the disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: 'queue.SimpleQueue[Optional[Dict[str, Any]]]' = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict[str, Any]) -> None:
+        """Queue a trace record for writing"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name='TraceExporter', daemon=True)
+                self._thread.start()
+        self._queue.put(record)
+
+    def _write_loop(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            lines = [record]
+            # Batch whatever else is already waiting into the same write
+            while True:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._write(lines)
+                    return
+                lines.append(record)
+            self._write(lines)
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + '\n')
+        except OSError:
+            pass  # Tracing must never break the app
+
+    def close(self) -> None:
+        """Write pending records and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5.0)
+
+
+class Tracer:
+    """Start, finish and export job traces
+
+    A disabled tracer hands out no traces, which turns every span() into a
+    no-op.
+    """
+
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.exporter = JsonLinesExporter(path)
+
+    def start(self, operation: str, source: str = 'gui') -> Optional[Trace]:
+        """Start a trace for a job (None when tracing is disabled)"""
+        if not self.enabled:
+            return None
+        return Trace(operation, source)
+
+    def finish(self, trace: Optional[Trace], error: Optional[BaseException] = None) -> None:
+        """Close a trace and export it; later calls for the same trace are ignored"""
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+        if error is not None:
+            trace.error = f"{type(error).__name__}: {error}"
+        self.exporter.export(trace.to_record(time.perf_counter()))
+
+    def job(self, operation: str, source: str) -> '_Job':
+        """Context manager tracing a job that runs on the current thread"""
+        return _Job(self, operation, source)
+
+    def close(self) -> None:
+        """Flush exported traces"""
+        self.exporter.close()
+
+
+class _Job:
+    """Tracer.job(): start, activate and finish a trace"""
+
+    __slots__ = ('_tracer', '_trace', '_activation')
+
+    def __init__(self, tracer: Tracer, operation: str, source: str):
+        self._tracer = tracer
+        self._trace = tracer.start(operation, source)
+        self._activation = activate(self._trace)
+
+    def __enter__(self) -> Optional[Trace]:
+        return self._activation.__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._activation.__exit__(exc_type, exc, tb)
+        self._tracer.finish(self._trace, exc)
+
+
+# Report
+
+def load_traces(path: str) -> List[Dict[str, Any]]:
+    """Read exported traces, skipping lines cut short by a crash"""
+    traces = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                traces.append(json.loads(line))
+            except ValueError:
+                continue
+    return traces
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, -(-len(values) * p // 100))
+    return values[min(int(rank), len(values)) - 1]
+
+
+def summarize(traces: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Latency percentiles per operation and per phase
+
+    Returns:
+        {'operations': {op: stats}, 'phases': {span name: stats}} where stats
+        has 'count', 'errors' and 'p50'/'p90'/'p99' in ms
+    """
+    by_operation: Dict[str, List[float]] = {}
+    by_phase: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for trace in traces:
+        operation = trace.get('op', '?')
+        by_operation.setdefault(operation, []).append(trace.get('ms', 0.0))
+        if trace.get('error'):
+            errors[operation] = errors.get(operation, 0) + 1
+        for phase in trace.get('spans', []):
+            by_phase.setdefault(phase['name'], []).append(phase['ms'])
+
+    def stats(groups: Dict[str, List[float]], error_counts: Dict[str, int]) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for name, values in groups.items():
+            values.sort()
+            result[name] = {'count': len(values), 'errors': error_counts.get(name, 0)}
+            for p in REPORT_PERCENTILES:
+                result[name][f'p{p}'] = percentile(values, p)
+        return result
+
+    return {'operations': stats(by_operation, errors), 'phases': stats(by_phase, {})}
+
+
+def format_report(summary: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    """Render summarize() output as two text tables"""
+    header = f"{'':<24}{'n':>7}{'erros':>7}" + ''.join(f"{'p' + str(p):>11}" for p in REPORT_PERCENTILES)
+    lines = []
+    for title, key in (("Por operação (ms)", 'operations'), ("Por fase (ms)", 'phases')):
+        lines += [title, header]
+        rows = sorted(summary[key].items(), key=lambda item: -item[1]['p50'])
+        for name, stats in rows:
+            lines.append(f"{name:<24}{stats['count']:>7}{stats['errors']:>7}" +
+                         ''.join(f"{stats['p' + str(p)]:>11.1f}" for p in REPORT_PERCENTILES))
+        lines.append('')
+    return '\n'.join(lines).rstrip() + '\n'
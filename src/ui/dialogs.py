@@ -105,6 +105,32 @@ class LoadingDialog:
             fg='#6c757d'
         )
         self.status_label.pack(pady=5)
+        self.main_frame = main_frame
+        
+    def show_draft(self, draft: str, on_use: Callable[[str], None]):
+        """Offer a cached result for a similar text as an instant draft"""
+        if self._is_closed:
+            return
+        
+        def use_draft():
+            on_use(draft)
+            self.close()
+        
+        draft_btn = tk.Button(
+            self.main_frame,
+            text="📋 Usar rascunho (texto similar)",
+            command=use_draft,
+            bg='#17a2b8',
+            fg='white',
+            font=("Arial", 9, "bold"),
+            relief=tk.FLAT,
+            bd=0,
+            padx=10,
+            pady=4,
+            cursor='hand2'
+        )
+        draft_btn.pack(pady=(0, 5))
+        self.dialog.geometry("350x215")
         
     def _animate_loading(self):
         """Animate the loading icon with more icons"""
@@ -124,11 +150,10 @@ class LoadingDialog:
             self._animation_id = self.dialog.after(400, self._animate_loading)
         
     def update_status(self, message: str):
-        """Update the status message"""
+        """Update the status message (Tk thread; the main loop redraws it)"""
         self.status_label.config(text=message)
-        self.dialog.update()
         if self.logger:
-            self.logger.info(f"Loading status: {message}")
+            self.logger.info("Loading status: %s", message)
         
     def _safe_grab_set(self):
         """Safely set grab with error handling"""
@@ -136,7 +161,7 @@ class LoadingDialog:
             self.dialog.grab_set()
         except Exception as e:
             if self.logger:
-                self.logger.warning(f"Could not set grab: {e}")
+                self.logger.warning("Could not set grab: %s", e)
     
     def _safe_grab_release(self):
         """Safely release grab with error handling"""
@@ -144,7 +169,7 @@ class LoadingDialog:
             self.dialog.grab_release()
         except Exception as e:
             if self.logger:
-                self.logger.warning(f"Could not release grab: {e}")
+                self.logger.warning("Could not release grab: %s", e)
     
     def _auto_close_timeout(self):
         """Auto-close dialog after timeout to prevent permanent freeze"""
@@ -299,7 +324,7 @@ class ErrorDialog:
         close_btn.pack(pady=10)
         
         if self.logger:
-            self.logger.error(f"Error dialog shown: {error_message}")
+            self.logger.error("Error dialog shown: %s", error_message)
     
     def _safe_grab_set(self):
         """Safely set grab with error handling"""
@@ -307,7 +332,7 @@ class ErrorDialog:
             self.dialog.grab_set()
         except Exception as e:
             if self.logger:
-                self.logger.warning(f"Could not set grab: {e}")
+                self.logger.warning("Could not set grab: %s", e)
     
     def _safe_grab_release(self):
         """Safely release grab with error handling"""
@@ -315,7 +340,7 @@ class ErrorDialog:
             self.dialog.grab_release()
         except Exception as e:
             if self.logger:
-                self.logger.warning(f"Could not release grab: {e}")
+                self.logger.warning("Could not release grab: %s", e)
     
     def _auto_close_timeout(self):
         """Auto-close dialog after timeout to prevent permanent freeze"""
@@ -494,6 +519,39 @@ class ConfigDialog:
         self.auto_close_var = tk.StringVar(value=self.config.get('UI', 'auto_close_delay', '10'))
         auto_close_entry = tk.Entry(parent, textvariable=self.auto_close_var, width=10, font=("Arial", 10))
         auto_close_entry.pack(anchor=tk.W, pady=(0, 10))
+        
+        # Local emojify backend (offline, no API cost)
+        self.local_emojify_var = tk.BooleanVar(value=self.config.get_backend('emojify') == 'local')
+        local_emojify_check = tk.Checkbutton(
+            parent,
+            text="Adicionar emojis localmente (offline, sem custo de API)",
+            variable=self.local_emojify_var,
+            font=("Arial", 10),
+            bg='#f8f9fa'
+        )
+        local_emojify_check.pack(anchor=tk.W, pady=(10, 10))
+        
+        # E-mail/chat compaction (fewer input tokens)
+        compaction_config = self.config.get_compaction_config()
+        self.compaction_var = tk.BooleanVar(value=compaction_config['enabled'])
+        compaction_check = tk.Checkbutton(
+            parent,
+            text="Remover respostas citadas, assinaturas e avisos legais de e-mails",
+            variable=self.compaction_var,
+            font=("Arial", 10),
+            bg='#f8f9fa'
+        )
+        compaction_check.pack(anchor=tk.W, pady=(0, 5))
+        
+        self.restore_stripped_var = tk.BooleanVar(value=compaction_config['restore_stripped'])
+        restore_stripped_check = tk.Checkbutton(
+            parent,
+            text="Reincluir as partes removidas no resultado",
+            variable=self.restore_stripped_var,
+            font=("Arial", 10),
+            bg='#f8f9fa'
+        )
+        restore_stripped_check.pack(anchor=tk.W, pady=(0, 10))
     
     def save_config(self):
         """Save configuration"""
@@ -509,14 +567,22 @@ class ConfigDialog:
                 return
             
             # Save configuration
-            self.config.set('DEFAULT', 'openai_api_key', self.api_key_var.get())
-            self.config.set('DEFAULT', 'model', self.model_var.get())
-            self.config.set('DEFAULT', 'max_tokens', self.tokens_var.get())
-            self.config.set('DEFAULT', 'temperature', self.temperature_var.get())
-            self.config.set('DEFAULT', 'timeout', self.timeout_var.get())
-            self.config.set('UI', 'auto_close_delay', self.auto_close_var.get())
-            
-            self.config.save_config()
+            # Applied atomically: workers never see half of the changes
+            self.config.update({
+                'DEFAULT': {
+                    'openai_api_key': self.api_key_var.get(),
+                    'model': self.model_var.get(),
+                    'max_tokens': self.tokens_var.get(),
+                    'temperature': self.temperature_var.get(),
+                    'timeout': self.timeout_var.get()
+                },
+                'UI': {'auto_close_delay': self.auto_close_var.get()},
+                'BACKENDS': {'emojify': 'local' if self.local_emojify_var.get() else 'api'},
+                'COMPACTION': {
+                    'enabled': 'true' if self.compaction_var.get() else 'false',
+                    'restore_stripped': 'true' if self.restore_stripped_var.get() else 'false'
+                }
+            })
             self.on_save()
             
             messagebox.showinfo("Sucesso", "Configurações salvas com sucesso!")
@@ -528,7 +594,7 @@ class ConfigDialog:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar configurações: {e}")
             if self.logger:
-                self.logger.error(f"Error saving configuration: {e}")
+                self.logger.error("Error saving configuration: %s", e)
     
     def _safe_grab_set(self):
         """Safely set grab with error handling"""
@@ -536,7 +602,7 @@ class ConfigDialog:
             self.dialog.grab_set()
         except Exception as e:
             if self.logger:
-                self.logger.warning(f"Could not set grab: {e}")
+                self.logger.warning("Could not set grab: %s", e)
     
     def _safe_grab_release(self):
         """Safely release grab with error handling"""
@@ -544,7 +610,7 @@ class ConfigDialog:
             self.dialog.grab_release()
         except Exception as e:
             if self.logger:
-                self.logger.warning(f"Could not release grab: {e}")
+                self.logger.warning("Could not release grab: %s", e)
     
     def _auto_close_timeout(self):
         """Auto-close dialog after timeout to prevent permanent freeze"""
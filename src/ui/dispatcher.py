@@ -0,0 +1,132 @@
+"""
+Single thread-to-UI dispatcher
+
+Worker threads never touch Tk: they post() callbacks, and one periodic
+callback on the Tk thread runs everything posted since the last frame.
+"""
+import threading
+from typing import Any, Callable, Hashable, List, Optional
+from ..logger import Logger
+
+
+# Drain period, about one display frame
+INTERVAL_MS = 16
+
+
+class _Message:
+    __slots__ = ('callback', 'args', 'key', 'cancelled')
+
+    def __init__(self, callback: Callable, args: tuple, key: Optional[Hashable]):
+        self.callback = callback
+        self.args = args
+        self.key = key
+        self.cancelled = False
+
+
+class UIDispatcher:
+    """Run callbacks posted from any thread on the Tk thread, in order
+
+    Messages posted with a key replace the pending message with the same
+    key, so a burst of status updates for one dialog costs one update with
+    the latest value. Callbacks run from the drain, never from a nested
+    update(), and an exception in one is logged without losing the rest.
+    """
+
+    def __init__(self, root, logger: Optional[Logger] = None, interval_ms: int = INTERVAL_MS):
+        self.root = root
+        self.logger = logger
+        self.interval_ms = interval_ms
+        self.posted = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._messages: List[_Message] = []
+        self._pending = {}
+        self._after_id = None
+        self._running = False
+
+    def start(self) -> 'UIDispatcher':
+        """Start draining (Tk thread)"""
+        if not self._running:
+            self._running = True
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+        return self
+
+    def stop(self) -> None:
+        """Stop draining; pending messages are dropped (Tk thread)"""
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        with self._lock:
+            self._messages = []
+            self._pending.clear()
+
+    def post(self, callback: Callable, *args: Any, key: Optional[Hashable] = None) -> None:
+        """Run callback(*args) on the Tk thread at the next drain (any thread)"""
+        message = _Message(callback, args, key)
+        with self._lock:
+            self.posted += 1
+            if key is not None:
+                previous = self._pending.get(key)
+                if previous is not None:
+                    previous.cancelled = True
+                    self.coalesced += 1
+                self._pending[key] = message
+            self._messages.append(message)
+
+    def pending(self) -> int:
+        """Messages waiting for the next drain"""
+        with self._lock:
+            return sum(1 for message in self._messages if not message.cancelled)
+
+    def drain(self) -> int:
+        """Run the messages posted so far (Tk thread); returns how many ran
+
+        Messages posted while draining wait for the next drain, so a
+        callback that reposts itself runs once per frame.
+        """
+        with self._lock:
+            messages, self._messages = self._messages, []
+            self._pending.clear()
+        ran = 0
+        for message in messages:
+            if message.cancelled:
+                continue
+            try:
+                message.callback(*message.args)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("UI callback %s failed: %s",
+                                      getattr(message.callback, '__name__', message.callback), e)
+            ran += 1
+        return ran
+
+    def _tick(self) -> None:
+        self._after_id = None
+        if not self._running:
+            return
+        try:
+            self.drain()
+        finally:
+            if self._running:
+                try:
+                    self._after_id = self.root.after(self.interval_ms, self._tick)
+                except Exception:
+                    # Root destroyed
+                    self._running = False
+
+
+def get_dispatcher(widget, logger: Optional[Logger] = None) -> UIDispatcher:
+    """The dispatcher of the Tk root of widget, started on first use
+
+    Call it once from the Tk thread when a root is created, so workers
+    only ever look up the existing dispatcher.
+    """
+    root = widget._root()
+    dispatcher = getattr(root, '_ui_dispatcher', None)
+    if dispatcher is None:
+        dispatcher = root._ui_dispatcher = UIDispatcher(root, logger).start()
+    return dispatcher
@@ -0,0 +1,183 @@
+"""
+History panel: search and recover earlier results
+"""
+import time
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional
+from ..history import HistoryStore
+from ..logger import Logger
+
+
+# Rows fetched per page; the next page loads when the list is scrolled near its end
+PAGE_SIZE = 50
+
+# Milliseconds to wait after the last keystroke before searching
+SEARCH_DELAY_MS = 250
+
+
+class HistoryPanel:
+    """Window listing past results, newest first, with full-text search
+
+    Rows hold only a preview; the texts of an entry are loaded when it is
+    selected. Pages are fetched lazily as the list scrolls.
+    """
+
+    def __init__(self, parent, history: HistoryStore, on_copy: Callable[[str], None],
+                 logger: Optional[Logger] = None):
+        self.history = history
+        self.on_copy = on_copy
+        self.logger = logger
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("🕘 Histórico")
+        self.dialog.geometry("720x520")
+        self.dialog.configure(bg='#ffffff')
+        self.dialog.transient(parent)
+
+        self._query = ''
+        self._loaded = 0
+        self._last_id = None
+        self._exhausted = False
+        self._search_id = None
+        self._selected: Optional[dict] = None
+
+        self.setup_ui()
+        self._reload()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+
+    def setup_ui(self):
+        """Setup the history panel UI"""
+        main_frame = tk.Frame(self.dialog, bg='#ffffff')
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+
+        # Search box
+        search_frame = tk.Frame(main_frame, bg='#ffffff')
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        tk.Label(search_frame, text="🔎", font=("Segoe UI", 11), bg='#ffffff').pack(side=tk.LEFT, padx=(0, 6))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self._schedule_search())
+        search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=("Segoe UI", 10),
+                                relief=tk.FLAT, bg='#f0f2f5')
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=4)
+        search_entry.focus_set()
+        self.count_label = tk.Label(search_frame, text="", font=("Segoe UI", 9), bg='#ffffff', fg='#7f8c8d')
+        self.count_label.pack(side=tk.LEFT, padx=(8, 0))
+
+        # Entry list
+        list_frame = tk.Frame(main_frame, bg='#ffffff')
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(list_frame, columns=('date', 'operation', 'preview'), show='headings', height=10)
+        self.tree.heading('date', text="Data")
+        self.tree.heading('operation', text="Operação")
+        self.tree.heading('preview', text="Resultado")
+        self.tree.column('date', width=120, stretch=False)
+        self.tree.column('operation', width=100, stretch=False)
+        self.tree.column('preview', width=440)
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<<TreeviewSelect>>', lambda event: self._show_selected())
+
+        # Details of the selected entry
+        self.details_label = tk.Label(main_frame, text="", font=("Segoe UI", 9), bg='#ffffff', fg='#7f8c8d',
+                                      anchor='w')
+        self.details_label.pack(fill=tk.X, pady=(10, 4))
+        self.result_text = tk.Text(main_frame, height=8, wrap=tk.WORD, font=("Segoe UI", 10),
+                                   relief=tk.FLAT, bg='#f8f9fa', padx=8, pady=8)
+        self.result_text.pack(fill=tk.BOTH, expand=True)
+        self.result_text.config(state=tk.DISABLED)
+
+        buttons_frame = tk.Frame(main_frame, bg='#ffffff')
+        buttons_frame.pack(fill=tk.X, pady=(10, 0))
+        tk.Button(buttons_frame, text="📋 Copiar resultado", command=self._copy_selected, bg='#667eea',
+                  fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=6,
+                  cursor='hand2').pack(side=tk.LEFT)
+        tk.Button(buttons_frame, text="✖️ Fechar", command=self.close, bg='#95a5a6', fg='white',
+                  font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=6,
+                  cursor='hand2').pack(side=tk.RIGHT)
+
+    def _schedule_search(self):
+        """Search once typing pauses"""
+        if self._search_id:
+            self.dialog.after_cancel(self._search_id)
+        self._search_id = self.dialog.after(SEARCH_DELAY_MS, self._reload)
+
+    def _reload(self):
+        """Start over with the current query"""
+        self._search_id = None
+        self._query = self.search_var.get()
+        self._loaded = 0
+        self._last_id = None
+        self._exhausted = False
+        self.tree.delete(*self.tree.get_children())
+        self._load_page()
+
+    def _load_page(self):
+        """Append the next page of entries"""
+        if self._exhausted:
+            return
+        start = time.perf_counter()
+        try:
+            rows = self.history.search(self._query, PAGE_SIZE, self._last_id)
+        except Exception as e:
+            if self.logger:
+                self.logger.error("History search failed: %s", e)
+            rows = []
+        for row in rows:
+            if self.tree.exists(str(row['id'])):
+                continue
+            date = time.strftime('%d/%m %H:%M', time.localtime(row['created_at']))
+            self.tree.insert('', tk.END, iid=str(row['id']), values=(date, row['operation'], row['preview']))
+            self._loaded += 1
+        if rows:
+            self._last_id = rows[-1]['id']
+        self._exhausted = len(rows) < PAGE_SIZE
+        more = "+" if not self._exhausted else ""
+        self.count_label.config(text=f"{self._loaded}{more} itens · {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _on_scroll(self, scrollbar: tk.Scrollbar, first: str, last: str):
+        """Keep the scrollbar in sync and load more near the end of the list"""
+        scrollbar.set(first, last)
+        if float(last) > 0.9 and not self._exhausted and self._loaded:
+            self.dialog.after_idle(self._load_page)
+
+    def _show_selected(self):
+        """Load and show the selected entry"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self._selected = self.history.get(int(selection[0]))
+        if not self._selected:
+            return
+        entry = self._selected
+        details = [entry['operation']]
+        if entry.get('model'):
+            details.append(entry['model'])
+        if entry.get('input_tokens') is not None:
+            details.append(f"{entry['input_tokens']} → {entry.get('output_tokens') or 0} tokens")
+        if entry.get('latency_ms') is not None:
+            details.append(f"{entry['latency_ms'] / 1000:.1f}s")
+        self.details_label.config(text=' · '.join(details))
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert('1.0', entry['output'])
+        self.result_text.config(state=tk.DISABLED)
+
+    def _copy_selected(self):
+        """Copy the result of the selected entry"""
+        if self._selected:
+            self.on_copy(self._selected['output'])
+            self.details_label.config(text="✅ Resultado copiado")
+
+    def close(self):
+        """Close the panel"""
+        if self._search_id:
+            try:
+                self.dialog.after_cancel(self._search_id)
+            except Exception:
+                pass
+        try:
+            self.dialog.destroy()
+        except Exception:
+            pass
@@ -6,19 +6,25 @@ from tkinter import ttk, messagebox
 from typing import Optional, Callable
 from ..config import Config
 from ..logger import Logger
+from .dispatcher import get_dispatcher
+from .result_pane import ResultPane
 
 
 class MainWindow:
     """Enhanced main window with modern styling and better organization"""
     
     def __init__(self, config: Config, logger: Logger, 
-                 on_process_text: Callable[[str], None], on_show_config: Callable[[], None]):
+                 on_process_text: Callable[[str], None], on_show_config: Callable[[], None],
+                 on_show_history: Optional[Callable[[], None]] = None):
         self.config = config
         self.logger = logger
         self.on_process_text = on_process_text
         self.on_show_config = on_show_config
+        self.on_show_history = on_show_history
         
         self.root = tk.Tk()
+        # Created here, on the Tk thread, before any worker posts to it
+        self.dispatcher = get_dispatcher(self.root, self.logger)
         self.setup_window()
         self.setup_ui()
         
@@ -74,6 +80,9 @@ class MainWindow:
         # Status section
         self._create_status(inner_container)
         
+        # Result pane, packed when the first result arrives
+        self.result_pane = ResultPane(inner_container, self.logger, on_show=self._show_result_pane)
+        
     def _create_header(self, parent):
         """Create header section"""
         header_frame = tk.Frame(parent, bg='#ffffff')
@@ -235,18 +244,30 @@ class MainWindow:
             btn.pack(side=tk.LEFT, padx=2)
     
     def _create_config_button(self, parent):
-        """Create configuration button"""
+        """Create configuration and history buttons"""
         config_frame = tk.Frame(parent, bg='#ffffff')
         config_frame.pack(fill=tk.X, pady=(10, 0))
+        buttons_frame = tk.Frame(config_frame, bg='#ffffff')
+        buttons_frame.pack()
         
         config_btn = self._create_modern_button(
-            config_frame,
+            buttons_frame,
             text="⚙️ Configurações",
             command=self.on_show_config,
             color="#95a5a6",
             size="large"
         )
-        config_btn.pack()
+        config_btn.pack(side=tk.LEFT, padx=4)
+        
+        if self.on_show_history:
+            history_btn = self._create_modern_button(
+                buttons_frame,
+                text="🕘 Histórico",
+                command=self.on_show_history,
+                color="#95a5a6",
+                size="large"
+            )
+            history_btn.pack(side=tk.LEFT, padx=4)
     
     def _create_modern_button(self, parent, text, command, color, size="normal"):
         """Create a modern button with enhanced styling"""
@@ -348,6 +369,7 @@ class MainWindow:
     def close(self):
         """Close the main window"""
         self.logger.info("Main window closed")
+        self.dispatcher.stop()
         self.root.destroy()
     
     def update_status(self, message: str, color: str = '#27ae60'):
@@ -367,22 +389,35 @@ class MainWindow:
                 parent = self.status_text.master
                 if hasattr(parent, 'config'):
                     parent.config(bg=bg_color)
-            self.logger.info(f"Status update: {message}")
+            self.logger.info("Status update: %s", message)
         except Exception as e:
-            self.logger.error(f"Error updating status: {e}")
+            self.logger.error("Error updating status: %s", e)
     
     def show_error(self, title: str, message: str):
         """Show error message"""
         messagebox.showerror(title, message)
-        self.logger.error(f"Error shown: {title} - {message}")
+        self.logger.error("Error shown: %s - %s", title, message)
     
     def show_info(self, title: str, message: str):
         """Show info message"""
         messagebox.showinfo(title, message)
-        self.logger.info(f"Info shown: {title} - {message}")
+        self.logger.info("Info shown: %s - %s", title, message)
+    
+    def _show_result_pane(self):
+        """Make room for the result pane the first time it has content"""
+        self.result_pane.frame.pack(fill=tk.BOTH, expand=True, pady=(15, 0))
+        self.root.resizable(True, True)
+        self.root.geometry(f"{max(self.root.winfo_width(), 520)}x{self.root.winfo_height() + 220}")
+    
+    def begin_result(self):
+        """Clear the result pane for a new reply (any thread)"""
+        self.result_pane.clear()
+    
+    def append_result(self, delta: str):
+        """Append a streamed piece of the reply (any thread)"""
+        self.result_pane.push(delta)
     
     def set_result(self, text: str):
-        """Set result text (now just for compatibility - results shown in notifications)"""
-        # Results are now shown in system notifications, this method is kept for compatibility
-        self.logger.info("Result text received (shown in notification)")
+        """Show a whole result, replacing the current one (any thread)"""
+        self.result_pane.set_text(text)
     
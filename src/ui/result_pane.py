@@ -0,0 +1,146 @@
+"""
+Result pane that renders streamed replies without flooding the Tk event loop
+"""
+import threading
+import tkinter as tk
+from collections import deque
+from typing import Callable, Optional, Tuple
+from ..logger import Logger
+from .dispatcher import get_dispatcher
+
+
+# Characters inserted per frame; a longer backlog (a 100k-character reply
+# arriving at once) is spread over the following frames
+MAX_CHARS_PER_FRAME = 16384
+
+# Queue marker: drop what was shown and start over
+_RESET = None
+
+
+class StreamBuffer:
+    """Thread-safe queue of text deltas, drained in coalesced chunks
+
+    Worker threads push() and clear(); the Tk thread calls take() once per
+    frame and gets everything that arrived since, as one string. push()
+    reports when the buffer goes from idle to pending, so the producer
+    schedules at most one drain per frame instead of one per delta.
+    """
+
+    def __init__(self, max_chars: int = MAX_CHARS_PER_FRAME):
+        self.max_chars = max_chars
+        self._items = deque()
+        self._backlog = ''
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def push(self, delta: str) -> bool:
+        """Queue a delta; True if the caller must schedule a drain"""
+        return self._put(delta)
+
+    def clear(self) -> bool:
+        """Queue a reset; True if the caller must schedule a drain"""
+        return self._put(_RESET)
+
+    def _put(self, item: Optional[str]) -> bool:
+        with self._lock:
+            self._items.append(item)
+            if self._scheduled:
+                return False
+            self._scheduled = True
+            return True
+
+    def take(self) -> Tuple[bool, str, bool]:
+        """Everything queued since the last call, up to max_chars
+
+        Returns:
+            (reset, text, more): whether the shown text must be cleared
+            first, the text to append, and whether another drain is needed
+        """
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+        reset = False
+        pieces = [self._backlog]
+        for item in items:
+            if item is _RESET:
+                reset = True
+                pieces = []
+            else:
+                pieces.append(item)
+        text = ''.join(pieces)
+        self._backlog = text[self.max_chars:]
+        text = text[:self.max_chars]
+        with self._lock:
+            more = bool(self._backlog or self._items)
+            # Cleared under the lock, so a push racing this drain reschedules
+            self._scheduled = more
+        return reset, text, more
+
+
+class ResultPane:
+    """Read-only Text widget fed from any thread through a StreamBuffer
+
+    push() and clear() may be called from worker threads; the widget is
+    only touched by the drain, which runs from the UI dispatcher at most
+    once per frame and applies all pending deltas with a single insert.
+    """
+
+    def __init__(self, parent, logger: Optional[Logger] = None, on_show: Optional[Callable[[], None]] = None):
+        self.logger = logger
+        self.on_show = on_show
+        self.buffer = StreamBuffer()
+        self.frame = tk.Frame(parent, bg='#ffffff')
+        self.text = tk.Text(self.frame, height=10, wrap=tk.WORD, font=("Segoe UI", 10), relief=tk.FLAT,
+                            bg='#f8f9fa', fg='#2c3e50', padx=8, pady=8, undo=False)
+        scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set, state=tk.DISABLED)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._shown = False
+        self.dispatcher = get_dispatcher(self.text, logger)
+
+    def push(self, delta: str) -> None:
+        """Append text (any thread)"""
+        if delta and self.buffer.push(delta):
+            self._schedule()
+
+    def clear(self) -> None:
+        """Empty the pane (any thread)"""
+        if self.buffer.clear():
+            self._schedule()
+
+    def set_text(self, text: str) -> None:
+        """Replace the content (any thread)"""
+        self.clear()
+        self.push(text)
+
+    def get_text(self) -> str:
+        """Text currently shown (Tk thread)"""
+        return self.text.get('1.0', 'end-1c')
+
+    def _schedule(self) -> None:
+        self.dispatcher.post(self._drain, key=self)
+
+    def _drain(self) -> None:
+        """Apply pending deltas (Tk thread)"""
+        reset, text, more = self.buffer.take()
+        try:
+            if (reset or text) and not self._shown and self.on_show:
+                self._shown = True
+                self.on_show()
+            # Follow the end only if the user has not scrolled up
+            at_end = self.text.yview()[1] >= 0.999
+            self.text.configure(state=tk.NORMAL)
+            if reset:
+                self.text.delete('1.0', tk.END)
+            if text:
+                self.text.insert(tk.END, text)
+            self.text.configure(state=tk.DISABLED)
+            if at_end or reset:
+                self.text.see(tk.END)
+        except tk.TclError as e:
+            if self.logger:
+                self.logger.warning("Result pane update failed: %s", e)
+            return
+        if more:
+            self._schedule()
@@ -0,0 +1,176 @@
+"""
+Token and cost accounting with spending limits
+"""
+import datetime
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from .config import BudgetSettings
+from .tokens import TokenBudget
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    day TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    estimated_calls INTEGER NOT NULL DEFAULT 0,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, operation, model)
+) WITHOUT ROWID;
+"""
+
+
+class BudgetExceeded(Exception):
+    """A spending limit with action 'block' was reached"""
+
+
+def usage_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Price in USD of a call, from the MODEL_LIMITS price table"""
+    limits = TokenBudget.get_model_limits(model)
+    return (input_tokens * limits['input_price'] + output_tokens * limits['output_price']) / 1_000_000
+
+
+class UsageLedger:
+    """Daily token and cost totals per operation and model
+
+    One row per (day, operation, model) is updated in place, so the file
+    stays small however many calls are made; rows older than
+    retention_days are dropped when the ledger is opened. The database is
+    in WAL mode, so the GUI, the daemon and the server can share it.
+    """
+
+    def __init__(self, path: str, retention_days: int = 400):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        """Open the database on first use (callers hold the lock)"""
+        if self._connection is None:
+            import sqlite3
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            if self.retention_days > 0:
+                oldest = datetime.date.today() - datetime.timedelta(days=self.retention_days)
+                connection.execute('DELETE FROM usage WHERE day < ?', (oldest.isoformat(),))
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def record(self, operation: str, model: str, input_tokens: int, output_tokens: int,
+               estimated: bool = False) -> float:
+        """Add one call to today's totals; returns its cost
+
+        Args:
+            estimated: The tokens were counted locally (e.g. a stream that
+                carried no usage) rather than reported by the API
+        """
+        cost = usage_cost(model, input_tokens, output_tokens)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    'INSERT INTO usage (day, operation, model, calls, estimated_calls, input_tokens, output_tokens,'
+                    ' cost) VALUES (?, ?, ?, 1, ?, ?, ?, ?) ON CONFLICT (day, operation, model) DO UPDATE SET'
+                    ' calls = calls + 1, estimated_calls = estimated_calls + excluded.estimated_calls,'
+                    ' input_tokens = input_tokens + excluded.input_tokens,'
+                    ' output_tokens = output_tokens + excluded.output_tokens, cost = cost + excluded.cost',
+                    (datetime.date.today().isoformat(), operation, model, int(estimated),
+                     input_tokens, output_tokens, cost)
+                )
+        return cost
+
+    def totals(self, since: datetime.date, until: Optional[datetime.date] = None) -> Dict[str, Any]:
+        """Calls, tokens and cost from since to until (today), inclusive"""
+        until = until or datetime.date.today()
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT COALESCE(SUM(calls), 0) AS calls,'
+                ' COALESCE(SUM(input_tokens), 0) AS input_tokens,'
+                ' COALESCE(SUM(output_tokens), 0) AS output_tokens, COALESCE(SUM(cost), 0) AS cost'
+                ' FROM usage WHERE day BETWEEN ? AND ?', (since.isoformat(), until.isoformat())
+            ).fetchone()
+        totals = dict(row)
+        totals['tokens'] = totals['input_tokens'] + totals['output_tokens']
+        return totals
+
+    def breakdown(self, since: datetime.date, by: str = 'operation') -> List[Dict[str, Any]]:
+        """Totals since a day grouped by 'day', 'operation' or 'model', costliest first"""
+        if by not in ('day', 'operation', 'model'):
+            raise ValueError(f"Unknown grouping: {by}")
+        order = 'day DESC' if by == 'day' else 'cost DESC'
+        with self._lock:
+            rows = self._connect().execute(
+                f'SELECT {by} AS key, SUM(calls) AS calls, SUM(estimated_calls) AS estimated_calls,'
+                f' SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens, SUM(cost) AS cost'
+                f' FROM usage WHERE day >= ? GROUP BY {by} ORDER BY {order}', (since.isoformat(),)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def exceeded(self, budget: BudgetSettings) -> Optional[str]:
+        """The first limit of budget already reached, described for the user"""
+        if not budget.enabled:
+            return None
+        today = datetime.date.today()
+        if budget.daily_tokens or budget.daily_cost:
+            day = self.totals(today)
+            if budget.daily_tokens and day['tokens'] >= budget.daily_tokens:
+                return f"{day['tokens']} de {budget.daily_tokens} tokens hoje"
+            if budget.daily_cost and day['cost'] >= budget.daily_cost:
+                return f"US$ {day['cost']:.2f} de US$ {budget.daily_cost:.2f} hoje"
+        if budget.monthly_cost:
+            month = self.totals(today.replace(day=1))
+            if month['cost'] >= budget.monthly_cost:
+                return f"US$ {month['cost']:.2f} de US$ {budget.monthly_cost:.2f} no mês"
+        return None
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def format_report(ledger: UsageLedger, budget: BudgetSettings, days: int = 30) -> str:
+    """Spend per day, operation and model over the last days, and the budget state"""
+    today = datetime.date.today()
+    since = today - datetime.timedelta(days=days - 1)
+    lines = []
+    header = f"{'':<22} {'chamadas':>9} {'entrada':>11} {'saída':>11} {'custo US$':>10}"
+
+    def table(title: str, rows: List[Dict[str, Any]]) -> None:
+        lines.extend([title, header])
+        for row in rows:
+            mark = '*' if row['estimated_calls'] else ' '
+            lines.append(f"{str(row['key'])[:22]:<22} {row['calls']:>9}{mark}{row['input_tokens']:>11} "
+                         f"{row['output_tokens']:>11} {row['cost']:>10.4f}")
+        lines.append('')
+
+    table(f"Por dia (últimos {days} dias)", ledger.breakdown(since, 'day'))
+    table("Por operação", ledger.breakdown(since, 'operation'))
+    table("Por modelo", ledger.breakdown(since, 'model'))
+
+    day = ledger.totals(today)
+    month = ledger.totals(today.replace(day=1))
+    lines.append(f"Hoje: {day['tokens']} tokens, US$ {day['cost']:.4f}; "
+                 f"mês: {month['tokens']} tokens, US$ {month['cost']:.4f}")
+    if budget.enabled:
+        limit = ledger.exceeded(budget)
+        state = f"excedido ({limit}), ação: {budget.action}" if limit else "dentro dos limites"
+        lines.append(f"Orçamento: {state}")
+    else:
+        lines.append("Orçamento: sem limites ([BUDGET] na configuração)")
+    lines.append("* inclui chamadas com tokens contados localmente (streaming)")
+    return '\n'.join(lines) + '\n'
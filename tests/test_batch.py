@@ -0,0 +1,155 @@
+"""
+Tests for the resumable batch runner
+"""
+import unittest
+from unittest.mock import Mock
+import json
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.batch import BatchRunner
+from src.text_processor import TextProcessor
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for BatchRunner"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.temp_dir, 'registros.jsonl')
+        self.output_path = os.path.join(self.temp_dir, 'resultados.jsonl')
+        self.mock_logger = Mock()
+        self.config = Mock()
+        self.config.get_compaction_config.return_value = {'enabled': False, 'restore_stripped': False}
+        self.config.get_openai_config.return_value = {'model': 'gpt-3.5-turbo'}
+        self.config.get_max_input_tokens.return_value = 4000
+        self.ai_client = Mock()
+        self.ai_client.process_text.side_effect = lambda text, operation: f"{operation}:{text.upper()}"
+        
+        records = [{'id': f"r{i}", 'text': f"Registro número {i % 10} para teste."} for i in range(30)]
+        records[5]['operation'] = 'improve'
+        records[7]['text'] = "x"
+        self._write(self.input_path, '\n'.join(json.dumps(r, ensure_ascii=False) for r in records) + '\n')
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _write(self, path, content):
+        """Write a text file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def _runner(self, **kwargs):
+        """Build a runner with a few workers"""
+        return BatchRunner(self.config, self.ai_client, TextProcessor(self.mock_logger), self.mock_logger,
+                           max_workers=3, **kwargs)
+    
+    def _read_output(self):
+        """Read the output lines keyed by record id"""
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        return {line['id']: line for line in lines}, len(lines)
+    
+    def test_run(self):
+        """Test every record gets one line and duplicates are sent once"""
+        progress = []
+        stats = self._runner(progress=progress.append).run(self.input_path, self.output_path, 'shorten')
+        output, lines = self._read_output()
+        
+        self.assertEqual(lines, 30)
+        self.assertEqual(output['r3']['result'], "shorten:REGISTRO NÚMERO 3 PARA TESTE.")
+        self.assertEqual(output['r13']['result'], output['r3']['result'])
+        self.assertEqual(output['r5']['operation'], 'improve')
+        self.assertIn('error', output['r7'])
+        self.assertEqual(stats['errors'], 1)
+        # 10 distinct texts, plus the override and the invalid record
+        self.assertEqual(stats['unique'], 12)
+        self.assertEqual(self.ai_client.process_text.call_count, 11)
+        self.assertEqual(progress[-1]['done'], 30)
+        self.assertFalse(os.path.exists(self.output_path + '.journal'))
+    
+    def test_resume(self):
+        """Test a killed job resumes without repeating written records"""
+        calls = []
+        
+        def crash_after_five(text, operation):
+            calls.append(text)
+            if len(calls) > 5:
+                raise KeyboardInterrupt
+            return text.upper()
+        
+        self.ai_client.process_text.side_effect = crash_after_five
+        runner = BatchRunner(self.config, self.ai_client, TextProcessor(self.mock_logger), self.mock_logger,
+                             max_workers=1)
+        with self.assertRaises(KeyboardInterrupt):
+            runner.run(self.input_path, self.output_path, 'shorten')
+        # Simulate a half-written line from the kill
+        with open(self.output_path, 'ab') as f:
+            f.write(b'{"id": "r9", "resu')
+        
+        self.ai_client.process_text.side_effect = lambda text, operation: text.upper()
+        stats = runner.run(self.input_path, self.output_path, 'shorten')
+        output, lines = self._read_output()
+        
+        self.assertEqual(lines, 30)
+        self.assertEqual(len(output), 30)
+        self.assertGreater(stats['resumed'], 0)
+        self.assertEqual(stats['resumed'] + stats['written'], 30)
+    
+    def test_resume_retries_failed_records(self):
+        """Test records that failed before a kill are sent again on resume"""
+        calls = []
+        
+        def rate_limited_then_killed(text, operation):
+            calls.append(text)
+            if text.startswith("Registro número 2 "):
+                raise Exception("429 rate limit")
+            if len(calls) > 6:
+                raise KeyboardInterrupt
+            return text.upper()
+        
+        self.ai_client.process_text.side_effect = rate_limited_then_killed
+        runner = BatchRunner(self.config, self.ai_client, TextProcessor(self.mock_logger), self.mock_logger,
+                             max_workers=1)
+        with self.assertRaises(KeyboardInterrupt):
+            runner.run(self.input_path, self.output_path, 'shorten')
+        output, _ = self._read_output()
+        self.assertIn('error', output['r2'])
+        
+        self.ai_client.process_text.side_effect = lambda text, operation: text.upper()
+        stats = runner.run(self.input_path, self.output_path, 'shorten')
+        output, lines = self._read_output()
+        
+        self.assertEqual(lines, 30)
+        for record_id in ('r2', 'r12', 'r22'):
+            self.assertEqual(output[record_id]['result'], "REGISTRO NÚMERO 2 PARA TESTE.")
+        self.assertEqual(stats['errors'], 1)  # Only the invalid record
+        self.assertEqual(stats['resumed'] + stats['written'], 30)
+    
+    def test_csv_input(self):
+        """Test CSV records with an operation column"""
+        csv_path = os.path.join(self.temp_dir, 'registros.csv')
+        self._write(csv_path, 'id,text,operation\na,"Primeiro texto, com vírgula.",\nb,Segundo texto.,formal\n')
+        self._runner().run(csv_path, self.output_path, 'shorten')
+        output, _ = self._read_output()
+        
+        self.assertEqual(output['a']['result'], "shorten:PRIMEIRO TEXTO, COM VÍRGULA.")
+        self.assertEqual(output['b']['operation'], 'formal')
+    
+    def test_malformed_input(self):
+        """Test malformed records are rejected before any dispatch"""
+        self._write(self.input_path, '{"text": "ok"}\n{"id": 2}\n')
+        with self.assertRaises(ValueError):
+            self._runner().run(self.input_path, self.output_path, 'shorten')
+        self.ai_client.process_text.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
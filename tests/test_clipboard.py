@@ -0,0 +1,97 @@
+"""
+Tests for ClipboardService class
+"""
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.clipboard import ClipboardService
+
+
+class FakeClipboard:
+    """In-memory stand-in for pyperclip"""
+    
+    def __init__(self, delay=0.0):
+        self.text = ""
+        self.delay = delay
+        self.threads = set()
+    
+    def copy(self, text):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        self.text = text
+    
+    def paste(self):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return self.text
+
+
+class TestClipboardService(unittest.TestCase):
+    """Test cases for ClipboardService"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.logger = Mock()
+        self.fake = FakeClipboard()
+        patcher = patch.multiple('pyperclip', copy=self.fake.copy, paste=self.fake.paste)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = ClipboardService(self.logger, timeout=1.0, backend='pyperclip')
+        self.addCleanup(self.service.stop)
+    
+    def test_roundtrip_off_caller_thread(self):
+        """Test writes and reads run on the clipboard worker"""
+        self.assertTrue(self.service.write("olá"))
+        self.assertEqual(self.service.read(), "olá")
+        self.assertEqual(self.fake.threads, {'ClipboardOwner'})
+    
+    def test_large_payload(self):
+        """Test multi-megabyte text"""
+        text = "texto grande ção " * 300000
+        self.assertTrue(self.service.write(text))
+        self.assertEqual(self.service.read(), text)
+    
+    def test_read_timeout(self):
+        """Test a hung backend does not block the caller past the timeout"""
+        self.fake.delay = 0.5
+        start = time.monotonic()
+        self.assertIsNone(self.service.read(timeout=0.1))
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.logger.warning.assert_called()
+    
+    def test_async_callbacks(self):
+        """Test async operations report through callbacks"""
+        done = threading.Event()
+        results = []
+        self.service.write_async("assíncrono", callback=results.append)
+        self.service.read_async(lambda text: (results.append(text), done.set()))
+        self.assertTrue(done.wait(2))
+        self.assertEqual(results, [True, "assíncrono"])
+    
+    def test_backend_error(self):
+        """Test backend errors are logged and reported as failure"""
+        with patch('pyperclip.copy', side_effect=Exception("sem display")):
+            self.assertFalse(self.service.write("x"))
+        self.logger.error.assert_called()
+    
+    def test_stuck_worker_is_replaced(self):
+        """Test a worker stuck past two timeouts is abandoned"""
+        service = ClipboardService(self.logger, timeout=0.05, backend='pyperclip')
+        self.addCleanup(service.stop)
+        self.fake.delay = 0.3
+        self.assertIsNone(service.read())
+        time.sleep(0.12)
+        self.fake.delay = 0.0
+        self.fake.text = "livre"
+        self.assertEqual(service.read(timeout=1.0), "livre")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for EmailCompactor class
+"""
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.compaction import EmailCompactor
+
+
+SIGNATURE = "Ana Souza\nGerente de Projetos\n(11) 5555-0000"
+THREAD = (
+    "Oi Carlos,\n\nSegue a proposta revisada. Podemos fechar até sexta?\n\n"
+    f"{SIGNATURE}\n\n"
+    "Esta mensagem pode conter informações confidenciais. Se você recebeu esta "
+    "mensagem por engano, apague-a.\n\n"
+    "Em seg., 3 de jun. de 2024 às 10:00, Carlos Lima <carlos@exemplo.com> escreveu:\n"
+    "> Ana, pode revisar a proposta?\n"
+    ">\n"
+    "> Carlos\n\n"
+    f"{SIGNATURE}"
+)
+
+
+class TestEmailCompactor(unittest.TestCase):
+    """Test cases for EmailCompactor"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.compactor = EmailCompactor()
+    
+    def test_strips_thread_boilerplate(self):
+        """Test quoted chain, repeated signature and disclaimer are removed"""
+        compacted, removed = self.compactor.compact(THREAD)
+        self.assertEqual(compacted, "Oi Carlos,\n\nSegue a proposta revisada. Podemos fechar até sexta?")
+        self.assertEqual([part['kind'] for part in removed], ['signature', 'disclaimer', 'quoted'])
+        for part in removed:
+            self.assertEqual(THREAD[part['start']:part['end']], part['text'])
+    
+    def test_learns_signatures(self):
+        """Test a repeated signature is stripped from later single messages"""
+        self.compactor.compact(THREAD)
+        compacted, removed = self.compactor.compact(f"Bom dia!\n\n{SIGNATURE}")
+        self.assertEqual(compacted, "Bom dia!")
+        self.assertEqual(removed[0]['kind'], 'signature')
+    
+    def test_repeats_are_not_learned(self):
+        """Test repeated closing lines are kept and not learned"""
+        text = "Obrigado.\n\nSegue abaixo o relatório.\n\nObrigado."
+        self.assertEqual(self.compactor.compact(text), (text, []))
+        reply = "Combinado.\n\nObrigado.\n\nEm seg., 3 de jun. de 2024, Carlos <c@x.com> escreveu:\n> Pode enviar?\n>\n> Obrigado."
+        compacted, _ = self.compactor.compact(reply)
+        self.assertEqual(compacted, "Combinado.\n\nObrigado.")
+        self.assertEqual(self.compactor.learned_fingerprints, [])
+        self.assertEqual(self.compactor.compact("Tudo certo.\n\nObrigado.")[0], "Tudo certo.\n\nObrigado.")
+    
+    def test_learns_delimited_signature(self):
+        """Test the block after '-- ' is learned"""
+        self.compactor.compact("Minha resposta.\n-- \nJoão\nEmpresa X")
+        compacted, removed = self.compactor.compact("Outra mensagem.\n\nJoão\nEmpresa X")
+        self.assertEqual(compacted, "Outra mensagem.")
+        self.assertEqual(removed[0]['kind'], 'signature')
+    
+    def test_quoted_lines_and_delimiter(self):
+        """Test '>' blocks and the '-- ' signature delimiter"""
+        text = "> citação antiga\n> mais citação\n\nMinha resposta.\n-- \nJoão\nEmpresa X"
+        compacted, removed = self.compactor.compact(text)
+        self.assertEqual(compacted, "Minha resposta.")
+        self.assertEqual([part['kind'] for part in removed], ['quoted', 'signature'])
+    
+    def test_outlook_header(self):
+        """Test Outlook-style reply headers start the quoted chain"""
+        text = "Aprovado.\n\nDe: Maria\nEnviado: terça-feira\nPara: Equipe\nAssunto: Orçamento\n\nTexto antigo"
+        compacted, _ = self.compactor.compact(text)
+        self.assertEqual(compacted, "Aprovado.")
+    
+    def test_configured_disclaimers(self):
+        """Test user-configured disclaimer markers"""
+        compactor = EmailCompactor(disclaimer_markers=['Enviado do meu celular'])
+        compacted, removed = compactor.compact("Ok, combinado.\n\nEnviado do meu celular")
+        self.assertEqual(compacted, "Ok, combinado.")
+        self.assertEqual(removed[0]['kind'], 'disclaimer')
+    
+    def test_restore(self):
+        """Test stripped parts can be appended back to a result"""
+        compacted, removed = self.compactor.compact(THREAD)
+        restored = self.compactor.restore("RESULTADO", removed)
+        self.assertTrue(restored.startswith("RESULTADO\n\nAna Souza"))
+        self.assertIn("> Carlos", restored)
+        only_quoted = self.compactor.restore("RESULTADO", removed, kinds=['quoted'])
+        self.assertNotIn("confidenciais", only_quoted)
+    
+    def test_plain_text_untouched(self):
+        """Test ordinary text passes through"""
+        text = "Primeiro parágrafo.\n\nSegundo parágrafo."
+        self.assertEqual(self.compactor.compact(text), (text, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -87,6 +87,14 @@ class TestConfig(unittest.TestCase):
         self.assertIsInstance(logging_config['max_size'], int)
         self.assertIsInstance(logging_config['backup_count'], int)
     
+    def test_get_backend(self):
+        """Test per-operation backend selection"""
+        self.assertEqual(self.config.get_backend('emojify'), 'api')
+        self.assertEqual(self.config.get_backend('shorten'), 'api')
+        
+        self.config.set('BACKENDS', 'emojify', 'Local')
+        self.assertEqual(self.config.get_backend('emojify'), 'local')
+    
     def test_is_configured(self):
         """Test configuration status check"""
         # Initially not configured (empty API key)
@@ -116,6 +124,78 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(new_config.get('DEFAULT', 'test_section_key'), 'test_section_value')
         self.assertEqual(new_config.get('TEST_SECTION', 'test_key'), 'test_value')
 
+    
+    def test_snapshot_is_immutable_and_swapped(self):
+        """Test changes swap in a new frozen snapshot"""
+        snapshot = self.config.snapshot()
+        with self.assertRaises(AttributeError):
+            snapshot.openai.model = 'gpt-4'
+        
+        self.config.update({'DEFAULT': {'model': 'gpt-4o', 'max_tokens': '500'}}, save=False)
+        self.assertEqual(snapshot.openai.model, 'gpt-3.5-turbo')
+        self.assertEqual(self.config.snapshot().openai.model, 'gpt-4o')
+        self.assertEqual(self.config.get_openai_config()['max_tokens'], 500)
+    
+    def test_invalid_update_is_rolled_back(self):
+        """Test an unparsable value leaves the settings untouched"""
+        with self.assertRaises(ValueError):
+            self.config.update({'DEFAULT': {'model': 'gpt-4o', 'max_tokens': 'muitos'}})
+        self.assertEqual(self.config.get('DEFAULT', 'max_tokens'), '300')
+        self.assertEqual(self.config.snapshot().openai.model, 'gpt-3.5-turbo')
+    
+    def test_rejected_update_restores_snapshot(self):
+        """Test a listener raising ValueError rolls back settings and snapshot"""
+        changes = []
+        self.config.add_listener(lambda old, new: changes.append((old.openai.model, new.openai.model)))
+        
+        def reject(old, new):
+            if new.openai.model == 'gpt-4o':
+                raise ValueError("modelo recusado")
+        
+        self.config.add_listener(reject)
+        snapshot = self.config.snapshot()
+        with self.assertRaises(ValueError):
+            self.config.update({'DEFAULT': {'model': 'gpt-4o'}}, save=False)
+        self.assertEqual(self.config.get('DEFAULT', 'model'), 'gpt-3.5-turbo')
+        self.assertIs(self.config.snapshot(), snapshot)
+        self.assertEqual(changes, [('gpt-3.5-turbo', 'gpt-4o'), ('gpt-4o', 'gpt-3.5-turbo')])
+    
+    def test_invalid_budget_action(self):
+        """Test an unknown budget action is rejected"""
+        with self.assertRaises(ValueError):
+            self.config.update({'BUDGET': {'action': 'bloquear'}}, save=False)
+        self.assertEqual(self.config.snapshot().budget.action, 'warn')
+        self.config.update({'BUDGET': {'action': ' Block '}}, save=False)
+        self.assertEqual(self.config.snapshot().budget.action, 'block')
+    
+    def test_reload_if_changed(self):
+        """Test external edits are picked up and reported to listeners"""
+        changes = []
+        self.config.add_listener(lambda old, new: changes.append((old.openai.api_key, new.openai.api_key)))
+        self.assertFalse(self.config.reload_if_changed())
+        
+        edited = Config(self.temp_file.name)
+        edited.set('DEFAULT', 'openai_api_key', 'sk-novo')
+        edited.set('TOKENS', 'max_input_tokens.gpt-4o', '9000')
+        edited.save_config()
+        os.utime(self.temp_file.name, ns=(0, os.stat(self.temp_file.name).st_mtime_ns + 1))
+        
+        self.assertTrue(self.config.reload_if_changed())
+        self.assertEqual(changes, [('', 'sk-novo')])
+        self.assertEqual(self.config.get_max_input_tokens('gpt-4o'), 9000)
+        self.assertFalse(self.config.reload_if_changed())
+    
+    def test_reload_keeps_settings_on_invalid_file(self):
+        """Test a broken edit does not replace the current settings"""
+        with open(self.temp_file.name) as f:
+            content = f.read()
+        with open(self.temp_file.name, 'w') as f:
+            f.write(content.replace("tpm_limit = 0", "tpm_limit = muitos"))
+        os.utime(self.temp_file.name, ns=(0, os.stat(self.temp_file.name).st_mtime_ns + 1))
+        with self.assertRaises(ValueError):
+            self.config.reload_if_changed()
+        self.assertEqual(self.config.get_tpm_limit(), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for the resident daemon and its thin client
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.daemon import TextHelperDaemon
+from src.daemon_client import DaemonClient
+from src.text_processor import TextProcessor
+
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+class TestTextHelperDaemon(unittest.TestCase):
+    """Test cases for TextHelperDaemon and DaemonClient"""
+    
+    def setUp(self):
+        """Start a daemon on a temporary socket"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, 'daemon.sock')
+        
+        self.config = Mock()
+        self.config.get_compaction_config.return_value = {'enabled': False, 'restore_stripped': False}
+        self.config.get_openai_config.return_value = {'model': 'gpt-3.5-turbo'}
+        self.config.get_max_input_tokens.return_value = 4000
+        self.ai_client = Mock()
+        self.ai_client.similarity_cache = None
+        self.ai_client.process_text.side_effect = lambda text, op: f"{op}: {text}"
+        
+        self.daemon = TextHelperDaemon(
+            self.config, self.ai_client, TextProcessor(Mock()), Mock(), self.socket_path, workers=2
+        )
+        self.daemon.bind()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = DaemonClient(self.socket_path, timeout=5)
+    
+    def tearDown(self):
+        """Stop the daemon"""
+        self.daemon.stop()
+        self.thread.join(5)
+        self.tmpdir.cleanup()
+    
+    def test_process(self):
+        """Test a round trip through the socket"""
+        self.assertTrue(self.client.ping())
+        self.assertEqual(self.client.process('shorten', "  Um texto   qualquer.  "), "shorten: Um texto qualquer.")
+    
+    def test_large_payload(self):
+        """Test multi-megabyte requests and responses"""
+        text = "palavra " * 400000
+        self.config.get_max_input_tokens.return_value = 10 ** 7
+        self.assertEqual(len(self.client.process('shorten', text)), len("shorten: ") + len(text.strip()))
+    
+    def test_errors(self):
+        """Test invalid input and unknown requests report errors"""
+        with self.assertRaises(RuntimeError):
+            self.client.process('shorten', "x")
+        self.assertFalse(self.client.request({'type': 'bogus'})['ok'])
+        self.assertEqual(self.client.request({'type': 'stats'})['stats']['errors'], 2)
+    
+    def test_concurrent_clients(self):
+        """Test several clients at once"""
+        results = {}
+        
+        def worker(index):
+            results[index] = DaemonClient(self.socket_path, timeout=5).process('improve', f"Texto número {index}.")
+        
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, {i: f"improve: Texto número {i}." for i in range(8)})
+    
+    def test_refuses_second_daemon(self):
+        """Test a live socket is not stolen"""
+        other = TextHelperDaemon(self.config, self.ai_client, Mock(), Mock(), self.socket_path)
+        with self.assertRaises(RuntimeError):
+            other.bind()
+    
+    def test_send_cli(self):
+        """Test `text_helper_ia.py --send` without importing the app"""
+        completed = subprocess.run(
+            [sys.executable, os.path.join(ROOT, 'text_helper_ia.py'), '--send', 'shorten', '--socket', self.socket_path],
+            input="Olá, mundo!", capture_output=True, text=True, timeout=30
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout, "shorten: Olá, mundo!\n")
+    
+    def test_send_cli_without_daemon(self):
+        """Test the client exits with code 3 when no daemon is running"""
+        completed = subprocess.run(
+            [sys.executable, os.path.join(ROOT, 'text_helper_ia.py'), '--send', 'shorten',
+             '--socket', os.path.join(self.tmpdir.name, 'missing.sock')],
+            input="Olá", capture_output=True, text=True, timeout=30
+        )
+        self.assertEqual(completed.returncode, 3)
+    
+    def test_client_is_lightweight(self):
+        """Test the thin client does not import openai or tkinter"""
+        code = (
+            "import sys; sys.path.insert(0, sys.argv[1]); import src.daemon_client; "
+            "print(any(m in sys.modules for m in ('openai', 'tkinter')))"
+        )
+        completed = subprocess.run([sys.executable, '-c', code, ROOT], capture_output=True, text=True, timeout=30)
+        self.assertEqual(completed.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
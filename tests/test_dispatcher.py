@@ -0,0 +1,156 @@
+"""
+Tests for the thread-to-UI dispatcher
+"""
+import unittest
+from unittest.mock import Mock
+import threading
+import time
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.ui.dispatcher import UIDispatcher
+
+
+class FakeRoot:
+    """Stands in for a Tk root: after() callbacks run from run_pending()"""
+
+    def __init__(self):
+        self._timers = {}
+        self._next_id = 0
+
+    def after(self, ms, func):
+        self._next_id += 1
+        self._timers[self._next_id] = (time.monotonic() + ms / 1000, func)
+        return self._next_id
+
+    def after_cancel(self, timer_id):
+        self._timers.pop(timer_id, None)
+
+    def run_pending(self):
+        """One pass of the event loop: run the timers that are due"""
+        now = time.monotonic()
+        for timer_id, (due, func) in sorted(self._timers.items()):
+            if due <= now:
+                del self._timers[timer_id]
+                func()
+
+
+class TestUIDispatcher(unittest.TestCase):
+    """Test cases for UIDispatcher"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.root = FakeRoot()
+        self.logger = Mock()
+        self.dispatcher = UIDispatcher(self.root, self.logger)
+
+    def test_order_and_coalescing(self):
+        """Keyed messages keep only the latest; the rest run in order"""
+        calls = []
+        self.dispatcher.post(calls.append, 'a')
+        self.dispatcher.post(calls.append, 'status 1', key='status')
+        self.dispatcher.post(calls.append, 'b')
+        self.dispatcher.post(calls.append, 'status 2', key='status')
+        self.dispatcher.post(calls.append, 'other', key='other')
+        self.assertEqual(self.dispatcher.pending(), 4)
+
+        self.assertEqual(self.dispatcher.drain(), 4)
+        self.assertEqual(calls, ['a', 'b', 'status 2', 'other'])
+        self.assertEqual(self.dispatcher.coalesced, 1)
+
+        self.dispatcher.post(calls.append, 'status 3', key='status')
+        self.dispatcher.drain()
+        self.assertEqual(calls[-1], 'status 3')
+
+    def test_failing_callback(self):
+        """An exception is logged and the next callbacks still run"""
+        calls = []
+
+        def broken():
+            raise RuntimeError("widget destroyed")
+
+        self.dispatcher.post(broken)
+        self.dispatcher.post(calls.append, 'after')
+        self.dispatcher.drain()
+        self.assertEqual(calls, ['after'])
+        self.logger.error.assert_called_once()
+
+    def test_repost_waits_for_next_drain(self):
+        """A callback posted while draining runs on the next drain"""
+        calls = []
+
+        def again():
+            calls.append('run')
+            self.dispatcher.post(again)
+
+        self.dispatcher.post(again)
+        self.dispatcher.drain()
+        self.dispatcher.drain()
+        self.assertEqual(calls, ['run', 'run'])
+
+    def test_periodic_drain_and_stop(self):
+        """start() drains every interval; stop() drops what is pending"""
+        calls = []
+        self.dispatcher.start()
+        self.dispatcher.post(calls.append, 1)
+        deadline = time.monotonic() + 1
+        while not calls and time.monotonic() < deadline:
+            self.root.run_pending()
+            time.sleep(0.002)
+        self.assertEqual(calls, [1])
+
+        self.dispatcher.post(calls.append, 2)
+        self.dispatcher.stop()
+        self.assertEqual(self.dispatcher.pending(), 0)
+        self.assertEqual(self.root._timers, {})
+
+    def test_stress_from_worker_threads(self):
+        """Thousands of updates per second from workers stay ordered and coalesced"""
+        workers, updates = 8, 3000
+        ui_thread = threading.get_ident()
+        statuses = {}
+        progress = {n: [] for n in range(workers)}
+        applied = [0]
+        wrong_thread = []
+
+        def set_status(dialog, value):
+            if threading.get_ident() != ui_thread:
+                wrong_thread.append(dialog)
+            statuses[dialog] = value
+            applied[0] += 1
+
+        def add_progress(worker, i):
+            progress[worker].append(i)
+
+        def work(n):
+            for i in range(updates):
+                self.dispatcher.post(set_status, n, i, key=(n, 'status'))
+                if i % 100 == 0:
+                    self.dispatcher.post(add_progress, n, i)
+
+        self.dispatcher.start()
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        # This thread plays the Tk main loop
+        while any(thread.is_alive() for thread in threads) or self.dispatcher.pending():
+            self.root.run_pending()
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        self.dispatcher.stop()
+
+        self.assertGreater(workers * updates / elapsed, 1000)
+        self.assertEqual(wrong_thread, [])
+        self.assertEqual(statuses, {n: updates - 1 for n in range(workers)})
+        for n in range(workers):
+            self.assertEqual(progress[n], list(range(0, updates, 100)))
+        self.assertLess(applied[0], workers * updates / 2)
+        self.assertEqual(self.dispatcher.posted, workers * (updates + updates // 100))
+
+
+if __name__ == '__main__':
+    unittest.main()
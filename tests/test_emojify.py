@@ -0,0 +1,87 @@
+"""
+Tests for the local emojify engine
+"""
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.emojify import EmojiAutomaton, LocalEmojifier, get_default_automaton
+
+
+class TestEmojiAutomaton(unittest.TestCase):
+    """Test cases for EmojiAutomaton"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.lexicon = {
+            'bom': '👍',
+            'bom dia': '☀️',
+            'feliz*': '😊',
+            'café': '☕',
+        }
+        self.automaton = EmojiAutomaton.compile(self.lexicon)
+
+    def test_find_whole_words(self):
+        """Test that keywords only match whole words"""
+        self.assertEqual(self.automaton.find("bombom"), [])
+        self.assertEqual(self.automaton.find("um bom livro"), [(3, 6, '👍')])
+
+    def test_find_prefers_longest_phrase(self):
+        """Test that multi-word phrases win over their prefixes"""
+        self.assertEqual(self.automaton.find("Bom dia!"), [(0, 7, '☀️')])
+
+    def test_find_stem_extends_to_word_end(self):
+        """Test that stems match inflected words"""
+        self.assertEqual(self.automaton.find("Estamos felizes"), [(8, 15, '😊')])
+
+    def test_find_is_accent_insensitive(self):
+        """Test accent and case folding keeps original offsets"""
+        text = "Um CAFE e um café"
+        matches = self.automaton.find(text)
+        self.assertEqual([text[s:e] for s, e, _ in matches], ['CAFE', 'café'])
+
+    def test_binary_round_trip(self):
+        """Test serialization to the compact binary form"""
+        data = self.automaton.to_bytes()
+        loaded = EmojiAutomaton.from_bytes(data)
+        text = "bom dia, estou feliz com o café"
+        self.assertEqual(loaded.find(text), self.automaton.find(text))
+
+    def test_from_bytes_invalid(self):
+        """Test loading invalid data"""
+        with self.assertRaises(ValueError):
+            EmojiAutomaton.from_bytes(b'XXXX' + bytes(14))
+
+
+class TestLocalEmojifier(unittest.TestCase):
+    """Test cases for LocalEmojifier"""
+
+    def test_annotate_inserts_after_word(self):
+        """Test emoji insertion after matched keyword"""
+        emojifier = LocalEmojifier(get_default_automaton())
+        self.assertEqual(emojifier.annotate("Bom dia, pessoal"), "Bom dia ☀️, pessoal")
+
+    def test_annotate_density_limit(self):
+        """Test that emojis respect the words-per-emoji limit"""
+        emojifier = LocalEmojifier(get_default_automaton(), words_per_emoji=100)
+        result = emojifier.annotate("Bom dia! Parabéns pelo projeto, estou feliz.")
+        self.assertEqual(result, "Bom dia ☀️! Parabéns pelo projeto, estou feliz.")
+
+    def test_annotate_max_emojis(self):
+        """Test the absolute emoji cap"""
+        emojifier = LocalEmojifier(get_default_automaton(), words_per_emoji=0, max_emojis=1)
+        result = emojifier.annotate("café café café")
+        self.assertEqual(result.count('☕'), 1)
+
+    def test_annotate_no_match(self):
+        """Test text without keywords is returned unchanged"""
+        emojifier = LocalEmojifier(get_default_automaton())
+        self.assertEqual(emojifier.annotate("xyz abc"), "xyz abc")
+        self.assertEqual(emojifier.annotate(""), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for the SQLite request history
+"""
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.history import HistoryStore, fts_query
+
+
+class TestHistoryStore(unittest.TestCase):
+    """Test cases for HistoryStore"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = HistoryStore(os.path.join(self.temp_dir, 'history.db'))
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_record_and_get(self):
+        """Entries round-trip through the compressed columns"""
+        text = "Relatório trimestral de vendas. " * 200
+        entry_id = self.store.record(text, 'shorten', "Vendas subiram.", 'gpt-4o-mini', 1200, 4, 850.0)
+        entry = self.store.get(entry_id)
+        self.assertEqual(entry['input'], text)
+        self.assertEqual(entry['output'], "Vendas subiram.")
+        self.assertEqual(entry['model'], 'gpt-4o-mini')
+        self.assertEqual((entry['input_tokens'], entry['output_tokens']), (1200, 4))
+        self.assertIsNone(self.store.get(entry_id + 1))
+
+        stored = self.store._connection.execute('SELECT length(input) FROM history').fetchone()[0]
+        self.assertLess(stored, len(text.encode('utf-8')) / 10)
+
+    def test_search_accents_and_prefixes(self):
+        """Search ignores accents and matches word prefixes in input or output"""
+        self.store.count()  # Opens the database and detects FTS5
+        if not self.store.fts:
+            self.skipTest("SQLite built without FTS5")
+        self.store.record("Reunião de orçamento amanhã", 'improve', "A reunião de orçamento será amanhã.")
+        self.store.record("Convite para o café", 'formal', "Gostaria de convidá-lo para um café.")
+
+        self.assertEqual([row['operation'] for row in self.store.search("orcamento")], ['improve'])
+        self.assertEqual([row['operation'] for row in self.store.search("REUN amanh")], ['improve'])
+        self.assertEqual([row['operation'] for row in self.store.search("convid")], ['formal'])
+        self.assertEqual(self.store.search("inexistente"), [])
+        self.assertEqual(len(self.store.search('"')), 0)
+
+    def test_pagination_newest_first(self):
+        """Pages come newest first without overlapping"""
+        for i in range(120):
+            self.store.record(f"texto número {i}", 'improve', f"resultado {i}")
+        first = self.store.search('', limit=50)
+        # Recorded while paging: must not shift the next pages
+        self.store.record("texto novo", 'improve', "resultado novo")
+        second = self.store.search('', limit=50, before_id=first[-1]['id'])
+        third = self.store.search('', limit=50, before_id=second[-1]['id'])
+        self.assertEqual(first[0]['preview'], "resultado 119")
+        self.assertEqual(len(third), 20)
+        ids = [row['id'] for row in first + second + third]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(set(ids)), 120)
+        self.assertNotIn('input', first[0])
+        matching = self.store.search("resultado", limit=50, before_id=second[-1]['id'])
+        self.assertEqual([row['id'] for row in matching], [row['id'] for row in third])
+
+    def test_lookup(self):
+        """Lookup returns the latest result for the exact input and operation"""
+        self.store.record("Olá mundo", 'improve', "primeiro")
+        self.store.record("Olá mundo", 'improve', "segundo")
+        self.store.record("Olá mundo", 'shorten', "curto")
+        self.assertEqual(self.store.lookup("Olá mundo", 'improve'), "segundo")
+        self.assertEqual(self.store.lookup("Olá mundo", 'shorten'), "curto")
+        self.assertIsNone(self.store.lookup("Olá mundo!", 'improve'))
+
+    def test_pruning_keeps_index_in_sync(self):
+        """Old entries beyond max_entries leave both the table and the index"""
+        store = HistoryStore(os.path.join(self.temp_dir, 'small.db'), max_entries=3)
+        try:
+            store.record("palavraantiga", 'improve', "primeiro")
+            for i in range(3):
+                store.record(f"texto {i}", 'improve', f"resultado {i}")
+            self.assertEqual(store.count(), 3)
+            self.assertIsNone(store.lookup("palavraantiga", 'improve'))
+            self.assertEqual(store.search("palavraantiga"), [])
+            if store.fts:
+                rows = store._connection.execute(
+                    "SELECT rowid FROM history_fts WHERE history_fts MATCH ?", (fts_query("palavraantiga"),)
+                ).fetchall()
+                self.assertEqual(rows, [])
+        finally:
+            store.close()
+
+    def test_scan_fallback(self):
+        """Without FTS5 search scans the compressed texts"""
+        self.store.record("Reunião de orçamento", 'improve', "A reunião será amanhã.")
+        self.store.record("Convite", 'formal', "Convido para um café.")
+        self.store.fts = False
+        self.assertEqual([row['operation'] for row in self.store.search("reunião")], ['improve'])
+        self.assertEqual([row['operation'] for row in self.store.search("café")], ['formal'])
+        newest = self.store.search('', limit=1)
+        self.assertEqual([row['operation'] for row in self.store.search('', limit=1, before_id=newest[0]['id'])],
+                         ['improve'])
+
+    def test_fts_query(self):
+        """User input is quoted term by term as prefixes"""
+        self.assertEqual(fts_query('olá "mundo'), '"olá"* """mundo"*')
+        self.assertEqual(fts_query('  '), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for HotkeyDaemon class
+"""
+import threading
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.hotkeys import HotkeyDaemon
+from src.text_processor import TextProcessor
+
+
+class TestHotkeyDaemon(unittest.TestCase):
+    """Test cases for HotkeyDaemon"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.config = Mock()
+        self.config.get_hotkeys_config.return_value = {'enabled': True, 'paste_result': False}
+        self.config.get_compaction_config.return_value = {'enabled': False, 'restore_stripped': False}
+        self.config.get_openai_config.return_value = {'model': 'gpt-3.5-turbo'}
+        self.config.get_max_input_tokens.return_value = 4000
+        self.config.get_hotkey.side_effect = lambda op: {'shorten': '<ctrl>+<alt>+s', 'translate': '<ctrl>+<alt>+t'}.get(op, '')
+        
+        self.ai_client = Mock()
+        self.ai_client.get_system_prompts.return_value = {'shorten': '', 'improve': ''}
+        self.ai_client.process_text.side_effect = lambda text, op: text.upper()
+        
+        self.clipboard = Mock()
+        self.clipboard.read.side_effect = lambda selection: "texto selecionado" if selection == 'PRIMARY' else None
+        self.clipboard.write.return_value = True
+        self.logger = Mock()
+        self.text_processor = TextProcessor(self.logger, clipboard=self.clipboard)
+        
+        self.daemon = HotkeyDaemon(self.config, self.ai_client, self.text_processor, self.logger)
+    
+    def test_bindings(self):
+        """Test chords map to operations, including 'translate'"""
+        self.assertEqual(
+            self.daemon.get_bindings(),
+            {'<ctrl>+<alt>+s': 'shorten', '<ctrl>+<alt>+t': 'translate'}
+        )
+    
+    def test_handle_processes_selection(self):
+        """Test the selection is processed and the result copied"""
+        self.assertEqual(self.daemon.handle('shorten'), "TEXTO SELECIONADO")
+        self.ai_client.process_text.assert_called_once_with("texto selecionado", 'shorten')
+        self.clipboard.write.assert_called_once_with("TEXTO SELECIONADO", 'CLIPBOARD')
+        
+        stats = self.daemon.get_stats()
+        self.assertEqual(stats['runs'], 1)
+        self.assertGreaterEqual(stats['total_p50_ms'], stats['process_p50_ms'])
+    
+    def test_paste_result(self):
+        """Test the result is pasted over the selection when enabled"""
+        self.config.get_hotkeys_config.return_value = {'enabled': True, 'paste_result': True}
+        with patch('src.hotkeys.keyboard') as keyboard:
+            self.daemon.handle('shorten')
+        keyboard.Controller.return_value.tap.assert_called_once_with('v')
+    
+    def test_no_text(self):
+        """Test nothing happens without a selection or clipboard text"""
+        self.clipboard.read.side_effect = lambda selection: None
+        self.assertIsNone(self.daemon.handle('shorten'))
+        self.ai_client.process_text.assert_not_called()
+    
+    def test_clipboard_is_not_used_without_selection(self):
+        """Test old clipboard text is neither processed nor pasted"""
+        self.config.get_hotkeys_config.return_value = {'enabled': True, 'paste_result': True}
+        self.clipboard.read.side_effect = lambda selection: "texto antigo" if selection == 'CLIPBOARD' else None
+        with patch('src.hotkeys.keyboard') as keyboard:
+            self.assertIsNone(self.daemon.handle('shorten'))
+        self.ai_client.process_text.assert_not_called()
+        self.clipboard.write.assert_not_called()
+        keyboard.Controller.assert_not_called()
+    
+    def test_busy_drops_presses(self):
+        """Test a press while an operation runs is dropped"""
+        release = threading.Event()
+        started = threading.Event()
+        
+        def slow(text, op):
+            started.set()
+            release.wait(2)
+            return text
+        
+        self.ai_client.process_text.side_effect = slow
+        worker = threading.Thread(target=self.daemon.handle, args=('shorten',))
+        worker.start()
+        self.assertTrue(started.wait(2))
+        self.assertIsNone(self.daemon.handle('shorten'))
+        release.set()
+        worker.join(2)
+        self.assertEqual(self.daemon.get_stats()['dropped'], 1)
+    
+    def test_failure_is_logged(self):
+        """Test API errors do not escape the hotkey thread"""
+        self.ai_client.process_text.side_effect = Exception("falhou")
+        self.assertIsNone(self.daemon.handle('shorten'))
+        self.assertEqual(self.daemon.get_stats()['failed'], 1)
+        self.logger.error.assert_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for LanguageIdentifier class
+"""
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.langid import LanguageIdentifier
+
+
+class TestLanguageIdentifier(unittest.TestCase):
+    """Test cases for LanguageIdentifier"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.identifier = LanguageIdentifier()
+    
+    def test_classify_portuguese(self):
+        """Test classification of Portuguese text"""
+        language, confidence = self.identifier.classify("Preciso do relatório até sexta-feira")
+        self.assertEqual(language, 'pt')
+        self.assertGreater(confidence, 0.5)
+    
+    def test_classify_english(self):
+        """Test classification of English text"""
+        language, confidence = self.identifier.classify("Please send me the report by Friday")
+        self.assertEqual(language, 'en')
+        self.assertGreater(confidence, 0.5)
+    
+    def test_classify_too_short(self):
+        """Test classification without enough signal"""
+        self.assertEqual(self.identifier.classify("ok"), ('unknown', 0.0))
+        self.assertEqual(self.identifier.classify(""), ('unknown', 0.0))
+    
+    def test_detect_spans_mixed(self):
+        """Test span detection on mixed-language text"""
+        text = "The meeting is tomorrow. A reunião é amanhã às dez horas da manhã."
+        spans = self.identifier.detect_spans(text)
+        self.assertEqual([language for _, _, language in spans], ['en', 'pt'])
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(text))
+        self.assertTrue(self.identifier.is_mixed(text))
+    
+    def test_is_mixed_monolingual(self):
+        """Test monolingual text is not flagged as mixed"""
+        self.assertFalse(self.identifier.is_mixed("Bom dia. Tudo bem com você? Vamos almoçar hoje."))
+    
+    def test_pick_translation(self):
+        """Test automatic translation direction"""
+        self.assertEqual(self.identifier.pick_translation("Thank you for the help"), 'translate_pt')
+        self.assertEqual(self.identifier.pick_translation("Obrigado pela ajuda de ontem"), 'translate_en')
+    
+    def test_dominant_language(self):
+        """Test confident monolingual detection"""
+        self.assertEqual(self.identifier.dominant_language("I will be late for the meeting today"), 'en')
+        self.assertIsNone(self.identifier.dominant_language("ok"))
+
+
+if __name__ == '__main__':
+    unittest.main()
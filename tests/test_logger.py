@@ -0,0 +1,118 @@
+"""
+Tests for the queued Logger
+"""
+import unittest
+import tempfile
+import shutil
+import gzip
+import logging
+import io
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.config import Config
+from src.logger import Logger
+
+
+class _Exploding:
+    """Fails the test if it is ever formatted"""
+
+    def __str__(self):
+        raise AssertionError("message formatted for a disabled level")
+
+    __repr__ = __str__
+
+
+class TestLogger(unittest.TestCase):
+    """Test cases for Logger"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.temp_dir, 'logs', 'app.log')
+        self.config = Config(os.path.join(self.temp_dir, 'config.ini'))
+        self.config.set('LOGGING', 'file', self.log_file)
+        self.logger = None
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if self.logger:
+            self.logger.close()
+            self.logger.get_logger().handlers.clear()
+        shutil.rmtree(self.temp_dir)
+
+    def _make_logger(self, **logging_values):
+        for key, value in logging_values.items():
+            self.config.set('LOGGING', key, value)
+        self.logger = Logger(self.config)
+        self.logger.set_console(False)
+        return self.logger
+
+    def _read_log(self):
+        with open(self.log_file, encoding='utf-8') as f:
+            return f.read()
+
+    def test_records_reach_file_through_listener(self):
+        """Records are formatted with their args and written by the listener"""
+        logger = self._make_logger()
+        logger.info("Processed %s in %.0f ms", 'shorten', 12.4)
+        logger.close()
+
+        content = self._read_log()
+        self.assertIn("INFO - Processed shorten in 12 ms", content)
+
+    def test_disabled_level_is_not_formatted(self):
+        """Arguments of filtered-out records are never formatted"""
+        logger = self._make_logger(level='INFO')
+        logger.debug("Masked %s spans", _Exploding())
+        self.assertFalse(logger.is_enabled_for(logging.DEBUG))
+        logger.close()
+
+        self.assertNotIn("Masked", self._read_log())
+
+    def test_exception_text_is_kept(self):
+        """Tracebacks are rendered in the caller, before queueing"""
+        logger = self._make_logger()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.get_logger().exception("Operation failed")
+        logger.close()
+
+        content = self._read_log()
+        self.assertIn("Operation failed", content)
+        self.assertIn("ValueError: boom", content)
+
+    def test_rotated_files_are_compressed(self):
+        """With compress enabled, rotated files are gzipped"""
+        logger = self._make_logger(max_size='200', backup_count='2', compress='true')
+        for i in range(20):
+            logger.info("line %d %s", i, 'x' * 40)
+        logger.close()
+
+        rotated = self.log_file + '.1.gz'
+        self.assertTrue(os.path.exists(rotated))
+        with gzip.open(rotated, 'rt', encoding='utf-8') as f:
+            self.assertIn("line", f.read())
+        self.assertFalse(os.path.exists(self.log_file + '.1'))
+
+    def test_console_can_be_dropped(self):
+        """set_console toggles the stderr handler without touching the file"""
+        stream = io.StringIO()
+        for enabled, message in ((True, "visible"), (False, "hidden")):
+            logger = self._make_logger()
+            logger._console_handler.setStream(stream)
+            logger.set_console(enabled)
+            logger.info(message)
+            logger.close()
+
+        self.assertIn("visible", stream.getvalue())
+        self.assertNotIn("hidden", stream.getvalue())
+        self.assertIn("hidden", self._read_log())
+
+
+if __name__ == '__main__':
+    unittest.main()
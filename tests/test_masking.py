@@ -0,0 +1,82 @@
+"""
+Tests for ProtectedSpanMasker class
+"""
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.masking import ProtectedSpanMasker, placeholder
+
+
+class TestProtectedSpanMasker(unittest.TestCase):
+    """Test cases for ProtectedSpanMasker"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.masker = ProtectedSpanMasker()
+    
+    def test_masks_urls_and_emails(self):
+        """Test URLs and e-mail addresses become placeholders"""
+        text = "Veja https://exemplo.com.br/docs?id=1. Dúvidas: suporte@exemplo.com.br."
+        masked, spans = self.masker.mask(text)
+        self.assertEqual(spans, ["https://exemplo.com.br/docs?id=1", "suporte@exemplo.com.br"])
+        self.assertEqual(masked, f"Veja {placeholder(0)}. Dúvidas: {placeholder(1)}.")
+    
+    def test_masks_code(self):
+        """Test fenced and inline code"""
+        text = "Rode `pip install x` e depois:\n\n```python\nprint('oi')\n```\n\nPronto."
+        masked, spans = self.masker.mask(text)
+        self.assertEqual(spans, ["`pip install x`", "```python\nprint('oi')\n```"])
+        self.assertEqual(masked, f"Rode {placeholder(0)} e depois:\n\n{placeholder(1)}\n\nPronto.")
+    
+    def test_masks_stack_traces(self):
+        """Test Python and Java stack traces are masked whole"""
+        python_trace = (
+            'Traceback (most recent call last):\n'
+            '  File "app.py", line 3, in <module>\n'
+            '    main()\n'
+            'ValueError: valor inválido'
+        )
+        java_trace = (
+            'java.lang.NullPointerException: vazio\n'
+            '\tat com.exemplo.App.run(App.java:10)\n'
+            '\tat com.exemplo.App.main(App.java:3)'
+        )
+        text = f"Erro:\n{python_trace}\nE também:\n{java_trace}\nAjuda?"
+        masked, spans = self.masker.mask(text)
+        self.assertEqual(spans, [python_trace, java_trace])
+        self.assertEqual(masked, f"Erro:\n{placeholder(0)}\nE também:\n{placeholder(1)}\nAjuda?")
+    
+    def test_restore_roundtrip(self):
+        """Test restoring gives back the exact original"""
+        text = "Acesse www.site.com/a_b e `x = 1`; mande para a.b+c@d.org.\n```\nfoo\n```"
+        masked, spans = self.masker.mask(text)
+        self.assertEqual(len(spans), 4)
+        self.assertEqual(self.masker.restore(masked, spans), text)
+    
+    def test_missing_placeholders(self):
+        """Test validation reports dropped placeholders"""
+        masked, spans = self.masker.mask("Links: https://a.com e https://b.com")
+        expected = self.masker.placeholders_in(masked)
+        self.assertEqual(expected, [0, 1])
+        self.assertEqual(self.masker.missing(f"Links: {placeholder(1)}", expected), [0])
+        self.assertEqual(self.masker.missing(masked, expected), [])
+    
+    def test_placeholder_only(self):
+        """Test detection of chunks that hold only placeholders"""
+        self.assertTrue(self.masker.is_placeholder_only(f" {placeholder(0)}\n{placeholder(1)} "))
+        self.assertFalse(self.masker.is_placeholder_only(f"Veja {placeholder(0)}"))
+        self.assertFalse(self.masker.is_placeholder_only("   "))
+    
+    def test_plain_text_untouched(self):
+        """Test text without protected spans and text with brackets"""
+        self.assertEqual(self.masker.mask("Texto comum, sem links."), ("Texto comum, sem links.", []))
+        text = f"Já tem {placeholder(0)} e https://a.com"
+        self.assertEqual(self.masker.mask(text), (text, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
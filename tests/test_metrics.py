@@ -0,0 +1,183 @@
+"""
+Tests for the metrics registry
+"""
+import unittest
+from unittest.mock import Mock
+import tempfile
+import shutil
+import threading
+import urllib.request
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.config import Config
+from src.ia_client import AIClient
+from src.metrics import (API_RETRIES, OPERATIONS, RATE_LIMITED, TOKENS, MetricsRegistry,
+                         MetricsServer)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for MetricsRegistry and the metric types"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.registry = MetricsRegistry()
+
+    def test_counter_from_many_threads(self):
+        """Striped counters do not lose updates"""
+        counter = self.registry.counter('test_total', 'Test counter', ('operation',))
+
+        def work():
+            for _ in range(5000):
+                counter.inc('shorten')
+            counter.inc('improve', amount=2)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(counter.value('shorten'), 40000)
+        self.assertEqual(counter.value('improve'), 16)
+        self.assertIn('test_total{operation="shorten"} 40000', self.registry.render())
+
+    def test_threads_use_different_stripes(self):
+        """Concurrent threads spread over the lock stripes"""
+        counter = self.registry.counter('stripes_total', 'Test counter')
+        stripes = []
+        barrier = threading.Barrier(2)
+
+        def work():
+            barrier.wait()  # Both threads alive at once
+            stripes.append(counter._stripe())
+            counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(stripes)), 2)
+        self.assertEqual(sum(1 for stripe in counter._stripes if stripe), 2)
+
+    def test_histogram_buckets(self):
+        """Buckets are cumulative and include the +Inf bucket"""
+        histogram = self.registry.histogram('test_seconds', 'Test histogram', ('operation',), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, 'shorten')
+
+        text = self.registry.render()
+        self.assertIn('# TYPE test_seconds histogram', text)
+        self.assertIn('test_seconds_bucket{operation="shorten",le="0.1"} 2', text)
+        self.assertIn('test_seconds_bucket{operation="shorten",le="1.0"} 3', text)
+        self.assertIn('test_seconds_bucket{operation="shorten",le="+Inf"} 4', text)
+        self.assertIn('test_seconds_sum{operation="shorten"} 3.650000', text)
+        self.assertIn('test_seconds_count{operation="shorten"} 4', text)
+
+    def test_gauge_and_labels(self):
+        """Gauges go up and down; label values are escaped; label count is checked"""
+        gauge = self.registry.gauge('test_depth', 'Test gauge', ('component',))
+        gauge.inc('da"emon')
+        gauge.inc('da"emon')
+        gauge.dec('da"emon')
+        self.assertIn('test_depth{component="da\\"emon"} 1', self.registry.render())
+        with self.assertRaises(ValueError):
+            gauge.set(1)
+
+    def test_register_twice(self):
+        """The same name gives the same metric; a different type is refused"""
+        first = self.registry.counter('test_total', 'Test counter')
+        self.assertIs(self.registry.counter('test_total', 'Test counter'), first)
+        with self.assertRaises(ValueError):
+            self.registry.gauge('test_total', 'Test gauge')
+
+    def test_dump_and_serve(self):
+        """The registry can be written to a file and served over HTTP"""
+        self.registry.counter('test_total', 'Test counter').inc()
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'metrics', 'text_helper.prom')
+            self.registry.dump(path)
+            with open(path, encoding='utf-8') as f:
+                self.assertIn('test_total 1', f.read())
+            self.assertEqual(os.listdir(os.path.dirname(path)), ['text_helper.prom'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+        server = MetricsServer(self.registry, port=0)
+        server.start()
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/metrics', timeout=5) as response:
+                self.assertIn('test_total 1', response.read().decode('utf-8'))
+        finally:
+            server.stop()
+
+
+class TestClientMetrics(unittest.TestCase):
+    """AIClient reports operations, tokens, retries and 429s"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        config = Config(os.path.join(self.temp_dir, 'config.ini'))
+        config.set('DEFAULT', 'openai_api_key', 'sk-test')
+        config.set('SIMILARITY', 'enabled', 'false')
+        config.set('USAGE', 'file', os.path.join(self.temp_dir, 'usage.db'))
+        self.client = Mock()
+        self.ai_client = AIClient(config, Mock())
+        self.ai_client._get_client = lambda: self.client
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.ai_client.usage.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _rate_limit_error(self):
+        """Shaped like the SDK's APIStatusError for a 429"""
+        error = Exception("Rate limit reached")
+        error.status_code = 429
+        error.response = Mock(headers={'retry-after': '0'})
+        return error
+
+    def test_retries_and_rate_limits_are_counted(self):
+        """A 429 is retried and counted; usage tokens are recorded"""
+        reply = Mock()
+        reply.choices = [Mock()]
+        reply.choices[0].message.content = "Texto curto."
+        reply.usage.prompt_tokens = 30
+        reply.usage.completion_tokens = 5
+        self.client.chat.completions.create.side_effect = [self._rate_limit_error(), reply]
+
+        retries = API_RETRIES.value('rate_limit')
+        limited = RATE_LIMITED.value('api')
+        ok = OPERATIONS.value('shorten', 'ok')
+        tokens_out = TOKENS.value('gpt-3.5-turbo', 'out')
+
+        result = self.ai_client.process_text("Um texto um pouco mais longo para encurtar.", 'shorten')
+
+        self.assertEqual(result, "Texto curto.")
+        self.assertEqual(self.client.chat.completions.create.call_count, 2)
+        self.assertEqual(API_RETRIES.value('rate_limit'), retries + 1)
+        self.assertEqual(RATE_LIMITED.value('api'), limited + 1)
+        self.assertEqual(OPERATIONS.value('shorten', 'ok'), ok + 1)
+        self.assertEqual(TOKENS.value('gpt-3.5-turbo', 'out'), tokens_out + 5)
+
+    def test_errors_are_not_retried(self):
+        """Non-transient failures fail at once and count as errors"""
+        self.client.chat.completions.create.side_effect = Exception("authentication failed")
+        errors = OPERATIONS.value('shorten', 'error')
+
+        with self.assertRaises(Exception):
+            self.ai_client.process_text("Um texto um pouco mais longo para encurtar.", 'shorten')
+
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+        self.assertEqual(OPERATIONS.value('shorten', 'error'), errors + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
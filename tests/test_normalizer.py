@@ -0,0 +1,84 @@
+"""
+Tests for TextNormalizer class
+"""
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.normalizer import TextNormalizer
+
+
+class TestTextNormalizer(unittest.TestCase):
+    """Test cases for TextNormalizer"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.normalizer = TextNormalizer()
+    
+    def test_preserves_paragraphs(self):
+        """Test paragraphs survive and blank lines are collapsed"""
+        text = "Primeiro   parágrafo.  \n\n\n\nSegundo parágrafo.\nMesma linha lógica."
+        self.assertEqual(
+            self.normalizer.normalize(text),
+            "Primeiro parágrafo.\n\nSegundo parágrafo.\nMesma linha lógica."
+        )
+    
+    def test_preserves_list_indentation(self):
+        """Test nested list items keep their indentation"""
+        text = "Tarefas:\n  - revisar\n    - orçamento\n   texto recuado"
+        self.assertEqual(
+            self.normalizer.normalize(text),
+            "Tarefas:\n  - revisar\n    - orçamento\ntexto recuado"
+        )
+    
+    def test_strips_control_and_zero_width(self):
+        """Test control and zero-width characters are removed"""
+        text = "ze\u200bro\x00 lar\ufeffgura\x07"
+        self.assertEqual(self.normalizer.normalize(text), "zero largura")
+    
+    def test_unicode_spaces_and_line_endings(self):
+        """Test Unicode spaces and CR/CRLF line endings"""
+        text = "um\u00a0dois\u2003três\r\nquatro\rcinco"
+        self.assertEqual(self.normalizer.normalize(text), "um dois três\nquatro\ncinco")
+    
+    def test_nfc(self):
+        """Test decomposed characters are composed"""
+        self.assertEqual(self.normalizer.normalize("cafe\u0301"), "caf\u00e9")
+    
+    def test_empty(self):
+        """Test empty input"""
+        self.assertEqual(self.normalizer.normalize(""), "")
+        self.assertEqual(self.normalizer.normalize_with_offsets("")[0], "")
+    
+    def test_offsets_match_normalize(self):
+        """Test the offset-tracking path produces the same text"""
+        text = "  Título\r\n\r\n\r\nTexto   com\u200b ruído.\n  - item\tum\n\n\nfim  "
+        normalized, _ = self.normalizer.normalize_with_offsets(text)
+        self.assertEqual(normalized, self.normalizer.normalize(text))
+    
+    def test_offsets_point_to_original(self):
+        """Test offsets map normalized positions back to the original text"""
+        text = "  Olá   mundo\u200b!\n\n\n\nNovo parágrafo"
+        normalized, offsets = self.normalizer.normalize_with_offsets(text)
+        self.assertEqual(len(offsets), len(normalized) + 1)
+        self.assertEqual(offsets[len(normalized)], len(text))
+        for i, char in enumerate(normalized):
+            if not char.isspace():
+                self.assertEqual(text[offsets[i]], char)
+        start = normalized.index("mundo")
+        original_start, original_end = offsets.span(start, start + len("mundo"))
+        self.assertEqual(text[original_start:original_end], "mundo")
+    
+    def test_offsets_with_composed_characters(self):
+        """Test offsets around NFC composition"""
+        text = "cafe\u0301 bom"
+        normalized, offsets = self.normalizer.normalize_with_offsets(text)
+        self.assertEqual(normalized, "caf\u00e9 bom")
+        self.assertEqual(text[offsets[normalized.index("bom")]:], "bom")
+
+
+if __name__ == '__main__':
+    unittest.main()
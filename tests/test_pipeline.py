@@ -0,0 +1,117 @@
+"""
+Tests for the streaming file pipeline
+"""
+import unittest
+from unittest.mock import Mock
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.langid import LanguageIdentifier
+from src.pipeline import FilePipeline
+from src.text_processor import TextProcessor
+
+
+class TestFilePipeline(unittest.TestCase):
+    """Test cases for FilePipeline"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.temp_dir, 'entrada.txt')
+        self.output_path = os.path.join(self.temp_dir, 'saida.txt')
+        self.mock_logger = Mock()
+        self.processor = TextProcessor(self.mock_logger)
+        self.ai_client = Mock()
+        self.ai_client.process_text.side_effect = lambda text, operation: text.upper()
+        
+        paragraphs = [f"Parágrafo número {i} com   algumas palavras de teste." for i in range(40)]
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            f.write('\n\n\n'.join(paragraphs))
+        self.expected = '\n\n'.join(p.replace('   ', ' ').upper() for p in paragraphs)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _pipeline(self, **kwargs):
+        """Build a pipeline with small chunks and blocks"""
+        options = {'chunk_tokens': 40, 'max_in_flight': 3, 'block_size': 64}
+        options.update(kwargs)
+        return FilePipeline(self.ai_client, self.processor, self.mock_logger, **options)
+    
+    def _read_output(self):
+        """Read the output file"""
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def test_run(self):
+        """Test the whole file is processed in order"""
+        stats = self._pipeline().run(self.input_path, self.output_path, 'shorten')
+        
+        self.assertEqual(self._read_output(), self.expected)
+        self.assertGreater(stats['chunks'], 1)
+        self.assertEqual(stats['resumed'], 0)
+        self.assertFalse(os.path.exists(self.output_path + '.journal'))
+    
+    def test_read_blocks_multibyte_boundaries(self):
+        """Test blocks never split multi-byte characters"""
+        blocks = list(self._pipeline(block_size=7).read_blocks(self.input_path))
+        with open(self.input_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(''.join(blocks), f.read())
+    
+    def test_chunks_respect_token_limit(self):
+        """Test chunks stay under the token limit"""
+        pipeline = self._pipeline()
+        for chunk in pipeline.segment(pipeline.normalize(pipeline.read_blocks(self.input_path))):
+            self.assertLessEqual(self.processor.count_tokens(chunk), 40 + 2)
+    
+    def test_resume_after_crash(self):
+        """Test a crashed run resumes from the last completed chunk"""
+        calls = {'count': 0}
+        
+        def flaky(text, operation):
+            calls['count'] += 1
+            if calls['count'] == 4:
+                raise Exception("falha simulada")
+            return text.upper()
+        
+        self.ai_client.process_text.side_effect = flaky
+        with self.assertRaises(Exception):
+            self._pipeline(max_in_flight=1).run(self.input_path, self.output_path, 'shorten')
+        self.assertTrue(os.path.exists(self.output_path + '.journal'))
+        
+        self.ai_client.process_text.side_effect = lambda text, operation: text.upper()
+        stats = self._pipeline().run(self.input_path, self.output_path, 'shorten')
+        
+        self.assertEqual(stats['resumed'], 3)
+        self.assertEqual(self._read_output(), self.expected)
+    
+    def test_mixed_chunks_are_always_translated(self):
+        """Test a chunk mixing languages bypasses the same-language skip"""
+        self.ai_client.language_identifier = LanguageIdentifier()
+        self.ai_client.process_text.side_effect = lambda text, operation, **kwargs: text
+        mixed = "The meeting is tomorrow. A reunião é amanhã às dez horas da manhã."
+        english = "The meeting is tomorrow at ten in the morning, in the usual room."
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            f.write(f"{mixed}\n\n{english}")
+        self._pipeline(chunk_tokens=30).run(self.input_path, self.output_path, 'translate_en')
+        
+        calls = {call.args[0]: call.kwargs for call in self.ai_client.process_text.call_args_list}
+        self.assertEqual(calls[mixed], {'skip_same_language': False})
+        self.assertEqual(calls[english], {})
+    
+    def test_empty_file(self):
+        """Test an empty input produces an empty output"""
+        open(self.input_path, 'w').close()
+        stats = self._pipeline().run(self.input_path, self.output_path, 'shorten')
+        self.assertEqual(stats['chunks'], 0)
+        self.assertEqual(self._read_output(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests for the opt-in profiler
+"""
+import unittest
+from unittest.mock import Mock, patch
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.profiling import PROFILE_ENV, Profiler, format_report, latest_session, profiling_enabled
+from src.ui.dispatcher import UIDispatcher
+
+
+def busy_function(n):
+    """Something for cProfile to see"""
+    return sum(i * i for i in range(n))
+
+
+class Worker:
+    """Object with a method to instrument"""
+
+    def run(self, n):
+        return busy_function(n)
+
+    def stream(self, n):
+        for i in range(3):
+            yield self.run(n + i)
+
+
+class TestProfiler(unittest.TestCase):
+    """Test cases for Profiler"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_instrument_and_report(self):
+        """Captured calls and memory snapshots end up in the session report"""
+        profiler = Profiler(self.temp_dir, memory_interval=3600)
+        profiler.start()
+        worker = Worker()
+        original = worker.run
+        profiler.instrument(worker, 'run')
+        self.assertNotEqual(worker.run, original)
+
+        self.assertEqual(worker.run(1000), busy_function(1000))
+        profiler.snapshot_memory()
+        summary = profiler.stop()
+
+        self.assertEqual(worker.run, original)
+        self.assertEqual(summary['captured'], 1)
+        self.assertEqual(summary['snapshots'], 2)  # One more on stop
+        self.assertTrue(os.path.exists(os.path.join(summary['dir'], 'cpu.prof')))
+
+        self.assertEqual(latest_session(self.temp_dir), summary['dir'])
+        report = format_report(summary['dir'], top=10)
+        self.assertIn("busy_function", report)
+        self.assertIn("maiores pontos de alocação", report)
+        self.assertIn("maior crescimento", report)
+
+    def test_generator_is_profiled_to_the_end(self):
+        """A generator is captured once, across all its steps"""
+        profiler = Profiler(self.temp_dir, memory_interval=0)
+        profiler.start()
+        worker = Worker()
+        profiler.instrument(worker, 'run')
+        profiler.instrument(worker, 'stream')
+
+        self.assertEqual(list(worker.stream(100)), [busy_function(n) for n in (100, 101, 102)])
+        summary = profiler.stop()
+        self.assertEqual((summary['captured'], summary['skipped']), (1, 0))
+        report = format_report(summary['dir'], top=10)
+        self.assertIn("stream", report)
+        self.assertIn("busy_function", report)
+
+    def test_instrument_tk_skips_internal_ticks(self):
+        """The dispatcher tick is not wrapped; the callbacks it runs are"""
+        import tkinter
+        profiler = Profiler(self.temp_dir, memory_interval=0)
+        profiler.start()
+        original_after, original_post = tkinter.Misc.after, UIDispatcher.post
+        with patch.object(tkinter.Misc, 'after', Mock(return_value='after#1')) as fake_after:
+            profiler.instrument_tk()
+            root = Mock()
+            dispatcher = UIDispatcher(root)
+            tkinter.Misc.after(root, 16, dispatcher._tick)
+            self.assertEqual(fake_after.call_args.args[2], dispatcher._tick)
+            tkinter.Misc.after(root, 0, busy_function)
+            self.assertIsNot(fake_after.call_args.args[2], busy_function)
+
+            results = []
+            dispatcher.post(lambda: results.append(busy_function(1000)))
+            dispatcher.drain()
+            self.assertEqual(results, [busy_function(1000)])
+            self.assertEqual(profiler.captured, 1)
+            profiler.stop()
+            self.assertIs(UIDispatcher.post, original_post)
+        self.assertIs(tkinter.Misc.after, original_after)
+
+    def test_empty_session_is_not_latest(self):
+        """A session that captured nothing is skipped by latest_session"""
+        Profiler(self.temp_dir, memory_interval=0).start()
+        self.assertIsNone(latest_session(self.temp_dir))
+
+    def test_enabled_switch(self):
+        """TEXT_HELPER_PROFILE overrides the config value"""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(PROFILE_ENV, None)
+            self.assertFalse(profiling_enabled(False))
+            self.assertTrue(profiling_enabled(True))
+            os.environ[PROFILE_ENV] = '1'
+            self.assertTrue(profiling_enabled(False))
+            os.environ[PROFILE_ENV] = '0'
+            self.assertFalse(profiling_enabled(True))
+
+
+if __name__ == '__main__':
+    unittest.main()
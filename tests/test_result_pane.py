@@ -0,0 +1,101 @@
+"""
+Tests for the frame-coalesced result stream buffer
+"""
+import unittest
+import threading
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.ui.result_pane import StreamBuffer
+
+
+class TestStreamBuffer(unittest.TestCase):
+    """Test cases for StreamBuffer"""
+
+    def test_one_drain_per_burst(self):
+        """Only the first delta of a burst asks for a drain"""
+        buffer = StreamBuffer()
+        requests = [buffer.push(f"token{i} ") for i in range(1000)]
+        self.assertEqual(requests.count(True), 1)
+        self.assertTrue(requests[0])
+
+        reset, text, more = buffer.take()
+        self.assertFalse(reset)
+        self.assertFalse(more)
+        self.assertEqual(text, ''.join(f"token{i} " for i in range(1000)))
+        self.assertTrue(buffer.push("next"))
+
+    def test_large_reply_is_chunked(self):
+        """A long backlog is spread over frames of max_chars"""
+        buffer = StreamBuffer(max_chars=16384)
+        reply = ''.join(f"linha {i} do resultado\n" for i in range(5000))
+        self.assertGreater(len(reply), 100000)
+        buffer.push(reply)
+
+        frames = []
+        more = True
+        while more:
+            _, text, more = buffer.take()
+            self.assertLessEqual(len(text), 16384)
+            frames.append(text)
+        self.assertEqual(''.join(frames), reply)
+        self.assertEqual(len(frames), -(-len(reply) // 16384))
+
+    def test_clear_drops_earlier_text(self):
+        """A reset discards what was queued and the pending backlog"""
+        buffer = StreamBuffer(max_chars=4)
+        buffer.push("resposta antiga")
+        buffer.take()
+        buffer.push("mais")
+        buffer.clear()
+        buffer.push("nova")
+        self.assertEqual(buffer.take(), (True, "nova", False))
+
+    def test_concurrent_producers(self):
+        """Deltas from many threads all arrive, with few drains"""
+        buffer = StreamBuffer()
+        wakeups = threading.Semaphore(0)
+        producers, per_thread = 8, 2000
+        done = threading.Event()
+        received = []
+        drains = [0]
+
+        def produce(n):
+            for i in range(per_thread):
+                if buffer.push(f"{n}:{i};"):
+                    wakeups.release()
+
+        def consume():
+            # Plays the Tk thread: drains when asked, then again while more is pending
+            while not done.is_set() or buffer._items or buffer._backlog:
+                if not wakeups.acquire(timeout=0.05):
+                    continue
+                more = True
+                while more:
+                    _, text, more = buffer.take()
+                    received.append(text)
+                    drains[0] += 1
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(producers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        consumer.join(timeout=10)
+
+        pieces = [piece for piece in ''.join(received).split(';') if piece]
+        self.assertEqual(len(pieces), producers * per_thread)
+        for n in range(producers):
+            ours = [int(piece.split(':')[1]) for piece in pieces if piece.startswith(f"{n}:")]
+            self.assertEqual(ours, list(range(per_thread)))
+        self.assertLess(drains[0], producers * per_thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for SentenceSegmenter class
+"""
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.segmenter import SentenceSegmenter
+
+
+class TestSentenceSegmenter(unittest.TestCase):
+    """Test cases for SentenceSegmenter"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.segmenter = SentenceSegmenter()
+    
+    def sentences(self, text):
+        """Sentences of text as strings"""
+        return [text[start:end] for start, end in self.segmenter.sentences(text)]
+    
+    def test_basic_sentences(self):
+        """Test splitting at terminal punctuation"""
+        self.assertEqual(
+            self.sentences("Bom dia. Tudo bem? Que ótimo! Até logo..."),
+            ["Bom dia.", "Tudo bem?", "Que ótimo!", "Até logo..."]
+        )
+    
+    def test_abbreviations(self):
+        """Test pt-BR abbreviations do not end sentences"""
+        text = "O Sr. Almeida e a Dra. Silva chegaram. Leve frutas, p.ex. Maçãs. Fim."
+        self.assertEqual(
+            self.sentences(text),
+            ["O Sr. Almeida e a Dra. Silva chegaram.", "Leve frutas, p.ex. Maçãs.", "Fim."]
+        )
+    
+    def test_lowercase_continuation(self):
+        """Test a lower-case word after a period continues the sentence"""
+        text = "Comprei pão, leite etc. e voltei. Depois dormi."
+        self.assertEqual(self.sentences(text), ["Comprei pão, leite etc. e voltei.", "Depois dormi."])
+    
+    def test_initials_and_numbers(self):
+        """Test initials and decimal numbers"""
+        text = "Assinado por J. Silva. Custa 3.50 reais. Fim."
+        self.assertEqual(self.sentences(text), ["Assinado por J. Silva.", "Custa 3.50 reais.", "Fim."])
+    
+    def test_closing_quotes(self):
+        """Test closing quotes stay with their sentence"""
+        text = 'Ele disse: "Vou sair." Depois saiu.'
+        self.assertEqual(self.sentences(text), ['Ele disse: "Vou sair."', "Depois saiu."])
+    
+    def test_sentences_do_not_cross_paragraphs(self):
+        """Test blank lines end sentences"""
+        text = "Título sem ponto\n\nPrimeira frase. Segunda frase"
+        self.assertEqual(self.sentences(text), ["Título sem ponto", "Primeira frase.", "Segunda frase"])
+    
+    def test_offsets_are_exact(self):
+        """Test spans point into the original string without whitespace"""
+        text = "  Olá.   Tudo bem?  \n\n\n  Sim.  "
+        spans = list(self.segmenter.sentences(text))
+        self.assertEqual(spans, [(2, 6), (9, 18), (25, 29)])
+        for start, end in spans:
+            self.assertEqual(text[start:end], text[start:end].strip())
+    
+    def test_range(self):
+        """Test segmenting part of a string"""
+        text = "Antes. Meio um. Meio dois. Depois."
+        start = text.index("Meio")
+        end = text.index(" Depois")
+        self.assertEqual(
+            [text[s:e] for s, e in self.segmenter.sentences(text, start, end)],
+            ["Meio um.", "Meio dois."]
+        )
+    
+    def test_paragraphs(self):
+        """Test paragraph spans"""
+        text = "Um.\nAinda um.\n\n  \nDois.\n\n"
+        self.assertEqual(
+            [text[start:end] for start, end in self.segmenter.paragraphs(text)],
+            ["Um.\nAinda um.", "Dois."]
+        )
+    
+    def test_lazy(self):
+        """Test segments are produced lazily"""
+        iterator = self.segmenter.sentences("Um. Dois. " * 100000)
+        self.assertEqual(next(iterator), (0, 3))
+    
+    def test_custom_abbreviations(self):
+        """Test a custom abbreviation index"""
+        segmenter = SentenceSegmenter(abbreviations=['Aprox.'])
+        text = "Aprox. Cem pessoas. Sr. Silva veio."
+        self.assertEqual(
+            [text[s:e] for s, e in segmenter.sentences(text)],
+            ["Aprox. Cem pessoas.", "Sr.", "Silva veio."]
+        )
+    
+    def test_empty(self):
+        """Test empty and blank input"""
+        self.assertEqual(list(self.segmenter.sentences("")), [])
+        self.assertEqual(list(self.segmenter.paragraphs("  \n\n ")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Tests for the local HTTP API
+"""
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.server import TextHelperServer
+from src.text_processor import TextProcessor
+
+
+class TestTextHelperServer(unittest.TestCase):
+    """Test cases for TextHelperServer"""
+    
+    def setUp(self):
+        """Start a server on a free port"""
+        self.config = Mock()
+        self.config.get_compaction_config.return_value = {'enabled': False, 'restore_stripped': False}
+        self.config.get_openai_config.return_value = {'model': 'gpt-3.5-turbo'}
+        self.config.get_max_input_tokens.return_value = 4000
+        self.ai_client = Mock()
+        self.ai_client.similarity_cache = None
+        self.ai_client.get_system_prompts.return_value = {'shorten': '', 'improve': ''}
+        self.ai_client.process_text.side_effect = lambda text, op: f"{op}: {text}"
+        self.ai_client.stream_text.side_effect = lambda text, op: iter([text[:3], text[3:9], text[9:]])
+        
+        self.server = TextHelperServer(
+            self.config, self.ai_client, TextProcessor(Mock()), Mock(),
+            port=0, max_concurrency=2, max_queue=1
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.assertTrue(self.server.ready.wait(5))
+    
+    def tearDown(self):
+        """Stop the server"""
+        self.server.stop()
+        self.thread.join(5)
+    
+    def _connection(self):
+        """Open a keep-alive connection"""
+        return http.client.HTTPConnection('127.0.0.1', self.server.port, timeout=5)
+    
+    def _post(self, connection, path, payload):
+        """POST JSON and decode the response"""
+        connection.request('POST', path, json.dumps(payload), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    
+    def test_operation_keep_alive(self):
+        """Test several requests over one connection"""
+        connection = self._connection()
+        for i in range(3):
+            status, body = self._post(connection, '/v1/shorten', {'text': f"Texto número {i}."})
+            self.assertEqual(status, 200)
+            self.assertEqual(body['result'], f"shorten: Texto número {i}.")
+        connection.close()
+    
+    def test_errors(self):
+        """Test unknown operations, bad bodies and invalid text"""
+        connection = self._connection()
+        self.assertEqual(self._post(connection, '/v1/bogus', {'text': "Texto válido."})[0], 404)
+        self.assertEqual(self._post(connection, '/v1/shorten', {'texto': "x"})[0], 400)
+        self.assertEqual(self._post(connection, '/v1/shorten', {'text': "x"})[0], 422)
+        self.ai_client.process_text.side_effect = Exception("Erro de autenticação")
+        self.assertEqual(self._post(connection, '/v1/shorten', {'text': "Texto válido."})[0], 502)
+        connection.request('GET', '/v1/shorten')
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 405)
+    
+    def test_stream(self):
+        """Test server-sent events carry the deltas and the final result"""
+        connection = self._connection()
+        connection.request('POST', '/v1/improve?stream=1', json.dumps({'text': "Um texto curto."}))
+        response = connection.getresponse()
+        self.assertEqual(response.getheader('Content-Type'), 'text/event-stream; charset=utf-8')
+        events = [
+            (block.split('\n')[0][len('event: '):], json.loads(block.split('\n')[1][len('data: '):]))
+            for block in response.read().decode('utf-8').strip().split('\n\n')
+        ]
+        self.assertEqual([data['text'] for kind, data in events if kind == 'delta'], ["Um ", "texto ", "curto."])
+        self.assertEqual(events[-1], ('done', {'operation': 'improve', 'result': "Um texto curto."}))
+    
+    def test_batch(self):
+        """Test batches keep order and process duplicates once"""
+        status, body = self._post(self._connection(), '/v1/batch', {
+            'operation': 'shorten',
+            'requests': [
+                {'id': 'a', 'text': "Primeiro texto."},
+                {'id': 'b', 'text': "Primeiro texto."},
+                {'id': 'c', 'text': "Segundo texto.", 'operation': 'improve'},
+                {'id': 'd', 'text': "x"}
+            ]
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual([r['id'] for r in body['results']], ['a', 'b', 'c', 'd'])
+        self.assertEqual(body['results'][1]['result'], "shorten: Primeiro texto.")
+        self.assertEqual(body['results'][2]['result'], "improve: Segundo texto.")
+        self.assertEqual(body['results'][3]['status'], 422)
+        self.assertEqual(body['unique'], 3)
+        self.assertEqual(self.ai_client.process_text.call_count, 2)
+    
+    def test_concurrency_limit(self):
+        """Test requests beyond the slots and queue get 503"""
+        release = threading.Event()
+        
+        def slow(text, op):
+            release.wait(5)
+            return text
+        
+        self.ai_client.process_text.side_effect = slow
+        statuses = []
+        
+        def worker():
+            statuses.append(self._post(self._connection(), '/v1/shorten', {'text': "Texto lento."})[0])
+        
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        # 2 slots + 1 queued succeed, the rest are refused
+        self.assertEqual(sorted(statuses), [200, 200, 200, 503, 503])
+    
+    def test_metrics(self):
+        """Test the Prometheus endpoint counts requests"""
+        connection = self._connection()
+        self._post(connection, '/v1/shorten', {'text': "Texto número um."})
+        connection.request('GET', '/metrics')
+        response = connection.getresponse()
+        metrics = response.read().decode('utf-8')
+        self.assertEqual(response.status, 200)
+        self.assertIn('text_helper_requests_total{operation="shorten",status="200"} 1', metrics)
+        self.assertIn('text_helper_request_duration_seconds_count{operation="shorten"} 1', metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
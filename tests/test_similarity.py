@@ -0,0 +1,103 @@
+"""
+Tests for near-duplicate result reuse
+"""
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.similarity import NearDuplicateIndex, SimilarityCache, simhash, similarity
+
+
+TEMPLATE = (
+    "Olá {name}, tudo bem? Gostaria de confirmar nossa reunião do dia {date} às 14h "
+    "para discutir a proposta comercial do projeto de migração. Por favor, me avise "
+    "se o horário continua bom para você. Atenciosamente, Maria"
+)
+UNRELATED = (
+    "Segue o relatório financeiro do trimestre com os números atualizados de vendas "
+    "e custos operacionais. Qualquer dúvida estou à disposição para conversar amanhã."
+)
+
+
+class TestSimHash(unittest.TestCase):
+    """Test cases for SimHash fingerprints"""
+    
+    def test_identical_texts(self):
+        """Test identical texts have identical fingerprints"""
+        self.assertEqual(similarity(simhash(UNRELATED), simhash(UNRELATED)), 1.0)
+    
+    def test_template_variation_is_similar(self):
+        """Test a template with a different name and date stays similar"""
+        a = simhash(TEMPLATE.format(name="João", date="12/03"))
+        b = simhash(TEMPLATE.format(name="Pedro", date="15/04"))
+        self.assertGreaterEqual(similarity(a, b), 0.9)
+    
+    def test_unrelated_texts_differ(self):
+        """Test unrelated texts are not similar"""
+        a = simhash(TEMPLATE.format(name="João", date="12/03"))
+        self.assertLess(similarity(a, simhash(UNRELATED)), 0.8)
+    
+    def test_empty_text(self):
+        """Test empty text fingerprint"""
+        self.assertEqual(simhash(""), 0)
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    """Test cases for NearDuplicateIndex"""
+    
+    def test_lookup_near_duplicate(self):
+        """Test lookup returns the result of a near-duplicate input"""
+        index = NearDuplicateIndex()
+        index.add(TEMPLATE.format(name="João", date="12/03"), "resumo")
+        match = index.lookup(TEMPLATE.format(name="Pedro", date="15/04"))
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0], "resumo")
+        self.assertIsNone(index.lookup(UNRELATED))
+    
+    def test_capacity_eviction(self):
+        """Test the oldest entries are evicted"""
+        index = NearDuplicateIndex(capacity=1)
+        index.add(UNRELATED, "a")
+        index.add(TEMPLATE.format(name="João", date="12/03"), "b")
+        self.assertEqual(len(index), 1)
+        self.assertIsNone(index.lookup(UNRELATED))
+    
+    def test_stats(self):
+        """Test lookup statistics"""
+        index = NearDuplicateIndex()
+        index.add(UNRELATED, "a")
+        index.lookup(UNRELATED)
+        index.lookup(TEMPLATE)
+        stats = index.get_stats()
+        self.assertEqual(stats['lookups'], 2)
+        self.assertEqual(stats['hits'], 1)
+    
+    def test_invalid_bands(self):
+        """Test band count must divide the fingerprint"""
+        with self.assertRaises(ValueError):
+            NearDuplicateIndex(bands=7)
+
+
+class TestSimilarityCache(unittest.TestCase):
+    """Test cases for SimilarityCache"""
+    
+    def test_per_operation(self):
+        """Test results are isolated per operation"""
+        cache = SimilarityCache()
+        cache.store('summarize', UNRELATED, "resumo")
+        self.assertEqual(cache.lookup('summarize', UNRELATED)[0], "resumo")
+        self.assertIsNone(cache.lookup('shorten', UNRELATED))
+    
+    def test_is_safe(self):
+        """Test safe operations"""
+        cache = SimilarityCache()
+        self.assertTrue(cache.is_safe('analyze'))
+        self.assertTrue(cache.is_safe('summarize'))
+        self.assertFalse(cache.is_safe('translate_en'))
+
+
+if __name__ == '__main__':
+    unittest.main()
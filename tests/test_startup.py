@@ -0,0 +1,84 @@
+"""
+Tests for the startup path: import-time budget and the headless entry point
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Cumulative import time allowed for src.app (microseconds); openai alone
+# takes several hundred milliseconds, so a regression blows through this
+IMPORT_BUDGET_US = 300000
+
+# Modules that must only be imported on first use
+DEFERRED_MODULES = ('openai', 'tkinter', 'plyer', 'pyperclip', 'pynput')
+
+
+def _imported_modules(stderr: str) -> dict:
+    """Parse `-X importtime` output into {module: cumulative microseconds}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestStartup(unittest.TestCase):
+    """Test cases for lazy imports and --headless"""
+    
+    def setUp(self):
+        """Use a throwaway home so the user's config is never touched"""
+        self.home = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.home.name, '.text_helper_ia_config.ini'), 'w') as f:
+            f.write("[BACKENDS]\nemojify = local\n")
+        self.env = dict(os.environ, HOME=self.home.name)
+    
+    def tearDown(self):
+        """Remove the throwaway home"""
+        self.home.cleanup()
+    
+    def _run(self, args, stdin=''):
+        """Run python with -X importtime from the repository root"""
+        return subprocess.run(
+            [sys.executable, '-X', 'importtime'] + args,
+            input=stdin, capture_output=True, text=True, timeout=60, cwd=ROOT, env=self.env
+        )
+    
+    def test_import_budget(self):
+        """Test importing the app skips heavy modules and stays in budget"""
+        completed = self._run(['-c', 'import src.app'])
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        modules = _imported_modules(completed.stderr)
+        self.assertEqual([m for m in DEFERRED_MODULES if m in modules], [])
+        self.assertLess(modules['src.app'], IMPORT_BUDGET_US)
+    
+    def test_headless(self):
+        """Test --headless processes stdin to stdout without Tk or openai"""
+        completed = self._run(
+            [os.path.join(ROOT, 'text_helper_ia.py'), '--headless', 'emojify'],
+            "Estou muito feliz com o café de hoje."
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertTrue(completed.stdout.startswith("Estou muito feliz"))
+        modules = _imported_modules(completed.stderr)
+        self.assertEqual([m for m in DEFERRED_MODULES if m in modules], [])
+    
+    def test_headless_invalid_text(self):
+        """Test --headless reports invalid input on stderr"""
+        completed = self._run([os.path.join(ROOT, 'text_helper_ia.py'), '--headless', 'emojify'], "x")
+        self.assertEqual(completed.returncode, 1)
+        self.assertEqual(completed.stdout, "")
+        self.assertIn("Erro:", completed.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
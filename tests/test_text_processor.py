@@ -37,10 +37,29 @@ class TestTextProcessor(unittest.TestCase):
         self.assertFalse(self.processor.validate_text(short_text))
     
     def test_validate_text_too_long(self):
-        """Test text validation with text too long"""
-        long_text = "a" * 10001  # More than 10k characters
+        """Test text validation with text over the token limit"""
+        long_text = "palavra " * 5000  # More than the default 4000 tokens
         self.assertFalse(self.processor.validate_text(long_text))
     
+    def test_validate_text_model_limit(self):
+        """Test text validation with a per-model token limit"""
+        text = "Este é um texto válido para teste."
+        self.assertTrue(self.processor.validate_text(text, max_tokens=100))
+        self.assertFalse(self.processor.validate_text(text, max_tokens=3))
+    
+    def test_compact_text(self):
+        """Test compaction reports saved tokens and can be restored"""
+        text = "Pode ser amanhã.\n\n> Podemos nos reunir hoje?\n> Abraços, Carlos"
+        compaction = self.processor.compact_text(text)
+        self.assertEqual(compaction['text'], "Pode ser amanhã.")
+        self.assertGreater(compaction['tokens_saved'], 0)
+        self.assertEqual(
+            compaction['tokens_saved'],
+            compaction['original_tokens'] - compaction['compacted_tokens']
+        )
+        restored = self.processor.restore_compacted("Amanhã.", compaction)
+        self.assertTrue(restored.endswith("> Abraços, Carlos"))
+    
     def test_clean_text(self):
         """Test text cleaning functionality"""
         dirty_text = "  Este   é   um   texto   com   espaços   extras.  \n\n\n"
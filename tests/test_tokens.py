@@ -0,0 +1,101 @@
+"""
+Tests for token counting and preflight budgeting
+"""
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.tokens import TokenBudget, TokenCounter, TokenRateLimiter
+
+
+class TestTokenCounter(unittest.TestCase):
+    """Test cases for TokenCounter"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.counter = TokenCounter()
+    
+    def test_count_empty(self):
+        """Test counting empty text"""
+        self.assertEqual(self.counter.count(""), 0)
+    
+    def test_estimate(self):
+        """Test the calibrated estimator"""
+        counter = TokenCounter(chars_per_token=4.0)
+        # "olá" -> 1, "mundo" -> 2, "!" -> 1
+        self.assertEqual(counter.estimate("olá mundo!"), 4)
+    
+    def test_count_is_memoized(self):
+        """Test counts are cached per text hash"""
+        text = "Texto de teste para contagem de tokens."
+        first = self.counter.count(text)
+        with patch.object(self.counter, 'estimate', side_effect=AssertionError("not cached")):
+            self.counter._encoding = None
+            self.assertEqual(self.counter.count(text), first)
+    
+    def test_cache_is_bounded(self):
+        """Test the memo cache size limit"""
+        counter = TokenCounter(cache_size=2)
+        for text in ("um", "dois", "três"):
+            counter.count(text)
+        self.assertEqual(len(counter._cache), 2)
+    
+    def test_count_grows_with_text(self):
+        """Test longer text has more tokens"""
+        self.assertGreater(self.counter.count("palavra " * 100), self.counter.count("palavra " * 10))
+
+
+class TestTokenBudget(unittest.TestCase):
+    """Test cases for TokenBudget"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.budget = TokenBudget(TokenCounter())
+    
+    def test_preflight_fits(self):
+        """Test preflight for a short text"""
+        result = self.budget.preflight("Um texto curto.", 'gpt-3.5-turbo', 300, "Sistema", "{text}", 4000)
+        self.assertTrue(result['fits'])
+        self.assertFalse(result['needs_chunking'])
+        self.assertEqual(result['chunks'], 1)
+        self.assertEqual(result['max_input_tokens'], 4000)
+        self.assertGreater(result['prompt_tokens'], result['input_tokens'])
+        self.assertGreater(result['estimated_cost'], 0)
+    
+    def test_preflight_needs_chunking(self):
+        """Test preflight over the configured input limit"""
+        result = self.budget.preflight("palavra " * 500, 'gpt-3.5-turbo', 300, max_input_tokens=100)
+        self.assertTrue(result['needs_chunking'])
+        self.assertGreater(result['chunks'], 1)
+    
+    def test_preflight_context_window(self):
+        """Test the input limit is capped by the context window"""
+        result = self.budget.preflight("texto", 'gpt-4', 8000, max_input_tokens=4000)
+        self.assertLess(result['max_input_tokens'], 4000)
+    
+    def test_unknown_model_defaults(self):
+        """Test limits for unknown models"""
+        self.assertIn('context_window', TokenBudget.get_model_limits('modelo-desconhecido'))
+
+
+class TestTokenRateLimiter(unittest.TestCase):
+    """Test cases for TokenRateLimiter"""
+    
+    def test_acquire_within_budget(self):
+        """Test acquiring tokens within the bucket"""
+        limiter = TokenRateLimiter(600)
+        self.assertTrue(limiter.acquire(500))
+    
+    def test_acquire_timeout(self):
+        """Test acquiring more than available times out"""
+        limiter = TokenRateLimiter(60)
+        self.assertTrue(limiter.acquire(60))
+        self.assertFalse(limiter.acquire(60, timeout=0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Tests for per-job tracing
+"""
+import unittest
+from unittest.mock import Mock
+import json
+import tempfile
+import shutil
+import threading
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.config import Config
+from src.ia_client import AIClient
+from src.text_processor import TextProcessor
+from src.tracing import (Tracer, activate, annotate, current_trace, format_report, load_traces,
+                         percentile, span, summarize, traced_callback)
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for Tracer, span and the report"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'traces', 'traces.jsonl')
+        self.tracer = Tracer(self.path)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.tracer.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self):
+        """Flush the exporter and read the exported traces"""
+        self.tracer.close()
+        return load_traces(self.path)
+
+    def test_span_without_trace_is_noop(self):
+        """Spans outside a job record nothing and still hand out attributes"""
+        self.assertIsNone(current_trace())
+        with span('clean', chars=3) as attributes:
+            attributes['extra'] = 1
+        annotate(outcome='ignored')
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_disabled_tracer(self):
+        """A disabled tracer starts no traces and writes nothing"""
+        tracer = Tracer(self.path, enabled=False)
+        with tracer.job('shorten', 'headless') as trace:
+            self.assertIsNone(trace)
+            with span('clean'):
+                pass
+        tracer.close()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_job_exports_spans(self):
+        """Spans, attributes and errors of a job end up in one JSON line"""
+        with self.tracer.job('shorten', 'headless') as trace:
+            with span('preflight', prompt_tokens=42):
+                pass
+            with span('cache_lookup') as attributes:
+                attributes['cache_hit'] = True
+            annotate(outcome='ok')
+
+        with self.assertRaises(RuntimeError):
+            with self.tracer.job('improve', 'headless'):
+                with span('model'):
+                    raise RuntimeError("boom")
+
+        first, second = self._read()
+        self.assertEqual(first['trace_id'], trace.trace_id)
+        self.assertEqual(first['op'], 'shorten')
+        self.assertEqual([s['name'] for s in first['spans']], ['preflight', 'cache_lookup'])
+        self.assertEqual(first['spans'][0]['prompt_tokens'], 42)
+        self.assertTrue(first['spans'][1]['cache_hit'])
+        self.assertEqual(first['attrs'], {'outcome': 'ok'})
+        self.assertEqual(second['error'], "RuntimeError: boom")
+        self.assertEqual(second['spans'][0]['error'], 'RuntimeError')
+        self.assertNotEqual(first['trace_id'], second['trace_id'])
+
+    def test_trace_follows_callbacks_across_threads(self):
+        """traced_callback carries the trace to another thread with its wait time"""
+        trace = self.tracer.start('shorten')
+        ran = threading.Event()
+
+        def worker():
+            with span('ai'):
+                ran.set()
+
+        with activate(trace):
+            callback = traced_callback('worker', worker)
+        thread = threading.Thread(target=callback)
+        thread.start()
+        thread.join()
+        self.tracer.finish(trace)
+        self.tracer.finish(trace)  # Idempotent
+
+        self.assertTrue(ran.is_set())
+        traces = self._read()
+        self.assertEqual(len(traces), 1)
+        names = [s['name'] for s in traces[0]['spans']]
+        self.assertEqual(names, ['ai', 'worker'])
+        self.assertIn('wait_ms', traces[0]['spans'][1])
+
+    def test_text_processor_spans(self):
+        """TextProcessor phases are traced with their token counts"""
+        processor = TextProcessor(Mock())
+        with self.tracer.job('shorten', 'gui'):
+            cleaned = processor.clean_text("Olá   mundo, tudo bem?")
+            self.assertTrue(processor.validate_text(cleaned, 100))
+
+        spans = {s['name']: s for s in self._read()[0]['spans']}
+        self.assertIn('clean', spans)
+        self.assertGreater(spans['validate']['input_tokens'], 0)
+        self.assertEqual(spans['validate']['max_tokens'], 100)
+
+    def test_stream_spans(self):
+        """A streamed request traces the same phases as process_text"""
+        config = Config(os.path.join(self.temp_dir, 'config.ini'))
+        config.set('DEFAULT', 'openai_api_key', 'sk-test')
+        config.set('USAGE', 'enabled', 'false')
+        client = AIClient(config, Mock())
+        chunks = []
+        for content in ("Texto", " curto."):
+            chunk = Mock(usage=None)
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = content
+            chunks.append(chunk)
+        client._create_completion = Mock(return_value=iter(chunks))
+        with self.tracer.job('shorten', 'gui'):
+            pieces = list(client.stream_text("Um texto um pouco mais longo para encurtar.", 'shorten'))
+        self.assertEqual(''.join(pieces), "Texto curto.")
+
+        spans = {s['name']: s for s in self._read()[0]['spans']}
+        for name in ('resolve_translation', 'mask', 'preflight', 'model'):
+            self.assertIn(name, spans)
+        self.assertGreater(spans['preflight']['prompt_tokens'], 0)
+        self.assertEqual(client._create_completion.call_count, 1)
+
+    def test_report(self):
+        """The report has percentiles per operation and per phase"""
+        for i in range(1, 11):
+            with self.tracer.job('shorten' if i % 2 else 'improve', 'headless'):
+                with span('model'):
+                    pass
+        summary = summarize(self._read())
+
+        self.assertEqual(summary['operations']['shorten']['count'], 5)
+        self.assertEqual(summary['operations']['improve']['count'], 5)
+        self.assertEqual(summary['phases']['model']['count'], 10)
+        report = format_report(summary)
+        self.assertIn("shorten", report)
+        self.assertIn("p99", report)
+
+    def test_percentile(self):
+        """Nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 90), 7.0)
+
+    def test_load_skips_truncated_lines(self):
+        """A line cut short by a crash does not break the report"""
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'shorten', 'ms': 1.0, 'spans': []}) + '\n{"op": "shor')
+        self.assertEqual(len(load_traces(self.path)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
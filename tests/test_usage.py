@@ -0,0 +1,164 @@
+"""
+Tests for token and cost accounting and budgets
+"""
+import unittest
+from unittest.mock import Mock
+import datetime
+import tempfile
+import shutil
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.config import BudgetSettings, Config
+from src.ia_client import AIClient
+from src.usage import BudgetExceeded, UsageLedger, format_report, usage_cost
+
+
+def budget(**limits) -> BudgetSettings:
+    """Budget with only the given limits set"""
+    values = {'daily_tokens': 0, 'daily_cost': 0.0, 'monthly_cost': 0.0, 'action': 'warn',
+              'downgrade_model': 'gpt-4o-mini'}
+    values.update(limits)
+    return BudgetSettings(**values)
+
+
+class TestUsageLedger(unittest.TestCase):
+    """Test cases for UsageLedger"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.ledger = UsageLedger(os.path.join(self.temp_dir, 'usage.db'))
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.ledger.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_aggregates(self):
+        """Calls add up in one row per day, operation and model"""
+        self.ledger.record('shorten', 'gpt-4o', 1000, 200)
+        self.ledger.record('shorten', 'gpt-4o', 500, 100)
+        self.ledger.record('improve', 'gpt-4o-mini', 2000, 400, estimated=True)
+
+        today = datetime.date.today()
+        totals = self.ledger.totals(today)
+        self.assertEqual(totals['calls'], 3)
+        self.assertEqual(totals['tokens'], 4200)
+        expected = usage_cost('gpt-4o', 1500, 300) + usage_cost('gpt-4o-mini', 2000, 400)
+        self.assertAlmostEqual(totals['cost'], expected)
+
+        by_operation = {row['key']: row for row in self.ledger.breakdown(today, 'operation')}
+        self.assertEqual(by_operation['shorten']['calls'], 2)
+        self.assertEqual(by_operation['improve']['estimated_calls'], 1)
+        rows = self.ledger._connection.execute('SELECT COUNT(*) FROM usage').fetchone()[0]
+        self.assertEqual(rows, 2)
+
+    def test_retention(self):
+        """Days older than retention_days are dropped on open"""
+        self.ledger.record('shorten', 'gpt-4o', 10, 10)
+        old_day = (datetime.date.today() - datetime.timedelta(days=30)).isoformat()
+        with self.ledger._connection:
+            self.ledger._connection.execute(
+                "INSERT INTO usage (day, operation, model, calls) VALUES (?, 'shorten', 'gpt-4o', 1)", (old_day,))
+        self.ledger.close()
+
+        ledger = UsageLedger(self.ledger.path, retention_days=7)
+        try:
+            self.assertEqual(ledger.totals(datetime.date.today() - datetime.timedelta(days=60))['calls'], 1)
+        finally:
+            ledger.close()
+
+    def test_exceeded(self):
+        """Each limit is reported once reached"""
+        self.assertIsNone(self.ledger.exceeded(budget(daily_tokens=100)))
+        self.ledger.record('shorten', 'gpt-4', 100, 50)  # US$ 0.006
+        self.assertIsNone(self.ledger.exceeded(budget()))
+        self.assertIn("tokens hoje", self.ledger.exceeded(budget(daily_tokens=100)))
+        self.assertIn("hoje", self.ledger.exceeded(budget(daily_cost=0.005)))
+        self.assertIn("no mês", self.ledger.exceeded(budget(monthly_cost=0.005)))
+        self.assertIsNone(self.ledger.exceeded(budget(daily_tokens=1000, daily_cost=1.0, monthly_cost=1.0)))
+
+    def test_report(self):
+        """The report lists operations, models and the budget state"""
+        self.ledger.record('shorten', 'gpt-4o', 1000, 200)
+        report = format_report(self.ledger, budget(daily_tokens=100, action='block'), days=7)
+        self.assertIn("shorten", report)
+        self.assertIn("gpt-4o", report)
+        self.assertIn("ação: block", report)
+
+
+class TestClientBudget(unittest.TestCase):
+    """AIClient records usage and applies the budget action"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config(os.path.join(self.temp_dir, 'config.ini'))
+        self.config.set('DEFAULT', 'openai_api_key', 'sk-test')
+        self.config.set('DEFAULT', 'model', 'gpt-4o')
+        self.config.set('SIMILARITY', 'enabled', 'false')
+        self.config.set('USAGE', 'file', os.path.join(self.temp_dir, 'usage.db'))
+        self.client = Mock()
+        reply = Mock()
+        reply.choices = [Mock()]
+        reply.choices[0].message.content = "Texto curto."
+        reply.usage.prompt_tokens = 800
+        reply.usage.completion_tokens = 300
+        self.client.chat.completions.create.return_value = reply
+        self.ai_client = AIClient(self.config, Mock())
+        self.ai_client._get_client = lambda: self.client
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.ai_client.usage.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _process(self) -> str:
+        return self.ai_client.process_text("Um texto um pouco mais longo para encurtar.", 'shorten')
+
+    def _called_model(self) -> str:
+        return self.client.chat.completions.create.call_args.kwargs['model']
+
+    def test_usage_is_recorded(self):
+        """Reported usage lands in the ledger and in last_usage()"""
+        self._process()
+        totals = self.ai_client.usage.totals(datetime.date.today())
+        self.assertEqual((totals['calls'], totals['tokens']), (1, 1100))
+        usage = self.ai_client.last_usage()
+        self.assertEqual((usage['model'], usage['input_tokens'], usage['output_tokens']), ('gpt-4o', 800, 300))
+        self.assertAlmostEqual(usage['cost'], usage_cost('gpt-4o', 800, 300))
+
+    def test_warn(self):
+        """Over budget with 'warn' the request goes through unchanged"""
+        self.config.set('BUDGET', 'daily_tokens', '1000')
+        self._process()
+        self.assertEqual(self._process(), "Texto curto.")
+        self.assertEqual(self._called_model(), 'gpt-4o')
+        self.ai_client.logger.warning.assert_called()
+
+    def test_downgrade(self):
+        """Over budget with 'downgrade' the cheaper model is called"""
+        self.config.set('BUDGET', 'daily_tokens', '1000')
+        self.config.set('BUDGET', 'action', 'downgrade')
+        self._process()
+        self.assertEqual(self._called_model(), 'gpt-4o')
+        self._process()
+        self.assertEqual(self._called_model(), 'gpt-4o-mini')
+        self.assertEqual(self.ai_client.last_usage()['model'], 'gpt-4o-mini')
+
+    def test_block(self):
+        """Over budget with 'block' no request is sent"""
+        self.config.set('BUDGET', 'daily_cost', '0.001')
+        self.config.set('BUDGET', 'action', 'block')
+        self._process()
+        with self.assertRaises(BudgetExceeded):
+            self._process()
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,7 +15,11 @@ import os
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.app import main
-
 if __name__ == "__main__":
+    # Thin client: parsed before any heavy import so it starts in milliseconds
+    if len(sys.argv) > 1 and sys.argv[1] == '--send':
+        from src.daemon_client import send_main
+        sys.exit(send_main(sys.argv[2:]))
+    
+    from src.app import main
     main()
\ No newline at end of file